@@ -1,4 +1,4 @@
-from flask import Flask, render_template
+from flask import Flask, Response, render_template
 import system.log_utils as log
 from oled.display import start_oled_thread
 
@@ -9,6 +9,9 @@ app = Flask(__name__)
 from gpio.routes import gpio_bp
 from system.routes import system_bp
 from gasera.routes import gasera_bp
+from gasera.metrics import metrics
+from gasera.ak_proxy import start_ak_proxy
+from gasera.devices import start_devices
 
 app.register_blueprint(gasera_bp, url_prefix="/gasera")
 app.register_blueprint(system_bp, url_prefix="/system")
@@ -17,9 +20,20 @@ app.register_blueprint(gpio_bp, url_prefix="/gpio")
 # start OLED monitor in background
 start_oled_thread()
 
+# raw AK port for other tools (only if GASERA_PROXY_PORT is set)
+start_ak_proxy()
+
+# per analyzer: APAR health readings in idle gaps (GASERA_TELEMETRY) and
+# status / error transitions (GASERA_JOURNAL)
+start_devices()
+
 @app.route('/')
 def index():
     return render_template('index.html')
 
+@app.route('/metrics')
+def prometheus_metrics():
+    return Response(metrics.render(), mimetype="text/plain; version=0.0.4")
+
 if __name__ == '__main__':
     app.run(host='127.0.0.1', port=5001)
@@ -0,0 +1,192 @@
+# bench_codec.py — AK codec micro-benchmark: table-driven protocol vs the previous parsers
+#
+# Usage (from repo root, no device needed):
+#   python -m bench.bench_codec [-n 20000] [--components 7]
+#
+# Replies come from the simulator's device model. "legacy" reproduces the code
+# the command table replaced: f-string request frames, a full split per parser,
+# shlex for ADEV, plain dataclasses and the dispatcher's __dict__ copy; and the
+# per-record ACON payload that columnar batches (gasera/acon_batch.py) replaced.
+
+import argparse
+import shlex
+import time
+import tracemalloc
+from dataclasses import dataclass
+from typing import List
+
+from gasera.acon_batch import parse_acon_batch
+from gasera.config import get_cas_details, get_color_for_cas, get_gas_name
+from gasera.controller import acon_payload
+from gasera.protocol import GaseraProtocol, STX, ETX, STATUS_MAP, encode_frame
+from simulator.device import SimulatedDevice
+
+# ---- Legacy reference --------------------------------------------------------
+
+@dataclass
+class _Status:
+    error: bool
+    status_code: int
+    status_str: str
+
+@dataclass
+class _Record:
+    timestamp: int
+    cas: str
+    ppm: float
+
+@dataclass
+class _Results:
+    error: bool
+    records: List[_Record]
+
+@dataclass
+class _Tasks:
+    error: bool
+    tasks: list
+
+@dataclass
+class _Info:
+    error: bool
+    info: str
+
+def _split(response: str):
+    if not response.startswith(STX) or not response.endswith(ETX):
+        raise ValueError("Invalid response framing")
+    parts = response[1:-1].strip().split()
+    if len(parts) < 2:
+        raise ValueError("Malformed response")
+    return parts[0], parts[1:]
+
+def legacy_asts(response: str):
+    _, parts = _split(response)
+    code = int(parts[1]) if len(parts) > 1 and parts[0] == '0' else -1
+    return _Status(parts[0] != '0', code, STATUS_MAP.get(code, "Unknown"))
+
+def legacy_acon(response: str):
+    _, parts = _split(response)
+    error = parts[0] != '0'
+    records = []
+    if not error:
+        i = 1
+        while i + 2 < len(parts):
+            records.append(_Record(int(parts[i]), parts[i + 1], float(parts[i + 2])))
+            i += 3
+    return _Results(error, records)
+
+def legacy_atsk(response: str):
+    _, parts = _split(response)
+    error = parts[0] != '0'
+    tasks = []
+    if not error:
+        i = 1
+        while i < len(parts):
+            task_id = parts[i]
+            i += 1
+            name = []
+            while i < len(parts) and not parts[i].isdigit():
+                name.append(parts[i])
+                i += 1
+            tasks.append((task_id, " ".join(name)))
+    return _Tasks(error, tasks)
+
+def legacy_adev(response: str):
+    tokens = shlex.split(response[1:-1].strip())
+    error = tokens[1] != '0'
+    return _Info(error, " | ".join(p if p else "-" for p in tokens[2:]) if not error else "")
+
+LEGACY = {"ASTS": legacy_asts, "ACON": legacy_acon, "ATSK": legacy_atsk, "ADEV": legacy_adev}
+
+def legacy_wrap(result):
+    # dispatcher before the codec change: shallow __dict__; nested records left to the JSON encoder
+    d = dict(result.__dict__)
+    if "records" in d:
+        d["records"] = [r.__dict__ for r in d["records"]]
+    return d
+
+def legacy_payload(response: str) -> dict:
+    # /api/data/live before columnar batches: per-record metadata lookups and labels
+    result = legacy_acon(response)
+    components = []
+    for rec in result.records:
+        meta = get_cas_details(rec.cas) or {}
+        label = meta.get("label") or (f"{get_gas_name(rec.cas)} ({rec.cas})" if get_gas_name(rec.cas) else rec.cas)
+        color = meta.get("color") or get_color_for_cas(rec.cas) or "#999999"
+        components.append({"cas": rec.cas, "name": meta.get("symbol") or rec.cas, "label": label,
+                           "color": color, "ppm": rec.ppm})
+    ts = result.records[0].timestamp
+    readable = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(ts))
+    pretty = f"Measurement Results ({readable}):\n" + "\n".join(
+        f"{get_cas_details(r.cas)['label']}: {r.ppm:.4f} ppm" for r in result.records)
+    return {"timestamp": ts, "readable": readable, "string": pretty, "components": components}
+
+# ---- Harness -----------------------------------------------------------------
+
+def corpus(components: int) -> dict:
+    dev = SimulatedDevice(components=components, time_scale=1000.0)
+    dev.results = [(1700000000, cas, 1.0 + i * 0.37, 1) for i, cas in enumerate(dev.cas)]
+    out = {}
+    for func in LEGACY:
+        status, data = dev.handle(func, [])
+        out[func] = f"{STX}{func} {status} {data}{ETX}"
+    return out
+
+def per_call_us(fn, arg, n: int, repeat: int = 5) -> float:
+    """Best of `repeat` runs of n calls (the least disturbed one), in µs per call."""
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        for _ in range(n):
+            fn(arg)
+        best = min(best, time.perf_counter() - t0)
+    return best / n * 1e6
+
+def retained_bytes(fn, arg, n: int = 1000) -> float:
+    """Memory held per result while n parsed results are alive."""
+    tracemalloc.start()
+    keep = [fn(arg) for _ in range(n)]
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del keep
+    return size / n
+
+def main():
+    ap = argparse.ArgumentParser(description="Compare table-driven and legacy AK codec cost")
+    ap.add_argument("-n", type=int, default=20000, help="iterations per measurement")
+    ap.add_argument("--components", type=int, default=7, help="gas components in the ACON reply")
+    args = ap.parse_args()
+
+    proto = GaseraProtocol()
+    replies = corpus(args.components)
+
+    rows = []
+    # request side: frame + bytes for an argument-less query
+    rows.append(("build ASTS",
+                 per_call_us(lambda f: f"{STX} {f} K0 {''}{ETX}".encode("ascii"), "ASTS", args.n),
+                 per_call_us(lambda f: encode_frame(proto.build_command(f)), "ASTS", args.n)))
+    for func, reply in replies.items():
+        assert legacy_wrap(LEGACY[func](reply)) == proto.decode(reply, func).to_dict(), func
+        rows.append((f"parse {func}",
+                     per_call_us(LEGACY[func], reply, args.n),
+                     per_call_us(lambda r: proto.decode(r, func), reply, args.n)))
+        rows.append((f"parse+wrap {func}",
+                     per_call_us(lambda r: legacy_wrap(LEGACY[func](r)), reply, args.n),
+                     per_call_us(lambda r: proto.decode(r, func).to_dict(), reply, args.n)))
+
+    reply = replies["ACON"]
+    assert legacy_payload(reply) == acon_payload(reply)
+    rows.append(("parse ACON batch", per_call_us(legacy_acon, reply, args.n), per_call_us(parse_acon_batch, reply, args.n)))
+    rows.append(("live payload", per_call_us(legacy_payload, reply, args.n), per_call_us(acon_payload, reply, args.n)))
+
+    print(f"{args.n} iterations, ACON with {args.components} components")
+    print(f"{'step':<18}{'legacy µs':>11}{'new µs':>11}{'speedup':>9}")
+    for name, legacy, table in rows:
+        print(f"{name:<18}{legacy:>11.2f}{table:>11.2f}{legacy / table:>8.2f}x")
+
+    legacy = retained_bytes(legacy_acon, reply)
+    for name, fn in (("ACON bytes/result", lambda r: proto.decode(r, "ACON")), ("batch bytes/result", parse_acon_batch)):
+        table = retained_bytes(fn, reply)
+        print(f"{name:<18}{legacy:>11.0f}{table:>11.0f}{legacy / table:>8.2f}x")
+
+if __name__ == "__main__":
+    main()
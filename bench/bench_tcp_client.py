@@ -0,0 +1,62 @@
+# bench_tcp_client.py — wire latency: one-shot vs persistent-session GaseraTCPClient
+#
+# Usage (from repo root, device or simulator reachable):
+#   python -m bench.bench_tcp_client [--host 192.168.0.100] [--port 8888] [-n 50] [--cmd ASTS]
+
+import argparse
+import statistics
+import time
+
+from gasera.config import GASERA_IP_ADDRESS, GASERA_PORT_NUMBER
+from gasera.protocol import GaseraProtocol
+from gasera.tcp_client import GaseraTCPClient
+
+def run_mode(host: str, port: int, command: str, n: int, persistent: bool) -> dict:
+    client = GaseraTCPClient(host, port, persistent=persistent)
+    samples = []
+    failures = 0
+    try:
+        for _ in range(n):
+            t0 = time.perf_counter()
+            resp = client.send_command(command)
+            dt = (time.perf_counter() - t0) * 1000.0
+            if resp is None:
+                failures += 1
+            else:
+                samples.append(dt)
+    finally:
+        client.disconnect()
+
+    if not samples:
+        return {"ok": 0, "failed": failures}
+    samples.sort()
+    return {
+        "ok": len(samples),
+        "failed": failures,
+        "mean": statistics.fmean(samples),
+        "p50": samples[len(samples) // 2],
+        "p95": samples[min(len(samples) - 1, int(len(samples) * 0.95))],
+        "max": samples[-1],
+    }
+
+def main():
+    ap = argparse.ArgumentParser(description="Compare one-shot and persistent-session wire latency")
+    ap.add_argument("--host", default=GASERA_IP_ADDRESS)
+    ap.add_argument("--port", type=int, default=GASERA_PORT_NUMBER)
+    ap.add_argument("-n", type=int, default=50, help="requests per mode")
+    ap.add_argument("--cmd", default="ASTS", help="AK function code to send")
+    args = ap.parse_args()
+
+    command = GaseraProtocol().build_command(args.cmd)
+    print(f"{args.cmd} x{args.n} against {args.host}:{args.port}")
+    print(f"{'mode':<12}{'ok':>5}{'fail':>6}{'mean':>10}{'p50':>10}{'p95':>10}{'max':>10}  (ms)")
+    for name, persistent in (("one-shot", False), ("persistent", True)):
+        r = run_mode(args.host, args.port, command, args.n, persistent)
+        if not r["ok"]:
+            print(f"{name:<12}{0:>5}{r['failed']:>6}  no successful exchanges")
+            continue
+        print(f"{name:<12}{r['ok']:>5}{r['failed']:>6}"
+              f"{r['mean']:>10.1f}{r['p50']:>10.1f}{r['p95']:>10.1f}{r['max']:>10.1f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+# make_corpus.py — (re)generate the benchmark reply corpora in bench/corpus/
+#
+# Usage (from repo root, no device needed):
+#   python -m bench.make_corpus [--components 7 20 50] [--inlets 4] [--iterations 8]
+#
+# Each corpus is an ordinary wire trace (gasera/trace.py format), so a trace
+# recorded on a real analyzer with /api/trace/start can be dropped into
+# bench/corpus/ and is picked up by bench.suite the same way. The committed
+# sim_*.trace files are NOT real analyzer replies: they are produced by the
+# simulator's device model with a fixed seed (source=simulator in the header).
+# The replies have the real field layout, and the files stay byte-identical
+# between runs except for the timestamps. The --inlets corpora have the ACON inlet column on (SCON
+# 4th bit) and every inlet of a multi-point sampler in use.
+
+import argparse
+import os
+import time
+
+from gasera.protocol import GaseraProtocol
+from gasera.trace import TraceRecorder
+from simulator.device import SimulatedDevice
+
+CORPUS_DIR = os.path.join(os.path.dirname(__file__), "corpus")
+
+def record(path: str, components: int, iterations: int, inlets: int = 0) -> int:
+    proto = GaseraProtocol()
+    dev = SimulatedDevice(components=components, time_scale=1000.0, seed=components)
+    if inlets:
+        # every inlet in use: ACON keeps one row per (inlet, gas), each inlet with its own timestamp
+        dev.inlets = [(i + 1, True, 30.0) for i in range(inlets)]
+        dev.fmt = (1, 1, 1, 1)
+    else:
+        # 4 sampler inlets, one in use: AMPS has content, ACON keeps one row per gas
+        dev.inlets = [(i + 1, i == 0, 30.0 + 15.0 * i) for i in range(4)]
+    rec = TraceRecorder(path, header=f"source=simulator components={components} seed={components} inlets={inlets}")
+
+    def exchange(func: str) -> None:
+        frame = proto.build_command(func)
+        status, data = dev.handle(func, [])
+        rec.request(frame)
+        rec.response(f"\x02 {func} {status}" + (f" {data}" if data else "") + "\x03")
+
+    exchange("ASTS")        # initializing
+    time.sleep(0.005)
+    for func in ("ASTS", "ADEV", "ASYP", "AMPS", "ACON"):  # idle, ACON before any result (error reply)
+        exchange(func)
+    for _ in range(iterations):
+        # one finished measurement over every component (task ids cap the real tasks at 7 gases),
+        # on the next inlet when there are several
+        dev._complete_iteration()
+        exchange("ASTS")
+        exchange("ACON")
+    rec.close()
+    return rec.events // 2
+
+def main():
+    ap = argparse.ArgumentParser(description="Record simulator reply corpora for the benchmark suite")
+    ap.add_argument("--components", type=int, nargs="+", default=[7, 20, 50])
+    ap.add_argument("--inlets", type=int, nargs="*", default=[4], help="7-gas corpora with this many inlets")
+    ap.add_argument("--iterations", type=int, default=8, help="ACON results per corpus")
+    ap.add_argument("--out", default=CORPUS_DIR)
+    args = ap.parse_args()
+
+    os.makedirs(args.out, exist_ok=True)
+    for n in args.components:
+        path = os.path.join(args.out, f"sim_c{n}.trace")
+        print(f"{path}: {record(path, n, args.iterations)} exchanges")
+    for m in args.inlets:
+        path = os.path.join(args.out, f"sim_c7_i{m}.trace")
+        print(f"{path}: {record(path, 7, args.iterations * 2, inlets=m)} exchanges")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+# replay_trace.py — replay a recorded wire trace through GaseraController offline
+#
+# Usage (from repo root):
+#   python -m bench.replay_trace field.trace [--speed 0] [--repeat 10]
+#
+# speed=1 reproduces field timing, speed=N runs N× faster, speed=0 removes all
+# recorded waits so only parser/controller cost remains.
+
+import argparse
+import statistics
+import time
+
+from gasera.controller import GaseraController, TaskIDs
+from gasera.device_metadata import DeviceMetadata, TaskTable
+from gasera.scheduler import DeviceScheduler
+from gasera.trace import ReplayTransport, load_trace, replay_requests
+
+def parsers_for(proto):
+    return {
+        "ASTS": proto.parse_asts, "AERR": proto.parse_aerr, "ATSK": proto.parse_atsk,
+        "ACON": proto.parse_acon, "AMST": proto.parse_amst, "ANAM": proto.parse_anam,
+        "ADEV": proto.parse_adev, "AITR": proto.parse_aitr, "ANET": proto.parse_anet,
+        "ACLK": proto.parse_aclk, "ASTR": proto.parse_astr, "ATSP": proto.parse_atsp,
+        "ASYP": proto.parse_asyp, "AMPS": proto.parse_amps, "APAR": proto.parse_apar,
+    }
+
+def main():
+    ap = argparse.ArgumentParser(description="Replay a gasera wire trace through the controller")
+    ap.add_argument("trace")
+    ap.add_argument("--speed", type=float, default=0.0, help="1 = real time, 0 = no waits")
+    ap.add_argument("--repeat", type=int, default=1)
+    args = ap.parse_args()
+
+    exchanges = load_trace(args.trace)
+    transport = ReplayTransport(exchanges, speed=args.speed)
+    sched = DeviceScheduler(transport, max_depth={}, max_age={})
+    sched.start()
+    # no metadata cache or warm-up: every recorded request reaches the replay transport
+    controller = GaseraController(scheduler=sched, warm=False,
+                                  metadata=DeviceMetadata(TaskTable(TaskIDs.NAME_TO_ID), max_age=0))
+    parsers = parsers_for(controller.proto)
+
+    failures = 0
+    per_func = {}
+    t_start = time.perf_counter()
+    for _ in range(args.repeat):
+        transport.rewind()
+        for ex, resp in replay_requests(exchanges, controller._send, speed=args.speed):
+            func = ex.request[2:6]
+            t0 = time.perf_counter()
+            if resp is None:
+                failures += 1
+            elif func in parsers:
+                parsers[func](resp)
+            per_func.setdefault(func, []).append((time.perf_counter() - t0) * 1e6)
+    elapsed = time.perf_counter() - t_start
+
+    total = sum(len(v) for v in per_func.values())
+    print(f"{total} exchanges replayed in {elapsed:.3f}s ({failures} recorded failures)")
+    print(f"{'func':<6}{'n':>7}{'parse mean µs':>15}{'parse max µs':>14}")
+    for func in sorted(per_func):
+        v = per_func[func]
+        print(f"{func:<6}{len(v):>7}{statistics.fmean(v):>15.1f}{max(v):>14.1f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,272 @@
+# suite.py — hot-path micro-benchmarks over wire-trace reply corpora, compared with stored baselines
+#
+# Usage (from repo root, no device needed):
+#   python -m bench.suite                      run, compare with bench/baselines.json
+#   python -m bench.suite --save               run, store the results as the new baseline
+#   python -m bench.suite -k ACON --fail-over 20
+#                                              only cases containing "ACON"; exit 1 if one is >20 % slower
+#
+# Corpora are the wire traces in bench/corpus/ (see bench/make_corpus.py). The
+# committed sim_*.trace files are simulator output, not replies recorded on a
+# real analyzer; a field trace copied there joins the same cases. Only replies with status 0 are
+# used. ACON cases are grouped by row count ("ACON/50", "ACON/28i" with the
+# inlet column), other replies are pooled per function. Stages timed:
+#   parse      GaseraProtocol.decode (and the columnar ACON batch)
+#   frame      GaseraTCPClient._recv_until_stx_etx fed from a socket that
+#              returns the reply in fixed-size chunks
+#   dispatch   GaseraCommandDispatcher.handle incl. _wrap, over the scheduler
+#              and a replay transport (response cache bypassed unless "cached";
+#              ADEV/ASYP answered by the controller's metadata cache)
+#   live       acon_payload() and the JSON text /api/data/live sends
+#   history    ResultStore.series over every inlet and over one (inlet corpora)
+# Each case runs for at least --min-time per repeat; the best repeat is kept.
+# Numbers are only comparable on the same host: the baseline records which.
+
+import argparse
+import glob
+import json
+import os
+import platform
+import sys
+import time
+from datetime import datetime
+from itertools import cycle, islice
+from typing import Callable, Dict, List, Sequence
+
+from gasera.acon_batch import parse_acon_batch
+from gasera.controller import GaseraController, acon_payload
+from gasera.dispatcher import GaseraCommandDispatcher
+from gasera.protocol import GaseraProtocol, acon_stride, tokenize
+from gasera.response_cache import ResponseCache
+from gasera.result_store import ResultStore
+from gasera.scheduler import DeviceScheduler
+from gasera.tcp_client import GaseraTCPClient
+from gasera.trace import Exchange, ReplayTransport, load_trace
+
+BENCH_DIR = os.path.dirname(__file__)
+CORPUS_DIR = os.path.join(BENCH_DIR, "corpus")
+BASELINE_PATH = os.path.join(BENCH_DIR, "baselines.json")
+
+# dispatcher command → reply it needs (ACON ones are run once per component count)
+DISPATCH = {"get_status": "ASTS", "get_device_info": "ADEV", "get_sys_params": "ASYP",
+            "get_sampler_params": "AMPS", "get_results": "ACON"}
+FRAME_CHUNKS = (1460, 64, 8)  # one TCP segment, small reads, pathological reads
+
+# ---- Corpora -----------------------------------------------------------------
+
+def load_corpora(paths: Sequence[str]) -> Dict[str, List[Exchange]]:
+    """Successful exchanges grouped as "ASTS", "ADEV", … and "ACON/<rows>" ("ACON/<rows>i" with inlets)."""
+    groups: Dict[str, List[Exchange]] = {}
+    for path in paths:
+        for ex in load_trace(path):
+            if ex.response is None:
+                continue
+            tokens = tokenize(ex.response)
+            if tokens[1] != "0":
+                continue
+            func = tokens[0]
+            if func == "ACON":
+                k = acon_stride(tokens[2:])
+                key = f"ACON/{(len(tokens) - 2) // k}" + ("i" if k == 4 else "")
+            else:
+                key = func
+            groups.setdefault(key, []).append(ex)
+    return groups
+
+def _acon_keys(groups: Dict[str, List[Exchange]]) -> List[str]:
+    return sorted((k for k in groups if k.startswith("ACON/")), key=lambda k: (k.endswith("i"), int(k[5:].rstrip("i"))))
+
+# ---- Timing ------------------------------------------------------------------
+
+def _run(fn: Callable, seq: list) -> float:
+    t0 = time.perf_counter()
+    for x in seq:
+        fn(x)
+    return time.perf_counter() - t0
+
+def per_call_us(fn: Callable, inputs: Sequence, min_time: float, repeat: int) -> float:
+    """µs per call, inputs taken round-robin; the call count grows until one run lasts min_time."""
+    n = len(inputs)
+    while True:
+        seq = list(islice(cycle(inputs), n))
+        best = _run(fn, seq)
+        if best >= min_time:
+            break
+        n = max(n * 2, int(n * min_time / max(best, 1e-9) * 1.2))
+    for _ in range(repeat - 1):
+        best = min(best, _run(fn, seq))
+    return best / n * 1e6
+
+# ---- Cases -------------------------------------------------------------------
+
+class _ChunkedSocket:
+    """Socket stand-in whose recv_into() hands out the loaded bytes `chunk` at a time."""
+
+    def __init__(self, chunk: int):
+        self.chunk = chunk
+        self._data = memoryview(b"")
+        self._pos = 0
+
+    def load(self, data: bytes) -> None:
+        self._data = memoryview(data)
+        self._pos = 0
+
+    def settimeout(self, timeout) -> None:
+        pass
+
+    def recv_into(self, view, nbytes: int = 0) -> int:
+        n = min(len(view), self.chunk, len(self._data) - self._pos)
+        view[:n] = self._data[self._pos:self._pos + n]
+        self._pos += n
+        return n
+
+def _frame_reader(chunk: int, func: str) -> Callable[[bytes], str]:
+    client = GaseraTCPClient("bench", 0)
+    sock = _ChunkedSocket(chunk)
+    client._sock = sock
+    client._func = func
+
+    def read(payload: bytes) -> str:
+        sock.load(payload)
+        client._t_sent = time.monotonic()
+        frame = client._recv_until_stx_etx(1.0)
+        assert frame is not None
+        return frame
+    return read
+
+class _NoCache:
+    def get_or_fetch(self, key, ttl, fetch):
+        return fetch()
+
+    def invalidate(self) -> None:
+        pass
+
+def _replay_controller(exchanges: List[Exchange]) -> GaseraController:
+    sched = DeviceScheduler(ReplayTransport(exchanges, speed=0), max_depth={}, max_age={})
+    sched.start()
+    # no warm-up batch; ADEV/ASYP then come from its metadata cache after the first call, as in service
+    return GaseraController(scheduler=sched, cache=ResponseCache(), results=ResultStore(), warm=False)
+
+def flask_json(obj) -> str:
+    # what jsonify() emits outside debug mode (Flask's DefaultJSONProvider)
+    return json.dumps(obj, ensure_ascii=True, sort_keys=True, separators=(",", ":"))
+
+def build_cases(groups: Dict[str, List[Exchange]]) -> List[tuple]:
+    """(name, fn, inputs) for every stage and corpus group."""
+    proto = GaseraProtocol()
+    cases = []
+    replies = {k: [ex.response for ex in v] for k, v in groups.items()}
+    acon_keys = _acon_keys(groups)
+    plain = sorted(k for k in groups if k in DISPATCH.values())
+
+    for key in plain + acon_keys:
+        func = key[:4]
+        cases.append((f"parse {key}", lambda r, f=func: proto.decode(r, f), replies[key]))
+    for key in acon_keys:
+        cases.append((f"parse batch {key}", parse_acon_batch, replies[key]))
+
+    for key in ["ASTS"] * ("ASTS" in groups) + acon_keys:
+        payloads = [r.encode("ascii") for r in replies[key]]
+        for chunk in FRAME_CHUNKS:
+            cases.append((f"frame {key} @{chunk}B", _frame_reader(chunk, key[:4]), payloads))
+    if "ASTS" in groups:
+        # a late tail of an earlier exchange and line noise ahead of the reply
+        stale = [b"\r\n\x00" + replies["ASTS"][0].encode("ascii") + r.encode("ascii") for r in replies["ASTS"]]
+        cases.append(("frame ASTS +stale @1460B", _frame_reader(1460, "ASTS"), stale))
+
+    base = [ex for k in plain for ex in groups[k]]
+    for key in acon_keys or [None]:
+        controller = _replay_controller(base + (groups[key] if key else []))
+        direct = GaseraCommandDispatcher(controller, _NoCache())
+        for command, func in DISPATCH.items():
+            if func == "ACON" and key:
+                cases.append((f"dispatch {command} {key}", direct.handle, [command]))
+            elif func != "ACON" and func in groups and key == (acon_keys or [None])[0]:
+                cases.append((f"dispatch {command}", direct.handle, [command]))
+        if key == (acon_keys or [None])[0] and "ASTS" in groups:
+            cached = GaseraCommandDispatcher(controller, ResponseCache())
+            cases.append(("dispatch get_status cached", cached.handle, ["get_status"]))
+
+    for key in acon_keys:
+        cases.append((f"live payload {key}", acon_payload, replies[key]))
+        payloads = [acon_payload(r) for r in replies[key]]
+        cases.append((f"live json {key}", flask_json, payloads))
+
+    inlet_keys = [k for k in acon_keys if k.endswith("i")]
+    if inlet_keys:
+        store = ResultStore()
+        for key in inlet_keys:
+            for r in replies[key]:
+                store.add(parse_acon_batch(r))
+        first = store.inlets()[:1]
+        cases.append(("history series all inlets", lambda _: store.series(), [None]))
+        cases.append(("history series one inlet", lambda _: store.series(inlets=first), [None]))
+    return cases
+
+# ---- Baselines ---------------------------------------------------------------
+
+def host_info() -> dict:
+    return {"platform": platform.platform(), "machine": platform.machine(),
+            "python": platform.python_version(), "implementation": platform.python_implementation()}
+
+def load_baseline(path: str) -> dict:
+    try:
+        with open(path, encoding="utf-8") as fh:
+            return json.load(fh)
+    except FileNotFoundError:
+        return {}
+
+def save_baseline(path: str, results: Dict[str, float], previous: dict, partial: bool) -> None:
+    merged = dict(previous.get("results", {})) if partial else {}
+    merged.update({k: round(v, 3) for k, v in results.items()})
+    doc = {"saved": datetime.now().isoformat(timespec="seconds"), "host": host_info(), "unit": "us/call",
+           "results": dict(sorted(merged.items()))}
+    with open(path, "w", encoding="utf-8") as fh:
+        json.dump(doc, fh, indent=2)
+        fh.write("\n")
+
+def main():
+    ap = argparse.ArgumentParser(description="Protocol / framing / dispatch / serialization micro-benchmarks")
+    ap.add_argument("-k", dest="match", default="", help="only cases whose name contains this")
+    ap.add_argument("--corpus", nargs="+", help="trace files (default: bench/corpus/*.trace)")
+    ap.add_argument("--min-time", type=float, default=0.05, help="seconds per timed run")
+    ap.add_argument("--repeat", type=int, default=5)
+    ap.add_argument("--baseline", default=BASELINE_PATH)
+    ap.add_argument("--save", action="store_true", help="store this run as the baseline")
+    ap.add_argument("--fail-over", type=float, metavar="PCT", help="exit 1 if a case is more than PCT %% slower")
+    args = ap.parse_args()
+
+    paths = args.corpus or sorted(glob.glob(os.path.join(CORPUS_DIR, "*.trace")))
+    if not paths:
+        sys.exit(f"no corpus traces (run python -m bench.make_corpus)")
+    cases = [c for c in build_cases(load_corpora(paths)) if args.match in c[0]]
+
+    baseline = load_baseline(args.baseline)
+    base = baseline.get("results", {})
+    if base and baseline.get("host") != host_info():
+        print(f"note: baseline was saved on {baseline.get('host')}; deltas are indicative only")
+
+    results = {}
+    regressions = []
+    print(f"{'case':<34}{'µs/call':>11}{'baseline':>11}{'delta':>9}")
+    for name, fn, inputs in cases:
+        us = results[name] = per_call_us(fn, inputs, args.min_time, args.repeat)
+        ref = base.get(name)
+        if ref:
+            delta = (us / ref - 1.0) * 100.0
+            flag = " !" if args.fail_over is not None and delta > args.fail_over else ""
+            if flag:
+                regressions.append(name)
+            print(f"{name:<34}{us:>11.2f}{ref:>11.2f}{delta:>+8.1f}%{flag}")
+        else:
+            print(f"{name:<34}{us:>11.2f}{'-':>11}{'':>9}")
+
+    if args.save:
+        save_baseline(args.baseline, results, baseline, partial=bool(args.match or args.corpus))
+        print(f"baseline written to {args.baseline}")
+    if regressions:
+        print(f"{len(regressions)} case(s) more than {args.fail_over:g} % slower than the baseline")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -2,5 +2,7 @@ from .controller import GaseraController
 from .dispatcher import GaseraCommandDispatcher
 from .protocol import GaseraProtocol
 from .tcp_client import GaseraTCPClient
+from .async_client import AsyncGaseraClient
+from .async_controller import AsyncGaseraController
 from .measurement import MeasurementController
 from .config import GASERA_IP_ADDRESS, GASERA_PORT_NUMBER
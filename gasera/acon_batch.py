@@ -0,0 +1,185 @@
+# acon_batch.py — columnar ACON results: shared timestamps, interned CAS ids, array('d') ppm, inlets
+
+from __future__ import annotations
+
+import sys
+import threading
+from array import array
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from .config import CAS_DETAILS, get_cas_details
+from .protocol import ACONRecord, ACONResult, acon_stride, inlet_label, tokenize
+
+class CasTable:
+    """
+    CAS number → small integer id, with the UI metadata of every id computed once.
+
+      • Known gases come from CAS_DETAILS / CAS_COLORS at startup; CAS numbers the
+        device reports that are not listed get an id (and get_cas_details()
+        defaults) the first time they are seen.
+      • ids are stable for the process lifetime, so columns of ids from different
+        batches can be compared and joined directly.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._ids: Dict[str, int] = {}
+        self.cas: List[str] = []  # id → CAS number (interned)
+        self.meta: List[dict] = []  # id → {cas, name, label, color} as served by /api/data/live
+        self._inlet_meta: Dict[Tuple[int, int], dict] = {}  # (inlet, id) → meta with the inlet in it
+        for cas in CAS_DETAILS:
+            self._add(cas)
+
+    def _add(self, cas: str) -> int:
+        cas = sys.intern(cas)
+        details = get_cas_details(cas)
+        # "name" has always carried the CAS number in the live payload
+        self.cas.append(cas)
+        self.meta.append({"cas": cas, "name": cas, "label": details["label"], "color": details["color"]})
+        self._ids[cas] = len(self.cas) - 1
+        return self._ids[cas]
+
+    def id(self, cas: str) -> int:
+        cid = self._ids.get(cas)
+        if cid is None:
+            with self._lock:
+                cid = self._ids.get(cas)
+                if cid is None:
+                    cid = self._add(cas)
+        return cid
+
+    def ids(self, cas_numbers: List[str]) -> array:
+        """array('H') of ids for a column of CAS numbers (new ones registered on the way)."""
+        try:
+            return array("H", list(map(self._ids.__getitem__, cas_numbers)))
+        except KeyError:
+            return array("H", list(map(self.id, cas_numbers)))
+
+    def label(self, cid: int, inlet: int = 0) -> str:
+        return self.inlet_meta(inlet, cid)["label"]
+
+    def inlet_meta(self, inlet: int, cid: int) -> dict:
+        """meta[cid] as one (inlet, gas) stream: label prefixed with the inlet, plus "inlet"; built once per pair."""
+        if not inlet:
+            return self.meta[cid]
+        m = self._inlet_meta.get((inlet, cid))
+        if m is None:
+            base = self.meta[cid]
+            m = self._inlet_meta[(inlet, cid)] = {**base, "label": inlet_label(inlet, base["label"]), "inlet": inlet}
+        return m
+
+cas_table = CasTable()
+
+class ACONBatch:
+    """
+    One ACON reply as parallel columns (row i = timestamps[i], cas_ids[i], ppm[i]).
+
+      • timestamps: array('q') epoch seconds; each distinct value is converted once.
+      • cas_ids: array('H') ids into cas_table; ppm: array('d').
+      • inlets: array('H') sampler inlet per row when the reply has the inlet
+        column (SCON 4th bit), else None. Each inlet carries its own last result,
+        so rows of different inlets have different timestamps; by_inlet() splits
+        a reply into one batch per inlet.
+      • No per-gas objects: a reply with hundreds of values is a few flat arrays.
+    This is what the live endpoint, the result store and the CSV export consume;
+    to_result() gives the ACONResult view for code that wants records.
+    """
+    __slots__ = ("error", "timestamps", "cas_ids", "ppm", "inlets")
+
+    def __init__(self, error: bool, timestamps: array, cas_ids: array, ppm: array,
+                 inlets: Optional[array] = None):
+        self.error = error
+        self.timestamps = timestamps
+        self.cas_ids = cas_ids
+        self.ppm = ppm
+        self.inlets = inlets
+
+    @classmethod
+    def empty(cls, error: bool = False) -> "ACONBatch":
+        return cls(error, array("q"), array("H"), array("d"))
+
+    @classmethod
+    def from_fields(cls, status: str, f: List[str], table: CasTable = cas_table) -> "ACONBatch":
+        """Decode the fields after the status token: (timestamp, CAS, ppm[, inlet]) records."""
+        if status != '0':
+            return cls.empty(error=True)
+        k = acon_stride(f)
+        n = len(f) - len(f) % k  # an incomplete tail is ignored
+        stamps = f[0:n:k]
+        epoch = dict.fromkeys(stamps)
+        if len(epoch) == 1:  # the usual case: one measurement moment for every row
+            timestamps = array("q", [int(stamps[0])]) * len(stamps)
+        else:
+            for t in epoch:
+                epoch[t] = int(t)
+            timestamps = array("q", list(map(epoch.__getitem__, stamps)))
+        # array(list) is a bulk copy; array(iterator) appends item by item
+        inlets = array("H", list(map(int, f[3:n:k]))) if k == 4 else None
+        return cls(False, timestamps, table.ids(f[1:n:k]), array("d", list(map(float, f[2:n:k]))), inlets)
+
+    def __len__(self) -> int:
+        return len(self.ppm)
+
+    @property
+    def timestamp(self) -> Optional[int]:
+        """The reply's measurement moment: the newest row when several inlets are in it."""
+        if not self.timestamps:
+            return None
+        return self.timestamps[0] if self.inlets is None else max(self.timestamps)
+
+    def by_inlet(self) -> List[Tuple[int, "ACONBatch"]]:
+        """(inlet, that inlet's rows as a batch) in order of appearance; [(0, self)] without inlets."""
+        inlets = self.inlets
+        if inlets is None or not inlets:
+            return [(0, self)]
+        if inlets.count(inlets[0]) == len(inlets):
+            return [(inlets[0], self)]
+        rows: Dict[int, List[int]] = {}
+        for i, inlet in enumerate(inlets):
+            rows.setdefault(inlet, []).append(i)
+        t, c, p = self.timestamps, self.cas_ids, self.ppm
+        return [(inlet, ACONBatch(False, array("q", [t[i] for i in idx]), array("H", [c[i] for i in idx]),
+                                  array("d", [p[i] for i in idx]), array("H", [inlet]) * len(idx)))
+                for inlet, idx in rows.items()]
+
+    @property
+    def readable_time(self) -> Optional[str]:
+        ts = self.timestamp
+        return datetime.fromtimestamp(ts).strftime("%Y-%m-%d %H:%M:%S") if ts else None
+
+    def rows(self, table: CasTable = cas_table) -> Iterator[Tuple[int, str, float]]:
+        """(timestamp, CAS, ppm) per value."""
+        return zip(self.timestamps, map(table.cas.__getitem__, self.cas_ids), self.ppm)
+
+    def components(self, table: CasTable = cas_table) -> List[dict]:
+        """
+        Per-gas dicts for /api/data/live: the precomputed metadata plus this reply's ppm.
+        With inlets, one per (inlet, gas) with "inlet" and the row's own "timestamp".
+        """
+        if self.inlets is None:
+            meta = table.meta
+            return [{**meta[cid], "ppm": ppm} for cid, ppm in zip(self.cas_ids, self.ppm)]
+        meta = table.inlet_meta
+        return [{**meta(inlet, cid), "ppm": ppm, "timestamp": t}
+                for t, cid, ppm, inlet in zip(self.timestamps, self.cas_ids, self.ppm, self.inlets)]
+
+    def as_string(self, table: CasTable = cas_table) -> str:
+        if self.error:
+            return "Error retrieving measurement results."
+        if self.inlets is None:
+            lines = (f"{table.label(cid)}: {ppm:.4f} ppm" for cid, ppm in zip(self.cas_ids, self.ppm))
+        else:
+            lines = (f"{table.label(cid, inlet)}: {ppm:.4f} ppm"
+                     for cid, ppm, inlet in zip(self.cas_ids, self.ppm, self.inlets))
+        return f"Measurement Results ({self.readable_time}):\n" + "\n".join(lines)
+
+    def to_result(self, table: CasTable = cas_table) -> ACONResult:
+        inlets = self.inlets if self.inlets is not None else array("H", [0]) * len(self)
+        return ACONResult(self.error, [ACONRecord(t, cas, ppm, inlet)
+                                       for (t, cas, ppm), inlet in zip(self.rows(table), inlets)])
+
+def parse_acon_batch(response: str) -> ACONBatch:
+    """Framed ACON reply → ACONBatch (ValueError on bad framing, like the protocol parsers)."""
+    tokens = tokenize(response)
+    return ACONBatch.from_fields(tokens[1], tokens[2:])
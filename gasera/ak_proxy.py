@@ -0,0 +1,170 @@
+# ak_proxy.py — local raw-AK TCP port multiplexed onto GaseraWebUI's device scheduler
+
+from __future__ import annotations
+
+import socket
+import socketserver
+import threading
+from typing import Dict, Optional
+
+import system.log_utils as log
+from .commands import GASERA_COMMANDS
+from .config import GASERA_ASYNC_TRANSPORT, GASERA_PROXY_HOST, GASERA_PROXY_PORT
+from .controller import GaseraController, WRITE_COMMANDS
+from .framing import FrameDecoder
+from .metrics import metrics
+from .protocol import STX, ETX
+from .response_cache import ResponseCache
+
+CLIENT_IDLE_TIMEOUT = 300.0  # seconds without a request before a proxy client is dropped
+
+PROXY_REQUESTS = metrics.counter("gasera_proxy_requests_total", "AK requests received on the proxy port", ("func",))
+PROXY_CACHE_HITS = metrics.counter("gasera_proxy_cache_hits_total", "Proxy requests answered from the cache", ("func",))
+PROXY_ERRORS = metrics.counter("gasera_proxy_errors_total", "Proxy requests answered with a synthetic error frame", ("func",))
+
+def _read_only_ttls() -> Dict[str, float]:
+    """Per-function cache TTL for read-only commands: the shortest console cooldown using it."""
+    ttls: Dict[str, float] = {}
+    for meta in GASERA_COMMANDS.values():
+        func, ttl = meta.get("ak"), meta.get("cooldown", 0)
+        if func and ttl > 0 and func not in WRITE_COMMANDS:
+            ttls[func] = min(ttl, ttls.get(func, ttl))
+    return ttls
+
+class AKProxyServer:
+    """
+    Raw AK-protocol TCP endpoint for third-party tools (vendor software, scripts).
+
+      • Clients speak plain STX..ETX framing, one request at a time per connection,
+        exactly as they would to the analyzer.
+      • Requests are normalised through GaseraProtocol.build_command() and sent with
+        the controller's send_frame(), i.e. the same lane scheduler, single-flight,
+        circuit breaker and write invalidation as the web UI; they never race it.
+      • Read-only functions with a console cooldown are answered from the shared
+        ResponseCache for that long; any write (from anyone) invalidates it.
+      • If the device does not answer, the client gets "<STX> FUNC 1<ETX>" (error
+        status) instead of hanging until its own timeout.
+    """
+
+    def __init__(self, controller: GaseraController, host: str = "127.0.0.1", port: int = 8889,
+                 cache: Optional[ResponseCache] = None):
+        self.controller = controller
+        self.host = host
+        self.port = port
+        self.cache = cache or controller.cache
+        self.ttls = _read_only_ttls()
+        self.clients = 0
+        self._clients_lock = threading.Lock()
+        self._server: Optional[socketserver.ThreadingTCPServer] = None
+        self._thread: Optional[threading.Thread] = None
+
+    # ---- Lifecycle -----------------------------------------------------------
+
+    def start(self) -> None:
+        if self._thread and self._thread.is_alive():
+            return  # already running
+        proxy = self
+
+        class Handler(socketserver.BaseRequestHandler):
+            def handle(self):
+                proxy._serve_client(self.request, self.client_address)
+
+        socketserver.ThreadingTCPServer.allow_reuse_address = True
+        self._server = socketserver.ThreadingTCPServer((self.host, self.port), Handler)
+        self._server.daemon_threads = True
+        self.port = self._server.server_address[1]
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True, name="gasera-ak-proxy")
+        self._thread.start()
+        log.info(f"AK proxy listening on {self.host}:{self.port}")
+
+    def stop(self) -> None:
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    # ---- Per-client loop -----------------------------------------------------
+
+    def _serve_client(self, sock: socket.socket, addr) -> None:
+        with self._clients_lock:
+            self.clients += 1
+        log.debug(f"AK proxy client connected: {addr[0]}:{addr[1]}")
+        dec = FrameDecoder()
+        sock.settimeout(CLIENT_IDLE_TIMEOUT)
+        try:
+            while True:
+                try:
+                    n = dec.recv_into(sock)
+                except (socket.timeout, OSError):
+                    break
+                if not n:
+                    break
+                for frame in dec.frames():
+                    sock.sendall(self.forward(frame).encode("ascii", errors="ignore"))
+        except OSError as e:
+            log.debug(f"AK proxy client {addr[0]}:{addr[1]} dropped: {e}")
+        finally:
+            with self._clients_lock:
+                self.clients -= 1
+            try:
+                sock.close()
+            except OSError:
+                pass
+
+    # ---- Forwarding ----------------------------------------------------------
+
+    def forward(self, frame: str) -> str:
+        """One framed client request → one framed response."""
+        body = frame[1:-1].split()
+        if not body:
+            return f"{STX} ? 1{ETX}"
+        func = body[0].upper()
+        data = body[2:] if len(body) > 1 and body[1].upper().startswith("K") else body[1:]
+        cmd = self.controller.proto.build_command(func, " ".join(data))
+        PROXY_REQUESTS.inc(func)
+
+        ttl = self.ttls.get(func, 0)
+        if ttl > 0:
+            hit = [True]
+
+            def fetch():
+                hit[0] = False
+                resp = self.controller.send_frame(cmd)
+                return {"frame": resp} if resp is not None else None
+
+            wrapped = self.cache.get_or_fetch(("ak", cmd), ttl, fetch)
+            resp = wrapped["frame"] if wrapped else None
+            if resp is not None and hit[0]:
+                PROXY_CACHE_HITS.inc(func)
+        else:
+            resp = self.controller.send_frame(cmd)
+
+        if resp is None:
+            PROXY_ERRORS.inc(func)
+            return f"{STX} {func} 1{ETX}"
+        return resp
+
+    def stats(self) -> dict:
+        return {
+            "listening": f"{self.host}:{self.port}" if self._server else None,
+            "clients": self.clients,
+        }
+
+ak_proxy: Optional[AKProxyServer] = None
+
+def start_ak_proxy() -> Optional[AKProxyServer]:
+    """Start the proxy when GASERA_PROXY_PORT is configured (off by default)."""
+    global ak_proxy
+    if not GASERA_PROXY_PORT:
+        return None
+    if ak_proxy is None:
+        from .controller import gasera
+        if GASERA_ASYNC_TRANSPORT:
+            from .controller_facade import gasera_async as gasera
+        ak_proxy = AKProxyServer(gasera, GASERA_PROXY_HOST, GASERA_PROXY_PORT)
+    try:
+        ak_proxy.start()
+    except OSError as e:
+        log.error(f"AK proxy failed to start on {GASERA_PROXY_HOST}:{GASERA_PROXY_PORT}: {e}")
+        return None
+    return ak_proxy
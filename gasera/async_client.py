@@ -0,0 +1,417 @@
+# async_client.py — asyncio Gasera transport (same framing/timeouts as tcp_client)
+
+from __future__ import annotations
+
+import asyncio
+import heapq
+import itertools
+import random
+import time
+from contextlib import asynccontextmanager
+from typing import Awaitable, Callable, List, Optional, Sequence
+
+import system.log_utils as log
+from .circuit_breaker import CircuitBreaker
+from .framing import FrameDecoder
+from .protocol import GaseraProtocol, encode_frame
+from .rtt import RttTracker
+from .scheduler import CONTROL_COMMANDS
+from .trace import TraceRecorder
+from .tcp_client import MIN_IO_RTO_S, MIN_CONNECT_RTO_S, DRAIN_WINDOW_S
+from . import metrics as m
+
+class _PriorityLock:
+    """asyncio lock handed to the waiter with the lowest (priority, arrival) on release."""
+
+    def __init__(self):
+        self._held = False
+        self._waiters: list = []  # heap of (priority, seq, future)
+        self._seq = itertools.count()
+
+    @asynccontextmanager
+    async def hold(self, priority: int):
+        await self._acquire(priority)
+        try:
+            yield
+        finally:
+            self._release()
+
+    async def _acquire(self, priority: int) -> None:
+        if not self._held and not self._waiters:
+            self._held = True
+            return
+        fut = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (priority, next(self._seq), fut))
+        try:
+            await fut
+        except asyncio.CancelledError:
+            if fut.done() and not fut.cancelled():
+                self._release()  # handed over just as we were cancelled: pass it on
+            raise
+
+    def _release(self) -> None:
+        while self._waiters:
+            _, _, fut = heapq.heappop(self._waiters)
+            if not fut.done():
+                fut.set_result(True)  # ownership moves straight to the next waiter
+                return
+        self._held = False
+
+class AsyncGaseraClient:
+    """
+    asyncio counterpart of GaseraTCPClient.
+
+      • send_command() / send_batch() are coroutines; callers waiting for the device
+        queue on one lock, so a pending request costs a coroutine, not a thread.
+        Control commands (STAM/STAT/STPM/RDEV) are served before anything else
+        queued; measurement and UI traffic share FIFO order (no lanes here).
+      • With a CircuitBreaker, admits() refuses everything but control commands
+        while it is open; every exchange feeds it. monitor_link() is the
+        LinkMonitor equivalent: one ASTS after idle_after s without traffic, or
+        on the breaker's backoff schedule while it is open.
+      • Same wire behaviour as the blocking client: drain → send → newest full
+        STX..ETX frame via FrameDecoder, one retry, optional persistent session,
+        adaptive per-function timeouts (RttTracker), trace recording and metrics.
+      • Link state and on_connection_change follow exchange outcomes (debounced).
+
+    Bind it to a single event loop (see controller_facade.py for the loop thread).
+    """
+
+    def __init__(
+        self,
+        host: str,
+        port: int,
+        connect_timeout: float = 2.0,
+        io_timeout: float = 2.0,
+        *,
+        on_connection_change: Optional[Callable[[bool], None]] = None,
+        verbose: bool = False,
+        persistent: bool = False,
+        adaptive: bool = True,
+        breaker: Optional[CircuitBreaker] = None,
+        idle_after: float = 15.0,
+    ):
+        self.host = host
+        self.port = port
+        self.connect_timeout = connect_timeout
+        self.io_timeout = io_timeout
+        self.verbose = verbose
+        self.persistent = persistent
+        self.adaptive = adaptive
+        self.breaker = breaker
+        self.idle_after = idle_after
+        self.fast_failed = 0  # commands refused while the circuit was open
+        self.rtt = RttTracker(io_timeout + 0.5, MIN_IO_RTO_S, 2 * io_timeout + 0.5)
+        self.connect_rtt = RttTracker(connect_timeout, MIN_CONNECT_RTO_S, connect_timeout)
+
+        # Callbacks
+        self.on_connection_change = on_connection_change
+        self.on_status_change: Optional[Callable[[object], None]] = None  # compat (ASTS result)
+
+        # Internals
+        self._reader: Optional[asyncio.StreamReader] = None
+        self._writer: Optional[asyncio.StreamWriter] = None
+        self._lock = _PriorityLock()
+        self._decoder = FrameDecoder()
+        self._connected = False
+        self.last_activity = 0.0
+        self.recorder: Optional[TraceRecorder] = None
+        self._func = "?"
+        self._t_sent = 0.0
+        self._last_probe = 0.0
+        self._probe_cmd = GaseraProtocol().build_command("ASTS")
+
+    # ---- Link state -----------------------------------------------------------
+
+    def _flip_connected(self, new_state: bool) -> None:
+        if self._connected == new_state:
+            return
+        self._connected = new_state
+        cb = self.on_connection_change
+        if cb:
+            try:
+                cb(new_state)
+            except Exception as e:
+                log.error(f"on_connection_change callback error: {e}")
+
+    def is_connected(self) -> bool:
+        return self._connected
+
+    def report_link(self, ok: bool) -> None:
+        self._flip_connected(ok)
+
+    async def is_online(self, timeout: float = 1.0) -> bool:
+        try:
+            _, writer = await asyncio.wait_for(asyncio.open_connection(self.host, self.port), timeout)
+        except (asyncio.TimeoutError, OSError):
+            return False
+        writer.close()
+        return True
+
+    def rtt_stats(self) -> dict:
+        return {"adaptive": self.adaptive, "connect": self.connect_rtt.snapshot().get("connect"),
+                "functions": self.rtt.snapshot()}
+
+    # ---- Connection -----------------------------------------------------------
+
+    async def connect(self) -> bool:
+        await self.disconnect()
+        ct = self.connect_rtt.timeout("connect") if self.adaptive else self.connect_timeout
+        t0 = time.monotonic()
+        try:
+            self._reader, self._writer = await asyncio.wait_for(
+                asyncio.open_connection(self.host, self.port), ct)
+        except asyncio.TimeoutError:
+            self.connect_rtt.backoff("connect")
+            log.info(f"Connection failed: timed out after {ct:.2f}s")
+            m.LINK_CONNECT_FAILURES.inc(self._func)
+            return False
+        except OSError as e:
+            log.info(f"Connection failed: {e}")
+            m.LINK_CONNECT_FAILURES.inc(self._func)
+            return False
+        elapsed = time.monotonic() - t0
+        self.connect_rtt.sample("connect", elapsed)
+        m.LINK_CONNECT.observe(elapsed, self._func)
+        return True
+
+    async def disconnect(self) -> None:
+        writer, self._reader, self._writer = self._writer, None, None
+        if writer:
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except Exception:
+                pass
+
+    def _session_alive(self) -> bool:
+        return self._writer is not None and not self._writer.is_closing() and not self._reader.at_eof()
+
+    # ---- I/O ------------------------------------------------------------------
+
+    def _io_budget(self, func: str) -> float:
+        return self.rtt.timeout(func) if self.adaptive else self.io_timeout + 0.5
+
+    def _drain_window(self) -> float:
+        srtt = self.connect_rtt.srtt("connect") if self.adaptive else None
+        lo, hi = DRAIN_WINDOW_S
+        return hi if srtt is None else min(hi, max(lo, 2 * srtt))
+
+    async def _drain_stale_input(self) -> None:
+        end = time.monotonic() + self._drain_window()
+        drained = 0
+        while True:
+            remaining = end - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                data = await asyncio.wait_for(self._reader.read(4096), remaining)
+            except asyncio.TimeoutError:
+                break
+            if not data:
+                break
+            drained += len(data)
+        if drained:
+            m.LINK_DRAINED.inc(self._func, amount=drained)
+            log.debug(f"Drained {drained}B stale")
+
+    async def _recv_frame(self, budget: float) -> Optional[str]:
+        """Newest complete STX..ETX frame within budget seconds (None on timeout/EOF)."""
+        deadline = time.monotonic() + budget
+        dec = self._decoder
+        dec.reset()
+        func = self._func
+        latest: Optional[str] = None
+        dropped_bytes = 0
+        received = 0
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                data = await asyncio.wait_for(self._reader.read(4096), remaining)
+            except asyncio.TimeoutError:
+                break
+            except OSError as e:
+                log.info(f"recv OSError: {e}")
+                return None
+            if not data:
+                if dec.pending:
+                    log.info("Disconnected or empty chunk")
+                return None
+            if not received:
+                m.LINK_FIRST_BYTE.observe(time.monotonic() - self._t_sent, func)
+            received += len(data)
+            m.LINK_BYTES_RECEIVED.inc(func, amount=len(data))
+
+            dec.feed(data)
+            frames = dec.frames()
+            if frames:
+                dropped_bytes += sum(map(len, frames[:-1])) + (len(latest) if latest else 0)
+                latest = frames[-1]
+            if latest is not None and not dec.in_frame:
+                rtt = time.monotonic() - self._t_sent
+                self.rtt.sample(func, rtt)
+                m.LINK_FRAME.observe(rtt, func)
+                if dec.discarded + dropped_bytes:
+                    m.LINK_JUNK.inc(func, amount=dec.discarded + dropped_bytes)
+                return latest
+
+        m.LINK_TIMEOUTS.inc(func)
+        if budget >= self._io_budget(func):  # not cut short by a batch deadline
+            self.rtt.backoff(func)
+        log.info("Timeout waiting for ETX" if dec.pending else "Timeout with no data")
+        return None
+
+    async def _exchange(self, command: str, timeout: Optional[float] = None) -> Optional[str]:
+        await self._drain_stale_input()
+        payload = encode_frame(command)
+        self._t_sent = time.monotonic()
+        self._writer.write(payload)
+        await self._writer.drain()
+        m.LINK_BYTES_SENT.inc(self._func, amount=len(payload))
+        return await self._recv_frame(timeout or self._io_budget(self._func))
+
+    async def _observed(self, command: str, send: Callable[[str], Awaitable[Optional[str]]]) -> Optional[str]:
+        recorder = self.recorder
+        if recorder:
+            recorder.request(command)
+        self._func = command[2:6] or "?"
+        t0 = time.monotonic()
+        resp = await send(command)
+        m.LINK_EXCHANGE.observe(time.monotonic() - t0, self._func)
+        if resp is None:
+            m.LINK_FAILURES.inc(self._func)
+        if recorder:
+            recorder.response(resp)
+        self.last_activity = time.monotonic()
+        return resp
+
+    # ---- Breaker and idle probe -----------------------------------------------
+
+    @staticmethod
+    def _priority(commands: Sequence[str]) -> int:
+        return 0 if any(c[2:6] in CONTROL_COMMANDS for c in commands) else 1
+
+    def admits(self, commands: Sequence[str]) -> bool:
+        """False (and counted) while the breaker is open, unless a control command is among them."""
+        if self.breaker is None or self.breaker.allow() or self._priority(commands) == 0:
+            return True
+        self.fast_failed += 1
+        return False
+
+    def _record(self, ok: bool) -> None:
+        if self.breaker:
+            if ok:
+                self.breaker.record_success()
+            else:
+                self.breaker.record_failure()
+
+    async def probe_if_idle(self) -> bool:
+        """See LinkMonitor.probe_if_idle(); the ASTS bypasses admits() and reports like any exchange."""
+        breaker = self.breaker
+        if breaker and not breaker.allow():
+            if not breaker.probe_due():
+                return False
+        elif time.monotonic() - max(self.last_activity, self._last_probe) < self.idle_after:
+            return False
+        await self.send_command(self._probe_cmd)
+        self._last_probe = time.monotonic()
+        return True
+
+    async def monitor_link(self, poll_interval: float = 0.5) -> None:
+        """Run probe_if_idle() forever on this client's loop (the first probe goes out at once)."""
+        while True:
+            try:
+                await self.probe_if_idle()
+            except Exception as e:
+                log.error(f"Liveness probe failed: {e}")
+            await asyncio.sleep(poll_interval)
+
+    def link_snapshot(self) -> dict:
+        """Link state plus seconds since the last exchange or probe, from memory."""
+        last = max(self.last_activity, self._last_probe)
+        snap = {
+            "online": self._connected,
+            "checked_ago": round(time.monotonic() - last, 1) if last else None,
+        }
+        if self.breaker:
+            snap["circuit"] = self.breaker.snapshot()
+        return snap
+
+    # ---- Public API -----------------------------------------------------------
+
+    async def send_command(self, command: str) -> Optional[str]:
+        """One exchange with a single retry; returns the full framed response or None."""
+        async with self._lock.hold(self._priority([command])):
+            resp = await self._observed(command, self._send_locked)
+            self._flip_connected(resp is not None)
+        self._record(resp is not None)
+        return resp
+
+    async def send_batch(self, commands: Sequence[str], deadline: Optional[float] = None) -> List[Optional[str]]:
+        """Commands in order over one connection; stops at deadline (time.monotonic())."""
+        async with self._lock.hold(self._priority(commands)):
+            out: List[Optional[str]] = []
+            if not self.persistent:
+                await asyncio.sleep(random.uniform(0.0, 0.12))
+            try:
+                for command in commands:
+                    remaining = None if deadline is None else deadline - time.monotonic()
+                    if remaining is not None and remaining <= 0:
+                        break
+                    out.append(await self._observed(command, lambda c: self._attempt(c, remaining)))
+            finally:
+                if not self.persistent:
+                    await self.disconnect()
+            if out:
+                self._flip_connected(any(r is not None for r in out))
+        if out:
+            self._record(any(r is not None for r in out))
+        return out
+
+    async def _send_locked(self, command: str) -> Optional[str]:
+        if not self.persistent:
+            await asyncio.sleep(random.uniform(0.0, 0.12))  # de-phase from device internals
+        try:
+            for attempt in (1, 2):
+                if attempt == 2:
+                    m.LINK_RETRIES.inc(self._func)
+                resp = await self._attempt(command, None)
+                if resp is not None:
+                    return resp
+            return None
+        finally:
+            if not self.persistent:
+                await self.disconnect()
+
+    async def _attempt(self, command: str, remaining: Optional[float]) -> Optional[str]:
+        """Exchange on the current session, (re)connecting first if needed; drops the session on failure."""
+        if not self._session_alive() and not await self.connect():
+            return None
+        budget = self._io_budget(self._func)
+        try:
+            resp = await self._exchange(command, budget if remaining is None else min(budget, remaining))
+        except (ConnectionError, OSError) as e:
+            log.info(f"Communication error: {e}")
+            resp = None
+        if resp is None:
+            await self.disconnect()
+        return resp
+
+    # ---- Wire trace -----------------------------------------------------------
+
+    def start_trace(self, path: str) -> None:
+        recorder = TraceRecorder(path, header=f"host={self.host}:{self.port} async")
+        old, self.recorder = self.recorder, recorder
+        if old:
+            old.close()
+        log.info(f"Wire trace started: {path}")
+
+    def stop_trace(self) -> Optional[str]:
+        recorder, self.recorder = self.recorder, None
+        if not recorder:
+            return None
+        recorder.close()
+        log.info(f"Wire trace stopped: {recorder.path} ({recorder.events} events)")
+        return recorder.path
@@ -0,0 +1,345 @@
+# async_controller.py — asyncio GaseraController over AsyncGaseraClient
+
+from __future__ import annotations
+
+import asyncio
+import time
+from typing import Awaitable, Callable, Dict, List, Optional, Sequence, Tuple
+
+from .protocol import GaseraProtocol, DeviceStatus, ErrorList, TaskList, ACONResult, MeasurementStatus, DeviceName, IterationNumber, NetworkSettings, DateTimeResult
+from .async_client import AsyncGaseraClient
+from .controller import (COALESCED_QUERIES, WRITE_COMMANDS, TaskIDs, BatchItem, BatchResult,
+                         acon_payload, build_batch, parse_batch, running_task, _func_code)
+from .acon_batch import ACONBatch, parse_acon_batch
+from .compact_acon import CompactAconFormat, FORMAT_COMMANDS
+from .device_metadata import DeviceMetadata, TaskTable, METADATA_QUERIES, WARM_QUERIES
+from .response_cache import ResponseCache, response_cache
+from .metrics import MetricsRegistry
+from .result_store import ResultStore, result_store
+import system.log_utils as log
+
+class AsyncGaseraController:
+    """
+    Coroutine version of GaseraController: same method names and return values,
+    same GaseraProtocol builders/parsers, over an AsyncGaseraClient.
+
+    Identical in-flight read-only queries (COALESCED_QUERIES) share one exchange,
+    so a burst of pollers waiting on ASTS/ACON costs one device round trip.
+    Write commands invalidate `cache` (the shared ResponseCache by default),
+    exactly like the threaded controller.
+    """
+
+    def __init__(self, client: AsyncGaseraClient, results: Optional[ResultStore] = None,
+                 cache: Optional[ResponseCache] = None, compact: Optional[CompactAconFormat] = None,
+                 metadata: Optional[DeviceMetadata] = None, warm: bool = True):
+        self.proto = GaseraProtocol()
+        self.transport = client
+        self.results = result_store if results is None else results
+        self.cache = response_cache if cache is None else cache
+        self.compact = compact  # None = full ACON format
+        self.metadata = metadata or DeviceMetadata(TaskTable(TaskIDs.NAME_TO_ID))
+        self.warm = warm
+        self._warm_task: Optional[asyncio.Task] = None
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self._connection_listeners: List[Callable[[bool], None]] = []
+        self._exchange_listeners: List[Callable[[str, str], None]] = []
+        self.transport.on_connection_change = self._on_connection_change
+
+    def add_connection_listener(self, callback: Callable[[bool], None]) -> None:
+        self._connection_listeners.append(callback)
+
+    def add_exchange_listener(self, callback: Callable[[str, str], None]) -> None:
+        """See GaseraController.add_exchange_listener(); called on the loop thread."""
+        self._exchange_listeners.append(callback)
+
+    def _notify_exchange(self, func: str, resp: str) -> None:
+        for cb in self._exchange_listeners:
+            try:
+                cb(func, resp)
+            except Exception as e:
+                log.error(f"Exchange listener failed: {e}")
+
+    def _on_connection_change(self, online: bool) -> None:
+        if online:
+            log.info("Gasera is now online (async)")
+            if self.compact:
+                self.compact.invalidate()
+            self.metadata.invalidate("link came online")
+            if self.warm:
+                # called from the client's exchange on the loop; warm once it has finished
+                self._warm_task = asyncio.get_running_loop().create_task(self.warm_metadata())
+        else:
+            log.info("Gasera is now offline (async)")
+        for cb in self._connection_listeners:
+            try:
+                cb(online)
+            except Exception as e:
+                log.error(f"Connection listener failed: {e}")
+
+    async def _send(self, cmd: str) -> Optional[str]:
+        func = _func_code(cmd)
+        if func in METADATA_QUERIES:
+            cached = self.metadata.get(cmd)
+            if cached is not None:
+                return cached
+        generation = self.metadata.generation
+        resp = await self._exchange(cmd, func)
+        self.metadata.observe(cmd, resp, generation)
+        if resp is not None and self._exchange_listeners:
+            self._notify_exchange(func, resp)
+        return resp
+
+    async def send_frame(self, cmd: str) -> Optional[str]:
+        """See GaseraController.send_frame()."""
+        return await self._send(cmd)
+
+    def _before_write(self, func: str) -> None:
+        self.cache.invalidate()
+        if self.compact and func in FORMAT_COMMANDS:
+            self.compact.invalidate()
+        if func == "RDEV":
+            self.metadata.invalidate("RDEV")
+
+    async def _exchange(self, cmd: str, func: str) -> Optional[str]:
+        if not self.transport.admits([cmd]):
+            log.debug(f"{func} not sent: device offline (circuit open)")
+            return None
+        if func not in COALESCED_QUERIES and func not in METADATA_QUERIES:
+            if func in WRITE_COMMANDS:
+                self._before_write(func)
+            return await self.transport.send_command(cmd)
+        return await self._shared(cmd, lambda: self.transport.send_command(cmd))
+
+    async def _shared(self, key: str, start: Callable[[], Awaitable]):
+        """Await start() once for every concurrent caller with the same key."""
+        fut = self._inflight.get(key)
+        if fut is not None:
+            return await asyncio.shield(fut)
+        fut = asyncio.get_running_loop().create_future()
+        self._inflight[key] = fut
+        try:
+            result = await start()
+            fut.set_result(result)
+            return result
+        except BaseException as e:
+            fut.set_exception(e)
+            fut.exception()  # mark retrieved when nobody joined
+            raise
+        finally:
+            del self._inflight[key]
+
+    async def batch(self, items: Sequence[BatchItem], deadline: float = 5.0) -> List[BatchResult]:
+        """Ordered commands over one session; see GaseraController.batch()."""
+        funcs, cmds = build_batch(self.proto, items)
+        if not self.transport.admits(cmds):
+            log.debug(f"batch {'+'.join(funcs)} not sent: device offline (circuit open)")
+            return [BatchResult(func, "rejected") for func in funcs]
+        for func in set(funcs) & WRITE_COMMANDS:
+            self._before_write(func)
+        generation = self.metadata.generation
+        responses = await self.transport.send_batch(cmds, deadline=time.monotonic() + deadline)
+        for func, cmd, resp in zip(funcs, cmds, responses):
+            self.metadata.observe(cmd, resp, generation)
+            if resp is not None and self._exchange_listeners:
+                self._notify_exchange(func, resp)
+        return parse_batch(self.proto, funcs, responses)
+
+    async def warm_metadata(self) -> None:
+        """See GaseraController.warm_metadata()."""
+        results = await self.batch(WARM_QUERIES)
+        if any(r.func == "ATSK" and r.ok for r in results):
+            results += await self.batch([("ATSP", tid) for tid in self.metadata.tasks.ids()], deadline=10.0)
+        log.debug(f"Device metadata warmed: {sum(r.ok for r in results)}/{len(results)} answers (async)")
+
+    async def _known_task(self, ok: Callable[[TaskTable], bool]) -> bool:
+        tasks = self.metadata.tasks
+        if ok(tasks):
+            return True
+        self.metadata.forget(self.proto.ask_task_list())  # see GaseraController._known_task()
+        await self.get_task_list()
+        return ok(tasks)
+
+    def check_device_connection(self) -> bool:
+        return self.transport.is_connected()
+
+    def connection_status(self) -> dict:
+        return self.transport.link_snapshot()
+
+    def register_metrics(self, registry: MetricsRegistry) -> None:
+        """Export link, circuit breaker and metadata state at scrape time (see GaseraController)."""
+        client = self.transport
+        registry.gauge_func("gasera_link_online", "Last known analyzer link state (1 = online)",
+                            lambda: int(client.is_connected()))
+        registry.gauge_func("gasera_scheduler_fast_failed_total", "Commands refused while the circuit was open",
+                            lambda: client.fast_failed, kind="counter")
+        registry.gauge_func("gasera_rto_seconds", "Adaptive read timeout per AK function",
+                            lambda: {(k,): v["rto_ms"] / 1000.0 for k, v in client.rtt.snapshot().items()}, ("func",))
+        breaker = client.breaker
+        if breaker:
+            states = {"closed": 0, "half_open": 1, "open": 2}
+            registry.gauge_func("gasera_circuit_state", "Circuit breaker state (0 closed, 1 half-open, 2 open)",
+                                lambda: states.get(breaker.state, 2))
+            registry.gauge_func("gasera_circuit_opened_total", "Times the circuit breaker opened",
+                                lambda: breaker.opened_count, kind="counter")
+        registry.gauge_func("gasera_metadata_hits_total", "Metadata queries answered from the cache",
+                            lambda: self.metadata.hits, kind="counter")
+
+    async def _compact_ready(self) -> Optional[CompactAconFormat]:
+        compact = self.compact
+        if compact is None or compact.disabled or compact.suspended:
+            return None
+        for _ in range(2):  # see GaseraController._compact_ready()
+            items = compact.pending()
+            if not items or not compact.accept(await self.batch(items)):
+                break
+        return compact if compact.active else None
+
+    async def _fetch_acon(self) -> Tuple[Optional[str], Callable[[str], ACONBatch]]:
+        # see GaseraController._fetch_acon()
+        compact = await self._compact_ready()
+        command = self.proto.build_command("ACON")
+        if compact is None:
+            return await self._send(command), parse_acon_batch
+        return await self._shared("compact ACON", lambda: self._fetch_compact(compact, command))
+
+    async def _fetch_compact(self, compact: CompactAconFormat, command: str) -> Tuple[Optional[str], Callable[[str], ACONBatch]]:
+        resp = await self._send(command)
+        if resp is None:
+            return resp, parse_acon_batch
+        try:
+            batch = compact.parse(resp)
+        except ValueError as e:
+            log.info(f"Compact ACON: {e}; reading this result in the full format")
+            await self.batch(compact.restore())
+            resp = await self._send(command)
+            compact.rebuild(running_task(self.proto, self.metadata.tasks, resp))
+            return resp, parse_acon_batch
+        return resp, lambda _resp: batch
+
+    async def acon_proxy(self) -> dict:
+        resp, parse = await self._fetch_acon()
+        return acon_payload(resp, self.results, parse)
+
+    async def get_device_status(self) -> Optional[DeviceStatus]:
+        resp = await self._send(self.proto.ask_current_status())
+        if resp:
+            result = self.proto.parse_asts(resp)
+            if self.transport.on_status_change:
+                self.transport.on_status_change(result)
+            return result
+        return None
+
+    async def get_active_errors(self) -> Optional[ErrorList]:
+        resp = await self._send(self.proto.ask_active_errors())
+        return self.proto.parse_aerr(resp) if resp else None
+
+    async def get_task_list(self) -> Optional[TaskList]:
+        resp = await self._send(self.proto.ask_task_list())
+        return self.proto.parse_atsk(resp) if resp else None
+
+    async def start_measurement(self, task_id: Optional[str] = None) -> Optional[str]:
+        if not task_id:
+            task_id = TaskIDs.DEFAULT
+
+        if not await self._known_task(lambda t: task_id in t.ids()):
+            return f"[ERROR] Invalid task id (allowed: {', '.join(self.metadata.tasks.ids())})"
+
+        resp = await self._send(self.proto.start_measurement_by_id(task_id))
+        self._follow_task(resp, task_id)
+        return self.proto.parse_generic(resp, "STAM").as_string() if resp else "[ERROR] No response from device"
+
+    async def start_measurement_by_name(self, task_name: Optional[str] = None) -> Optional[str]:
+        if not task_name:
+            task_name = "DEFAULT"
+
+        if not await self._known_task(lambda t: task_name in t.names()):
+            return f"[ERROR] Invalid task name (allowed: {', '.join(self.metadata.tasks.names())})"
+
+        resp = await self._send(self.proto.start_measurement_by_name(task_name))
+        self._follow_task(resp, self.metadata.tasks.id_of(task_name))
+        return self.proto.parse_generic(resp, "STAT").as_string() if resp else "[ERROR] No response from device"
+
+    def _follow_task(self, resp: Optional[str], task_id: Optional[str]) -> None:
+        # see GaseraController._follow_task()
+        if self.compact and task_id and resp and not self.proto.parse_generic(resp, "START").error:
+            self.compact.follow_task(task_id)
+
+    async def stop_measurement(self) -> Optional[str]:
+        resp = await self._send(self.proto.stop_measurement())
+        return self.proto.parse_generic(resp, "STPM").as_string() if resp else None
+
+    async def get_last_results(self) -> Optional[ACONResult]:
+        resp, parse = await self._fetch_acon()
+        return parse(resp).to_result() if resp else None
+
+    async def get_measurement_status(self) -> Optional[MeasurementStatus]:
+        resp = await self._send(self.proto.get_measurement_status())
+        return self.proto.parse_amst(resp) if resp else None
+
+    async def get_device_name(self) -> Optional[DeviceName]:
+        resp = await self._send(self.proto.get_device_name())
+        return self.proto.parse_anam(resp) if resp else None
+
+    async def get_device_info(self) -> Optional[str]:
+        resp = await self._send(self.proto.get_device_info())
+        return self.proto.parse_adev(resp).as_string() if resp else None
+
+    async def get_iteration_number(self) -> Optional[IterationNumber]:
+        resp = await self._send(self.proto.get_iteration_number())
+        return self.proto.parse_aitr(resp) if resp else None
+
+    async def get_network_settings(self) -> Optional[NetworkSettings]:
+        resp = await self._send(self.proto.get_network_settings())
+        return self.proto.parse_anet(resp) if resp else None
+
+    async def get_device_time(self) -> Optional[DateTimeResult]:
+        resp = await self._send(self.proto.get_device_datetime())
+        return self.proto.parse_aclk(resp) if resp else None
+
+    async def set_component_order(self, cas_list: str) -> Optional[str]:
+        resp = await self._send(self.proto.set_component_order(cas_list))
+        return self.proto.parse_generic(resp, "SCOR").as_string() if resp else None
+
+    async def set_concentration_format(self, show_time: int, show_cas: int, show_conc: int, show_inlet: int = -1) -> Optional[str]:
+        resp = await self._send(self.proto.set_concentration_format(show_time, show_cas, show_conc, show_inlet))
+        return self.proto.parse_generic(resp, "SCON").as_string() if resp else None
+
+    async def set_network_settings(self, use_dhcp: int, ip: str, netmask: str, gw: str) -> Optional[str]:
+        resp = await self._send(self.proto.set_network_settings(use_dhcp, ip, netmask, gw))
+        return self.proto.parse_generic(resp, "SNET").as_string() if resp else None
+
+    async def get_parameter(self, name: str) -> Optional[str]:
+        resp = await self._send(self.proto.get_parameter(name))
+        return self.proto.parse_apar(resp).as_string() if resp else None
+
+    async def set_online_mode(self, enable: bool) -> Optional[str]:
+        resp = await self._send(self.proto.set_online_mode(enable))
+        return self.proto.parse_generic(resp, "SONL").as_string() if resp else None
+
+    async def set_laser_tuning_interval(self, interval: int) -> Optional[str]:
+        resp = await self._send(self.proto.set_laser_tuning_interval(interval))
+        return self.proto.parse_generic(resp, "STUN").as_string() if resp else None
+
+    async def get_task_parameters(self, task_id: int) -> Optional[str]:
+        resp = await self._send(self.proto.get_task_parameters(task_id))
+        return self.proto.parse_atsp(resp).as_string() if resp else None
+
+    async def get_system_parameters(self) -> Optional[str]:
+        resp = await self._send(self.proto.get_system_parameters())
+        return self.proto.parse_asyp(resp).as_string() if resp else None
+
+    async def get_sampler_parameters(self) -> Optional[str]:
+        resp = await self._send(self.proto.get_sampler_parameters())
+        return self.proto.parse_amps(resp).as_string() if resp else None
+
+    async def start_self_test(self) -> Optional[str]:
+        resp = await self._send(self.proto.start_self_test())
+        return self.proto.parse_generic(resp, "STST").as_string() if resp else None
+
+    async def get_self_test_result(self) -> Optional[str]:
+        resp = await self._send(self.proto.get_self_test_result())
+        return self.proto.parse_astr(resp).as_string() if resp else None
+
+    async def reboot_device(self) -> Optional[str]:
+        resp = await self._send(self.proto.reboot_device())
+        return self.proto.parse_generic(resp, "RDEV").as_string() if resp else None
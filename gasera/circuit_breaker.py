@@ -0,0 +1,88 @@
+# circuit_breaker.py — fail fast while the analyzer is known to be down
+
+from __future__ import annotations
+
+import random
+import threading
+import time
+from typing import Callable, Optional
+
+class CircuitBreaker:
+    """
+    Three-state breaker in front of the device link.
+
+      closed    → commands flow; failure_threshold consecutive failures open it
+                  (one slow reply is not an outage).
+      open      → commands are refused immediately; a background probe is due
+                  after the current backoff (base_backoff doubling up to max_backoff).
+      half_open → the probe is running; commands are still refused.
+    The first successful probe or exchange closes the breaker and resets the backoff.
+    on_open (attribute) is called, outside the lock, each time it trips from closed.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold: int = 3, base_backoff: float = 1.0, max_backoff: float = 60.0):
+        self.failure_threshold = failure_threshold
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+        self._lock = threading.Lock()
+        self.state = self.CLOSED
+        self.failures = 0
+        self._backoff = base_backoff
+        self._next_probe = 0.0
+        self.opened_count = 0
+        self.on_open: Optional[Callable[[], None]] = None
+
+    def allow(self) -> bool:
+        return self.state == self.CLOSED
+
+    def record_success(self) -> None:
+        with self._lock:
+            self.state = self.CLOSED
+            self.failures = 0
+            self._backoff = self.base_backoff
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self.failures += 1
+            if self.state == self.CLOSED and self.failures < self.failure_threshold:
+                return
+            tripped = self.state == self.CLOSED
+            if tripped:
+                self.opened_count += 1
+            else:
+                self._backoff = min(self.max_backoff, self._backoff * 2)  # failed probe: back off further
+            self.state = self.OPEN
+            # ±10 % jitter so a fleet of Pis doesn't probe in lockstep
+            self._next_probe = time.monotonic() + self._backoff * random.uniform(0.9, 1.1)
+        cb = self.on_open
+        if tripped and cb:
+            try:
+                cb()
+            except Exception:
+                pass
+
+    def probe_due(self) -> bool:
+        """True (and switches to half_open) when an open breaker should be probed now."""
+        with self._lock:
+            if self.state != self.OPEN or time.monotonic() < self._next_probe:
+                return False
+            self.state = self.HALF_OPEN
+            return True
+
+    def retry_in(self) -> Optional[float]:
+        if self.state == self.CLOSED:
+            return None
+        return max(0.0, self._next_probe - time.monotonic())
+
+    def snapshot(self) -> dict:
+        retry = self.retry_in()
+        return {
+            "state": self.state,
+            "failures": self.failures,
+            "retry_in": round(retry, 1) if retry is not None else None,
+            "opened_count": self.opened_count,
+        }
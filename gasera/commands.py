@@ -14,6 +14,7 @@ GASERA_COMMANDS = {
 		"show": True,
         "mock": "",
         "output_id": "get_status_output",
+        "ak": "ASTS",
         "handler": lambda g, a: g.get_device_status()
     },
     "get_tasks": {
@@ -30,6 +31,7 @@ GASERA_COMMANDS = {
 		"show": True,
         "mock": "",
         "output_id": "get_tasks_output",
+        "ak": "ATSK",
         "handler": lambda g, a: g.get_task_list()
     },
     "start_measurement": {
@@ -46,6 +48,7 @@ GASERA_COMMANDS = {
 		"show": True,
         "mock": "Started measurement ID",
         "output_id": "start_measurement_output",
+        "ak": "STAM",
         "handler": lambda g, a: g.start_measurement(a[0])
     },
     "start_measurement_by_name": {
@@ -62,6 +65,7 @@ GASERA_COMMANDS = {
 		"show": True,
         "mock": "",
         "output_id": "start_measurement_by_name_output",
+        "ak": "STAT",
         "handler": lambda g, a: g.start_measurement_by_name(a[0])
     },
     "stop_measurement": {
@@ -78,6 +82,7 @@ GASERA_COMMANDS = {
 		"show": True,
         "mock": "Stopped.",
         "output_id": "stop_measurement_output",
+        "ak": "STPM",
         "handler": lambda g, a: g.stop_measurement()
     },
     "get_results": {
@@ -94,6 +99,7 @@ GASERA_COMMANDS = {
 		"show": True,
         "mock": "",
         "output_id": "get_results_output",
+        "ak": "ACON",
         "handler": lambda g, a: g.get_last_results()
     },
     "get_phase": {
@@ -110,6 +116,7 @@ GASERA_COMMANDS = {
 		"show": True,
         "mock": "",
         "output_id": "get_phase_output",
+        "ak": "AMST",
         "handler": lambda g, a: g.get_measurement_status()
     },
     "get_iteration": {
@@ -126,6 +133,7 @@ GASERA_COMMANDS = {
 		"show": True,
         "mock": "",
         "output_id": "get_iteration_output",
+        "ak": "AITR",
         "handler": lambda g, a: g.get_iteration_number()
     },
 # --- Network ---
@@ -143,6 +151,7 @@ GASERA_COMMANDS = {
 		"show": True,
         "mock": "",
         "output_id": "get_name_output",
+        "ak": "ANAM",
         "handler": lambda g, a: g.get_device_name()
     },
     "get_net": {
@@ -159,6 +168,7 @@ GASERA_COMMANDS = {
 		"show": True,
         "mock": "",
         "output_id": "get_net_output",
+        "ak": "ANET",
         "handler": lambda g, a: g.get_network_settings()
     },
     "set_net": {
@@ -175,6 +185,7 @@ GASERA_COMMANDS = {
 		"show": False,
         "mock": "",
         "output_id": "set_net_output",
+        "ak": "SNET",
         "handler": lambda g, a: g.set_network_settings(int(a[0]), a[1], a[2], a[3])
     },
     "get_time": {
@@ -191,6 +202,7 @@ GASERA_COMMANDS = {
 		"show": True,
         "mock": "",
         "output_id": "get_time_output",
+        "ak": "ACLK",
         "handler": lambda g, a: g.get_device_time()
     },
     "set_online_enabled": {
@@ -207,6 +219,7 @@ GASERA_COMMANDS = {
 		"show": True,
         "mock": "Online mode enabled.",
         "output_id": "set_online_output",
+        "ak": "SONL",
         "handler": lambda g, a: g.set_online_mode(True)
     },
     "set_online_disabled": {
@@ -223,6 +236,7 @@ GASERA_COMMANDS = {
 		"show": True,
         "mock": "Online mode disabled.",
         "output_id": "set_online_output",
+        "ak": "SONL",
         "handler": lambda g, a: g.set_online_mode(False)
     },
     "reboot": {
@@ -239,6 +253,7 @@ GASERA_COMMANDS = {
 		"show": True,
         "mock": "Simulated reboot done.",
         "output_id": "reboot_output",
+        "ak": "RDEV",
         "handler": lambda g, a: g.reboot_device()
     },
 # --- Parameters ---
@@ -256,6 +271,7 @@ GASERA_COMMANDS = {
 		"show": True,
         "mock": "",
         "output_id": "get_param_output",
+        "ak": "APAR",
         "handler": lambda g, a: g.get_parameter(a[0])
     },
     "set_laser_tune": {
@@ -272,6 +288,7 @@ GASERA_COMMANDS = {
 		"show": True,
         "mock": "",
         "output_id": "set_laser_tune_output",
+        "ak": "STUN",
         "handler": lambda g, a: g.set_laser_tuning_interval(int(a[0]))
     },
     "get_task_params": {
@@ -288,6 +305,7 @@ GASERA_COMMANDS = {
 		"show": True,
         "mock": "",
         "output_id": "get_task_params_output",
+        "ak": "ATSP",
         "handler": lambda g, a: g.get_task_parameters(int(a[0]))
     },
     "get_sys_params": {
@@ -304,6 +322,7 @@ GASERA_COMMANDS = {
 		"show": True,
         "mock": "",
         "output_id": "get_sys_params_output",
+        "ak": "ASYP",
         "handler": lambda g, a: g.get_system_parameters()
     },
     "get_sampler_params": {
@@ -320,6 +339,7 @@ GASERA_COMMANDS = {
 		"show": True,
         "mock": "",
         "output_id": "get_sampler_params_output",
+        "ak": "AMPS",
         "handler": lambda g, a: g.get_sampler_parameters()
     },
     "set_component_order": {
@@ -336,6 +356,7 @@ GASERA_COMMANDS = {
 		"show": True,
         "mock": "",
         "output_id": "set_component_order_output",
+        "ak": "SCOR",
         "handler": lambda g, a: g.set_component_order(' '.join(a))
     },
     "set_conc_format": {
@@ -352,6 +373,7 @@ GASERA_COMMANDS = {
 		"show": True,
         "mock": "",
         "output_id": "set_conc_format_output",
+        "ak": "SCON",
         "handler": lambda g, a: g.set_concentration_format(int(a[0]), int(a[1]), int(a[2]), int(a[3]) if len(a) > 3 else -1)
     },
 # --- System ---
@@ -369,6 +391,7 @@ GASERA_COMMANDS = {
 		"show": True,
         "mock": "",
         "output_id": "get_errors_output",
+        "ak": "AERR",
         "handler": lambda g, a: g.get_active_errors()
     },
     "get_device_info": {
@@ -385,6 +408,7 @@ GASERA_COMMANDS = {
 		"show": True,
         "mock": "",
         "output_id": "get_device_info_output",
+        "ak": "ADEV",
         "handler": lambda g, a: g.get_device_info()
     },
     "start_selftest": {
@@ -401,6 +425,7 @@ GASERA_COMMANDS = {
 		"show": True,
         "mock": "Test started.",
         "output_id": "start_selftest_output",
+        "ak": "STST",
         "handler": lambda g, a: g.start_self_test()
     },
     "get_selftest": {
@@ -417,6 +442,7 @@ GASERA_COMMANDS = {
 		"show": True,
         "mock": "",
         "output_id": "get_selftest_output",
+        "ak": "ASTR",
         "handler": lambda g, a: g.get_self_test_result()
     }
 }
\ No newline at end of file
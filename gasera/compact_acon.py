@@ -0,0 +1,194 @@
+# compact_acon.py — negotiated concentration-only ACON replies (SCOR order + SCON format)
+
+from __future__ import annotations
+
+import threading
+import time
+from array import array
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import system.log_utils as log
+from .acon_batch import ACONBatch, CasTable, cas_table
+from .config import GASERA_COMPACT_ACON, GASERA_COMPACT_ACON_INLET, GASERA_COMPACT_ACON_ORDER, GASERA_COMPACT_ACON_TIME
+from .protocol import tokenize
+
+# Commands that change (or, for RDEV, reset) the device's ACON layout
+FORMAT_COMMANDS = {"SCOR", "SCON", "RDEV"}
+
+class CompactAconFormat:
+    """
+    Schema for ACON replies without CAS codes.
+
+      • The device is told the component order (SCOR) and to drop CAS codes, and
+        optionally timestamps (SCON <time> 0 1), so each gas costs one number.
+      • Both settings are lost when the device reboots: invalidate() on reconnect,
+        RDEV or a SCOR/SCON from anyone else; the controller re-applies them before
+        the next ACON (pending() / accept()).
+      • parse() maps the values onto the cached CAS id column. With the time bit
+        the first timestamp stands for the whole reply (for each inlet's rows);
+        without it, rows are stamped with host time when their values change.
+      • with_inlet adds the inlet column (SCON 4th bit): the reply then holds
+        every component once per sampler inlet, each inlet with its own result.
+      • order=None takes the CAS list of task_id (ATSP) on first use. A device that
+        refuses SCOR/SCON (older MW) disables compact mode for the process.
+      • A reply that does not fit the schema (another task with other gases is
+        running) is a mismatch, counted once per reply however many pollers share
+        it: the controller puts the device back into the full format (restore()),
+        reads that poll in full and rebuild()s the schema from ATSP of the task
+        that reply belongs to. When that task is unknown, or mismatch_limit
+        mismatches come in a row, compact mode is suspended until follow_task()
+        (a measurement started through the controller), not for good.
+    """
+
+    def __init__(self, order: Optional[Sequence[str]] = None, with_time: bool = True,
+                 task_id: str = "11", table: CasTable = cas_table, with_inlet: bool = False,
+                 mismatch_limit: int = 2):
+        self.with_time = with_time
+        self.with_inlet = with_inlet
+        self.task_id = task_id
+        self.table = table
+        self.order: Optional[List[str]] = None
+        self.cas_ids: Optional[array] = None
+        self.active = False  # device known to be in our layout
+        self.disabled = False  # the device refused SCOR/SCON
+        self.suspended = False  # no schema fits the running task; until follow_task()
+        self.mismatch_limit = mismatch_limit
+        self.mismatches = 0  # in a row
+        self._lock = threading.Lock()
+        self._last: Dict[int, Tuple[array, int]] = {}  # inlet → (ppm, host stamp) of its last values
+        self._configured = (task_id, list(order) if order else None)
+        if order:
+            self._set_order(order)
+
+    def _set_order(self, order: Sequence[str]) -> None:
+        self.order = list(order)
+        self.cas_ids = self.table.ids(self.order)
+
+    # ---- Negotiation ---------------------------------------------------------
+
+    def invalidate(self) -> None:
+        if self.active:
+            log.debug("Compact ACON: format must be re-applied")
+        self.active = False
+
+    def pending(self) -> List[tuple]:
+        """Batch items still needed before ACON replies are compact ([] when ready or disabled)."""
+        if self.active or self.disabled or self.suspended:
+            return []
+        if self.order is None:
+            return [("ATSP", self.task_id)]
+        bits = (int(self.with_time), 0, 1) + ((1,) if self.with_inlet else ())
+        return [("SCOR", *self.order), ("SCON", *bits)]
+
+    def accept(self, results) -> bool:
+        """Take the BatchResults of pending(); False when the device did not answer."""
+        for r in results:
+            if r.status in ("no_response", "deadline", "rejected"):
+                return False
+            if r.func == "ATSP":
+                if r.ok and r.result.cas_list and r.result.cas_list != ["-"]:
+                    self._set_order(r.result.cas_list)
+                else:
+                    self._disable(f"no component list for task {self.task_id}")
+                    return False
+            elif not r.ok:
+                self._disable(f"{r.func} refused by the device")
+                return False
+        if results and results[-1].func == "SCON":
+            with self._lock:
+                self._last.clear()
+            self.active = True
+            log.info(f"Compact ACON: {len(self.order)} components, "
+                     f"{'with' if self.with_time else 'without'} timestamps"
+                     f"{', per inlet' if self.with_inlet else ''}")
+        return True
+
+    def restore(self) -> List[tuple]:
+        """Batch items that put the device back into the full ACON format."""
+        return [("SCON", 1, 1, 1) + ((1,) if self.with_inlet else ())]
+
+    def _disable(self, reason: str) -> None:
+        self.disabled = True
+        log.warn(f"Compact ACON disabled: {reason}; using the full ACON format")
+
+    def _mismatch(self, reason: str) -> ValueError:
+        with self._lock:
+            if self.active:  # the first poller to see this reply counts it
+                self.active = False
+                self.mismatches += 1
+        return ValueError(reason)
+
+    def rebuild(self, task_id: Optional[str]) -> None:
+        """After a mismatch: take the order from ATSP of task_id (the running task) on the next poll."""
+        if task_id is None or self.mismatches >= self.mismatch_limit:
+            why = "running task unknown" if task_id is None else f"{self.mismatches} replies in a row did not fit"
+            if not self.suspended:
+                log.info(f"Compact ACON suspended ({why}) until a measurement is started here")
+            self.suspended = True
+            return
+        if task_id != self.task_id:
+            log.info(f"Compact ACON: rebuilding the schema for task {task_id}")
+        self.task_id = task_id
+        self.order = None  # pending() asks ATSP again
+
+    def follow_task(self, task_id: str) -> None:
+        """A measurement of task_id was started: negotiate its schema before the next ACON."""
+        if self.disabled:
+            return
+        configured_task, configured_order = self._configured
+        if task_id != self.task_id or self.suspended:
+            self.invalidate()
+            self.task_id = task_id
+            if task_id == configured_task and configured_order:
+                self._set_order(configured_order)
+            else:
+                self.order = None
+        self.suspended = False
+        self.mismatches = 0
+
+    # ---- Decoding ------------------------------------------------------------
+
+    def parse(self, response: str) -> ACONBatch:
+        """Compact ACON reply → ACONBatch; ValueError (a mismatch, see above) if it does not fit the schema."""
+        tokens = tokenize(response)
+        if tokens[1] != '0':
+            return ACONBatch.empty(error=True)
+        f = tokens[2:]
+        if not f:
+            return ACONBatch.empty()
+        n = len(self.cas_ids)
+        if not self.with_inlet:
+            values = f[1::2] if self.with_time else f
+            if len(values) != n or (self.with_time and len(f) != 2 * n):
+                raise self._mismatch(f"compact ACON reply has {len(f)} fields for {n} components")
+            self.mismatches = 0
+            ppm = array("d", list(map(float, values)))
+            stamp = int(f[0]) if self.with_time else self._host_stamp(0, ppm)
+            return ACONBatch(False, array("q", [stamp]) * n, self.cas_ids, ppm)
+        k = 2 + self.with_time  # [time] ppm inlet
+        rows = len(f) // k
+        if len(f) % k or rows % n:
+            raise self._mismatch(f"compact ACON reply has {len(f)} fields for {n} components per inlet")
+        self.mismatches = 0
+        ppm = array("d", list(map(float, f[self.with_time::k])))
+        inlets = array("H", list(map(int, f[k - 1::k])))
+        timestamps = array("q")
+        for i in range(0, rows, n):  # one block of n rows per inlet
+            stamp = int(f[i * k]) if self.with_time else self._host_stamp(inlets[i], ppm[i:i + n])
+            timestamps.extend(array("q", [stamp]) * n)
+        return ACONBatch(False, timestamps, self.cas_ids * (rows // n), ppm, inlets)
+
+    def _host_stamp(self, inlet: int, ppm: array) -> int:
+        # repeated polls of one result must keep one timestamp (history/chart dedupe by it)
+        with self._lock:
+            last = self._last.get(inlet)
+            if last is None or ppm != last[0]:
+                last = self._last[inlet] = (ppm, int(time.time()))
+            return last[1]
+
+def compact_from_config(task_id: str) -> Optional[CompactAconFormat]:
+    """A CompactAconFormat per GASERA_COMPACT_ACON*, or None when compact mode is off."""
+    if not GASERA_COMPACT_ACON:
+        return None
+    return CompactAconFormat(GASERA_COMPACT_ACON_ORDER, GASERA_COMPACT_ACON_TIME, task_id,
+                             with_inlet=GASERA_COMPACT_ACON_INLET)
@@ -4,6 +4,73 @@
 GASERA_IP_ADDRESS = "192.168.0.100"
 GASERA_PORT_NUMBER = 8888
 
+# More analyzers served by this Pi (gasera/devices.py): id → {"host": ..., "port": ...}.
+# Each gets its own connection, scheduler worker, caches and measurement sequence;
+# routes pick one with ?device=<id>. The analyzer above is device GASERA_DEVICE_ID.
+GASERA_DEVICE_ID = "main"
+GASERA_DEVICES = {}
+
+# Keep one TCP session open to the device instead of connecting per command
+GASERA_PERSISTENT_SESSION = False
+
+# Serve the web routes and console dispatcher through the asyncio transport
+# (gasera/controller_facade.py) instead of the threaded scheduler path.
+# The measurement sequence, telemetry, journal and AK proxy then use it too;
+# it must never run alongside the threaded path for the same analyzer.
+GASERA_ASYNC_TRANSPORT = False
+
+# Local raw-AK TCP port for third-party tools, multiplexed onto our device scheduler
+# (gasera/ak_proxy.py). None = off; bind to 0.0.0.0 only on a trusted network.
+GASERA_PROXY_HOST = "127.0.0.1"
+GASERA_PROXY_PORT = None
+
+# Analyzer discovery (gasera/discovery.py): subnets to scan, None = the /24 around
+# GASERA_IP_ADDRESS. With FOLLOW, an open circuit triggers a rescan and the client
+# is retargeted if the analyzer turns up at a new address (threaded transport only).
+GASERA_DISCOVERY_SUBNETS = None
+GASERA_DISCOVERY_FOLLOW = True
+
+# Record every AK request/response to this file at startup (None = off; see gasera/trace.py)
+GASERA_TRACE_FILE = None
+
+# Where /api/trace/start writes its recordings; must be writable by the service
+# (install/gasera.service only allows writes under config/)
+GASERA_TRACE_DIR = "config/traces"
+
+# Compact ACON replies (gasera/compact_acon.py): fix the component order with SCOR and
+# drop CAS codes (optionally timestamps too) with SCON, re-applied after reconnect/RDEV.
+# ORDER None = the CAS list of the default task (ATSP). The device keeps the layout
+# until it reboots, and AK proxy clients get the compact replies as well.
+GASERA_COMPACT_ACON = False
+GASERA_COMPACT_ACON_ORDER = None
+GASERA_COMPACT_ACON_TIME = True  # keep the timestamp column; False stamps results with host time
+GASERA_COMPACT_ACON_INLET = False  # add the sampler inlet column (SCON 4th bit, MW 1.8.2+)
+
+# Distinct ACON results kept in memory for /api/data/history and the CSV export (0 = none)
+GASERA_RESULT_HISTORY = 2000
+
+# ADEV/ANAM/ATSK/ATSP/ASYP replies are reused for this long (seconds) unless the device
+# restarts first (gasera/device_metadata.py); 0 = always ask the device
+GASERA_METADATA_MAX_AGE = 3600.0
+
+# Instrument readings polled with APAR when the link is idle (gasera/telemetry.py):
+# parameter → period in seconds, {} = off. CAPACITY readings are kept per parameter
+# (2880 at 30 s = one day); sampling waits until the device has been quiet for IDLE_GAP s.
+GASERA_TELEMETRY = {"CELLTEMP": 30.0, "CELLPRESSURE": 30.0, "VAISALACO2VALUE": 60.0}
+GASERA_TELEMETRY_CAPACITY = 2880
+GASERA_TELEMETRY_IDLE_GAP = 1.0
+
+# Journal of device status / phase / active error / link transitions (gasera/journal.py).
+# ASTS, AMST and AERR replies seen anyway are diffed; each is polled only if nobody asked
+# for it within INTERVAL s, and only once the device has been quiet for IDLE_GAP s.
+# FILE (JSON lines) keeps the journal across restarts, rewritten to the newest
+# CAPACITY entries whenever it outgrows them; None = memory only.
+GASERA_JOURNAL = True
+GASERA_JOURNAL_INTERVAL = 5.0
+GASERA_JOURNAL_IDLE_GAP = 1.0
+GASERA_JOURNAL_CAPACITY = 10000
+GASERA_JOURNAL_FILE = None
+
 CAS_DETAILS = {
     "74-82-8": ("Methane", "CH₄"),
     "124-38-9": ("Carbon Dioxide", "CO₂"),
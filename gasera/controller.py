@@ -1,10 +1,120 @@
-from typing import Optional
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, List, Optional, Sequence, Tuple, Union
 from .protocol import GaseraProtocol, DeviceStatus, ErrorList, TaskList, ACONResult, MeasurementStatus, DeviceName, IterationNumber, NetworkSettings, DateTimeResult
 from .protocol import DeviceInfo, SelfTestResult, TaskParameters, SystemParameters, SamplerParameters, ParameterValue
-from .config import get_gas_name, get_color_for_cas, get_cas_details
-from .tcp_client import tcp_client
+from .acon_batch import ACONBatch, parse_acon_batch
+from .compact_acon import CompactAconFormat, FORMAT_COMMANDS, compact_from_config
+from .device_metadata import DeviceMetadata, TaskTable, METADATA_QUERIES, WARM_QUERIES
+from .result_store import ResultStore, result_store
+from .singleflight import SingleFlight
+from .response_cache import ResponseCache, response_cache
+from .liveness import LinkMonitor, link_monitor
+from .scheduler import DeviceScheduler, SchedulerRejected, scheduler as default_scheduler
+from .metrics import MetricsRegistry, metrics
+from .discovery import discovery
+from .config import GASERA_ASYNC_TRANSPORT, GASERA_DISCOVERY_FOLLOW
+from . import deadline as _deadline
+import system.log_utils as log
+
+# Read-only queries that are safe to share between concurrent callers
+COALESCED_QUERIES = {"ACON", "ASTS", "AMST", "AITR"}
+
+# Commands that change device state; any of these invalidates cached console answers
+WRITE_COMMANDS = {"STAM", "STAT", "STPM", "SCOR", "SCON", "SNET", "SONL", "STUN", "STST", "RDEV"}
+
+def _func_code(cmd: str) -> str:
+    # AK request: <STX><BLANK><FUNC 4 bytes><BLANK>K0 ...
+    return cmd[2:6]
+
+@dataclass
+class BatchResult:
+    """
+    Outcome of one command of GaseraController.batch().
+    status: "ok" | "device_error" (parsed, device reported an error) | "no_response"
+            | "parse_error" | "deadline" (not sent in time) | "rejected" (batch refused)
+    """
+    func: str
+    status: str
+    result: Any = None  # typed GaseraProtocol result when parsed
+    raw: Optional[str] = None  # framed response
+
+    @property
+    def ok(self) -> bool:
+        return self.status == "ok"
+
+BatchItem = Union[str, Tuple[str, ...]]  # "ASTS" or ("ATSP", "11")
+
+def build_batch(proto: GaseraProtocol, items: Sequence[BatchItem]) -> Tuple[List[str], List[str]]:
+    """Function codes and framed commands for batch items."""
+    funcs, cmds = [], []
+    for item in items:
+        func, *args = (item,) if isinstance(item, str) else item
+        funcs.append(func)
+        cmds.append(proto.build_command(func, " ".join(str(a) for a in args)))
+    return funcs, cmds
+
+def parse_batch(proto: GaseraProtocol, funcs: List[str], responses: List[Optional[str]]) -> List[BatchResult]:
+    """Parse batch responses with each function's parser; missing tail entries are deadline misses."""
+    results = []
+    for i, func in enumerate(funcs):
+        if i >= len(responses):
+            results.append(BatchResult(func, "deadline"))
+            continue
+        resp = responses[i]
+        if resp is None:
+            results.append(BatchResult(func, "no_response"))
+            continue
+        try:
+            parsed = proto.decode(resp, func.upper())
+        except (ValueError, IndexError) as e:
+            log.debug(f"batch {func}: unparsable response: {e}")
+            results.append(BatchResult(func, "parse_error", raw=resp))
+            continue
+        status = "device_error" if getattr(parsed, "error", False) else "ok"
+        results.append(BatchResult(func, status, parsed, resp))
+    return results
+
+def acon_payload(response: Optional[str], store: Optional[ResultStore] = None,
+                 parse: Callable[[str], ACONBatch] = parse_acon_batch) -> dict:
+    """ACON response → the JSON shape served by /api/data/live (error dict on failure); results go to store."""
+    if response is None:
+        return {"error": "No response from device"}
+    try:
+        batch = parse(response)
+    except Exception as e:
+        return {"error": f"Parse error: {e}"}
+
+    if batch.error:
+        return {"error": "No Results present yet!"}
+
+    if not len(batch):
+        return {"error": "No gas components detected!"}
+
+    if store is not None:
+        store.add(batch)
+
+    return {
+        "timestamp": batch.timestamp,
+        "readable": batch.readable_time,
+        "string": batch.as_string(),  # exact pretty block for UI
+        "components": batch.components()
+    }
+
+def running_task(proto: GaseraProtocol, tasks: TaskTable, response: Optional[str]) -> Optional[str]:
+    """Id of the known task whose gases make up a full-format ACON reply, or None."""
+    if not response:
+        return None
+    try:
+        result = proto.parse_acon(response)
+    except (ValueError, IndexError):
+        return None
+    if result.error or not result.records:
+        return None
+    return tasks.match_cas({r.cas for r in result.records})
 
-# Top-level (above GaseraController)
+# Factory task set of a GASERA ONE: the task table until the device has answered ATSK
 class TaskIDs:
     CALIBRATION_TASK = "7"
     DEFAULT = "11"
@@ -27,199 +137,402 @@ class TaskIDs:
         return set(cls.NAME_TO_ID.keys())
 
 class GaseraController:
-    def __init__(self):
+    """
+    Typed AK command surface over a DeviceScheduler and its transport.
+
+    Defaults bind to the process-wide tcp_client/scheduler/link_monitor; pass
+    your own scheduler (e.g. over a ReplayTransport) to drive a different link.
+    """
+
+    def __init__(self, scheduler: Optional[DeviceScheduler] = None,
+                 monitor: Optional[LinkMonitor] = None,
+                 cache: Optional[ResponseCache] = None,
+                 results: Optional[ResultStore] = None,
+                 compact: Optional[CompactAconFormat] = None,
+                 metadata: Optional[DeviceMetadata] = None,
+                 warm: bool = True):
+        if scheduler is None:
+            scheduler, monitor = default_scheduler, monitor or link_monitor
         self.proto = GaseraProtocol()
-    
-    def check_device_connection(self):
-        was_online = getattr(self, "_was_online", None)
-        is_now = tcp_client.is_online()
-        if was_online != is_now:
-            print(f"[INFO] Gasera is now {'online' if is_now else 'offline'}")
-        self._was_online = is_now
-        return is_now
-
-    def acon_proxy(self) -> dict:
+        self.scheduler = scheduler
+        self.transport = scheduler.transport
+        self.monitor = monitor
+        self.cache = cache or response_cache
+        self.results = result_store if results is None else results
+        self.compact = compact  # None = full ACON format
+        self.metadata = metadata or DeviceMetadata(TaskTable(TaskIDs.NAME_TO_ID))
+        self.warm = warm  # fetch metadata whenever the link comes up
+        self._compact_lock = threading.Lock()
+        self._flight = SingleFlight()
+        self._acon_flight = SingleFlight()  # compact ACON fetch + parse, shared by concurrent polls
+        self._connection_listeners: List[Callable[[bool], None]] = []
+        self._exchange_listeners: List[Callable[[str, str], None]] = []
+        self.transport.on_connection_change = self._on_connection_change
+
+    def add_connection_listener(self, callback: Callable[[bool], None]) -> None:
+        """Register callback(online: bool), fired on every online/offline transition."""
+        self._connection_listeners.append(callback)
+
+    def add_exchange_listener(self, callback: Callable[[str, str], None]) -> None:
+        """Register callback(func, framed response) for every answered device exchange (keep it cheap)."""
+        self._exchange_listeners.append(callback)
+
+    def _notify_exchange(self, func: str, resp: str) -> None:
+        for cb in self._exchange_listeners:
+            try:
+                cb(func, resp)
+            except Exception as e:
+                log.error(f"Exchange listener failed: {e}")
+
+    def _on_connection_change(self, online: bool) -> None:
+        if online:
+            log.info("Gasera is now online")
+            if self.compact:
+                self.compact.invalidate()  # it may have rebooted (SCOR/SCON lost)
+            self.metadata.invalidate("link came online")
+            if self.warm:
+                # runs inside the transport's exchange; the batches go from another thread
+                threading.Thread(target=self.warm_metadata, daemon=True, name="gasera-metadata").start()
+        else:
+            log.info("Gasera is now offline")
+        for cb in self._connection_listeners:
+            try:
+                cb(online)
+            except Exception as e:
+                log.error(f"Connection listener failed: {e}")
+
+    def _send(self, cmd: str) -> Optional[str]:
+        """
+        Send one framed command through the lane scheduler; identical in-flight
+        read-only queries on the same lane share one exchange, and metadata
+        queries are answered from self.metadata while it holds them.
+        """
+        func = _func_code(cmd)
+        if func in METADATA_QUERIES:
+            cached = self.metadata.get(cmd)
+            if cached is not None:
+                return cached
+        if _deadline.expired("controller"):
+            log.debug(f"{func} not sent: request deadline passed")
+            return None
+        lane = self.scheduler.resolve_lane(cmd)
+        generation = self.metadata.generation
+        try:
+            if func in COALESCED_QUERIES or func in METADATA_QUERIES:
+                resp = self._flight.do(f"{lane}:{cmd}", lambda: self.scheduler.submit(cmd, lane))
+            else:
+                if func in WRITE_COMMANDS:
+                    self._before_write(func)
+                resp = self.scheduler.submit(cmd, lane)
+        except SchedulerRejected as e:
+            log.debug(f"{func} not sent: {e}")
+            return None
+        self.metadata.observe(cmd, resp, generation)
+        if resp is not None and self._exchange_listeners:
+            self._notify_exchange(func, resp)
+        return resp
+
+    def _before_write(self, func: str) -> None:
+        self.cache.invalidate()
+        if self.compact and func in FORMAT_COMMANDS:
+            self.compact.invalidate()
+        if func == "RDEV":
+            self.metadata.invalidate("RDEV")
+
+    def send_frame(self, cmd: str) -> Optional[str]:
+        """Send an already framed AK request (e.g. from the AK proxy); raw framed response or None."""
+        return self._send(cmd)
+
+    def batch(self, items: Sequence[BatchItem], deadline: float = 5.0) -> List[BatchResult]:
+        """
+        Run AK commands in order over one device session and parse each answer
+        with its GaseraProtocol parser, e.g. batch(["ASTS", "AERR", "AMST"]).
+        deadline bounds the whole batch (seconds, queueing included; a tighter
+        request deadline wins); commands not started in time come back with
+        status "deadline".
+        Batches bypass single-flight; any write command in them invalidates the cache.
+        """
+        funcs, cmds = build_batch(self.proto, items)
+
+        for func in set(funcs) & WRITE_COMMANDS:
+            self._before_write(func)
+        generation = self.metadata.generation
+        try:
+            until = time.monotonic() + deadline
+            outer = _deadline.current()
+            responses = self.scheduler.submit_batch(cmds, deadline=until if outer is None else min(until, outer))
+        except SchedulerRejected as e:
+            log.debug(f"batch {'+'.join(funcs)} not sent: {e}")
+            return [BatchResult(func, "rejected") for func in funcs]
+
+        for func, cmd, resp in zip(funcs, cmds, responses):
+            self.metadata.observe(cmd, resp, generation)
+            if resp is not None and self._exchange_listeners:
+                self._notify_exchange(func, resp)
+        return parse_batch(self.proto, funcs, responses)
+
+    def warm_metadata(self) -> None:
+        """Load ADEV/ANAM/ATSK/ASYP in one batch, then ATSP for every task ATSK listed."""
+        results = self.batch(WARM_QUERIES)
+        if any(r.func == "ATSK" and r.ok for r in results):
+            results += self.batch([("ATSP", tid) for tid in self.metadata.tasks.ids()], deadline=10.0)
+        log.debug(f"Device metadata warmed: {sum(r.ok for r in results)}/{len(results)} answers")
+
+    def _known_task(self, ok: Callable[[TaskTable], bool]) -> bool:
+        # a task created on the analyzer since the last ATSK: look once more before refusing
+        tasks = self.metadata.tasks
+        if ok(tasks):
+            return True
+        self.metadata.forget(self.proto.ask_task_list())
+        self.get_task_list()
+        return ok(tasks)
+
+    def register_metrics(self, registry: MetricsRegistry) -> None:
+        """Export scheduler, circuit breaker, link and single-flight state at scrape time."""
+        sched = self.scheduler
+
+        def lane_values(field):
+            return lambda: {(name,): s[field] for name, s in sched.stats().items() if isinstance(s, dict)}
+
+        registry.gauge_func("gasera_scheduler_queue_depth", "Commands queued per lane", lane_values("depth"), ("lane",))
+        for field in ("submitted", "executed", "rejected", "shed"):
+            registry.gauge_func(f"gasera_scheduler_{field}_total", f"Commands {field} per lane",
+                                lane_values(field), ("lane",), kind="counter")
+        registry.gauge_func("gasera_scheduler_fast_failed_total", "Commands refused while the circuit was open",
+                            lambda: sched.fast_failed, kind="counter")
+        rtt = getattr(self.transport, "rtt", None)
+        if rtt:
+            registry.gauge_func("gasera_rto_seconds", "Adaptive read timeout per AK function",
+                                lambda: {(k,): v["rto_ms"] / 1000.0 for k, v in rtt.snapshot().items()}, ("func",))
+            registry.gauge_func("gasera_srtt_seconds", "Smoothed round-trip time per AK function",
+                                lambda: {(k,): v["srtt_ms"] / 1000.0 for k, v in rtt.snapshot().items()
+                                         if v["srtt_ms"] is not None}, ("func",))
+        registry.gauge_func("gasera_link_online", "Last known analyzer link state (1 = online)",
+                            lambda: int(self.transport.is_connected()))
+        breaker = sched.breaker
+        if breaker:
+            states = {"closed": 0, "half_open": 1, "open": 2}
+            registry.gauge_func("gasera_circuit_state", "Circuit breaker state (0 closed, 1 half-open, 2 open)",
+                                lambda: states.get(breaker.state, 2))
+            registry.gauge_func("gasera_circuit_opened_total", "Times the circuit breaker opened",
+                                lambda: breaker.opened_count, kind="counter")
+        registry.gauge_func("gasera_metadata_hits_total", "Metadata queries answered from the cache",
+                            lambda: self.metadata.hits, kind="counter")
+        registry.gauge_func("gasera_metadata_invalidations_total", "Metadata cache invalidations",
+                            lambda: self.metadata.invalidations, kind="counter")
+        registry.gauge_func("gasera_singleflight_executed_total", "Coalescable queries sent to the device",
+                            lambda: self._flight.executed, kind="counter")
+        registry.gauge_func("gasera_singleflight_coalesced_total", "Queries answered by joining an in-flight call",
+                            lambda: self._flight.coalesced, kind="counter")
+
+    def check_device_connection(self) -> bool:
+        # answered from memory: last exchange outcome, refreshed by the link monitor when idle
+        return self.transport.is_connected()
+
+    def connection_status(self) -> dict:
+        if self.monitor is None:
+            return {"online": self.transport.is_connected(), "checked_ago": None}
+        return self.monitor.snapshot()
+
+    def _compact_ready(self) -> Optional[CompactAconFormat]:
+        """The compact ACON schema once the device is in that layout (negotiated here if needed), else None."""
+        compact = self.compact
+        if compact is None or compact.disabled or compact.suspended:
+            return None
+        if not compact.active:
+            with self._compact_lock:
+                for _ in range(2):  # ATSP for the order (first time only), then SCOR + SCON
+                    items = compact.pending()
+                    if not items or not compact.accept(self.batch(items)):
+                        break
+        return compact if compact.active else None
+
+    def _fetch_acon(self) -> Tuple[Optional[str], Callable[[str], ACONBatch]]:
+        """
+        One ACON exchange and the parser for its reply. Concurrent compact polls
+        share one fetch and parse, so a reply that no longer fits the schema is
+        handled once: the device goes back into the full format, the poll is
+        asked again, and the schema is rebuilt for the task that reply shows.
+        """
+        compact = self._compact_ready()
         command = self.proto.build_command("ACON")
-        response = tcp_client.send_command(command)
-
-        if response is None:
-            return {"error": "No response from device"}
+        if compact is None:
+            return self._send(command), parse_acon_batch
+        lane = self.scheduler.resolve_lane(command)
+        return self._acon_flight.do(str(lane), lambda: self._fetch_compact(compact, command))
+
+    def _fetch_compact(self, compact: CompactAconFormat, command: str) -> Tuple[Optional[str], Callable[[str], ACONBatch]]:
+        resp = self._send(command)
+        if resp is None:
+            return resp, parse_acon_batch
         try:
-            acon_result = self.proto.parse_acon(response)
-        except Exception as e:
-            return {"error": f"Parse error: {e}"}
-
-        if acon_result.error:
-            return {"error": "No Results present yet!"}
-        
-        if not acon_result.records:
-            return {"error": "No gas components detected!"}
-
-        components = []
-        for rec in acon_result.records:
-            meta = get_cas_details(rec.cas) or {}
-            label = meta.get("label") or (f"{get_gas_name(rec.cas)} ({rec.cas})" if get_gas_name(rec.cas) else rec.cas)
-            color = meta.get("color") or get_color_for_cas(rec.cas) or "#999999"
-            name  = meta.get("symbol") or rec.cas
-            components.append({
-                "cas": rec.cas,
-                "name": name,
-                "label": label,
-                "color": color,
-                "ppm": rec.ppm,
-            })
-
-        # include exact pretty block for UI (optional but handy)
-        pretty = acon_result.as_string()
-
-        return {
-            "timestamp": acon_result.timestamp,
-            "readable": acon_result.readable_time,
-            "string": pretty,
-            "components": components
-        }
+            batch = compact.parse(resp)
+        except ValueError as e:
+            log.info(f"Compact ACON: {e}; reading this result in the full format")
+            self.batch(compact.restore())
+            resp = self._send(command)
+            compact.rebuild(running_task(self.proto, self.metadata.tasks, resp))
+            return resp, parse_acon_batch
+        return resp, lambda _resp: batch
+
+    def acon_proxy(self) -> dict:
+        resp, parse = self._fetch_acon()
+        return acon_payload(resp, self.results, parse)
 
     def get_device_status(self) -> Optional[DeviceStatus]:
         cmd = self.proto.ask_current_status()
-        resp = tcp_client.send_command(cmd)
+        resp = self._send(cmd)
         if resp:
             result = self.proto.parse_asts(resp)
-            if tcp_client.on_status_change:
-                tcp_client.on_status_change(result)
+            if self.transport.on_status_change:
+                self.transport.on_status_change(result)
             return result
         return None
 
     def get_active_errors(self) -> Optional[ErrorList]:
         cmd = self.proto.ask_active_errors()
-        resp = tcp_client.send_command(cmd)
+        resp = self._send(cmd)
         return self.proto.parse_aerr(resp) if resp else None
 
     def get_task_list(self) -> Optional[TaskList]:
         cmd = self.proto.ask_task_list()
-        resp = tcp_client.send_command(cmd)
+        resp = self._send(cmd)
         return self.proto.parse_atsk(resp) if resp else None
 
     def start_measurement(self, task_id: Optional[str] = None) -> Optional[str]:
         if not task_id:
             task_id = TaskIDs.DEFAULT
 
-        if task_id not in TaskIDs.all_ids():
-            return "[ERROR] Invalid task id (allowed: 7, 11, 12, 13)"
+        if not self._known_task(lambda t: task_id in t.ids()):
+            return f"[ERROR] Invalid task id (allowed: {', '.join(self.metadata.tasks.ids())})"
 
         cmd = self.proto.start_measurement_by_id(task_id)
-        resp = tcp_client.send_command(cmd)
+        resp = self._send(cmd)
+        self._follow_task(resp, task_id)
         return self.proto.parse_generic(resp, "STAM").as_string() if resp else "[ERROR] No response from device"
 
     def start_measurement_by_name(self, task_name: Optional[str] = None) -> Optional[str]:
         if not task_name:
             task_name = "DEFAULT"
 
-        if task_name not in TaskIDs.all_names():
-            return "[ERROR] Invalid task name (allowed: CALIBRATION_TASK, DEFAULT, FLUSH, MTEST2)"
+        if not self._known_task(lambda t: task_name in t.names()):
+            return f"[ERROR] Invalid task name (allowed: {', '.join(self.metadata.tasks.names())})"
 
         cmd = self.proto.start_measurement_by_name(task_name)
-        resp = tcp_client.send_command(cmd)
+        resp = self._send(cmd)
+        self._follow_task(resp, self.metadata.tasks.id_of(task_name))
         return self.proto.parse_generic(resp, "STAT").as_string() if resp else "[ERROR] No response from device"
 
+    def _follow_task(self, resp: Optional[str], task_id: Optional[str]) -> None:
+        # a started task brings its own gases: the compact schema follows it
+        if self.compact and task_id and resp and not self.proto.parse_generic(resp, "START").error:
+            self.compact.follow_task(task_id)
+
     def stop_measurement(self) -> Optional[str]:
         cmd = self.proto.stop_measurement()
-        resp = tcp_client.send_command(cmd)
+        resp = self._send(cmd)
         return self.proto.parse_generic(resp, "STPM").as_string() if resp else None
 
     def get_last_results(self) -> Optional[ACONResult]:
-        cmd = self.proto.get_last_measurement_results()
-        resp = tcp_client.send_command(cmd)
-        return self.proto.parse_acon(resp) if resp else None
+        resp, parse = self._fetch_acon()
+        return parse(resp).to_result() if resp else None
 
     def get_measurement_status(self) -> Optional[MeasurementStatus]:
         cmd = self.proto.get_measurement_status()
-        resp = tcp_client.send_command(cmd)
+        resp = self._send(cmd)
         return self.proto.parse_amst(resp) if resp else None
 
     def get_device_name(self) -> Optional[DeviceName]:
         cmd = self.proto.get_device_name()
-        resp = tcp_client.send_command(cmd)
+        resp = self._send(cmd)
         return self.proto.parse_anam(resp) if resp else None
     
     def get_device_info(self) -> Optional[str]:
         cmd = self.proto.get_device_info()
-        resp = tcp_client.send_command(cmd)
+        resp = self._send(cmd)
         return self.proto.parse_adev(resp).as_string() if resp else None
 
     def get_iteration_number(self) -> Optional[IterationNumber]:
         cmd = self.proto.get_iteration_number()
-        resp = tcp_client.send_command(cmd)
+        resp = self._send(cmd)
         return self.proto.parse_aitr(resp) if resp else None
 
     def get_network_settings(self) -> Optional[NetworkSettings]:
         cmd = self.proto.get_network_settings()
-        resp = tcp_client.send_command(cmd)
+        resp = self._send(cmd)
         return self.proto.parse_anet(resp) if resp else None
 
     def get_device_time(self) -> Optional[DateTimeResult]:
         cmd = self.proto.get_device_datetime()
-        resp = tcp_client.send_command(cmd)
+        resp = self._send(cmd)
         return self.proto.parse_aclk(resp) if resp else None
 
     def set_component_order(self, cas_list: str) -> Optional[str]:
         cmd = self.proto.set_component_order(cas_list)
-        resp = tcp_client.send_command(cmd)
+        resp = self._send(cmd)
         return self.proto.parse_generic(resp, "SCOR").as_string() if resp else None
 
     def set_concentration_format(self, show_time: int, show_cas: int, show_conc: int, show_inlet: int = -1) -> Optional[str]:
         cmd = self.proto.set_concentration_format(show_time, show_cas, show_conc, show_inlet)
-        resp = tcp_client.send_command(cmd)
+        resp = self._send(cmd)
         return self.proto.parse_generic(resp, "SCON").as_string() if resp else None
 
     def set_network_settings(self, use_dhcp: int, ip: str, netmask: str, gw: str) -> Optional[str]:
         cmd = self.proto.set_network_settings(use_dhcp, ip, netmask, gw)
-        resp = tcp_client.send_command(cmd)
+        resp = self._send(cmd)
         return self.proto.parse_generic(resp, "SNET").as_string() if resp else None
 
     def get_parameter(self, name: str) -> Optional[str]:
         cmd = self.proto.get_parameter(name)
-        resp = tcp_client.send_command(cmd)
+        resp = self._send(cmd)
         return self.proto.parse_apar(resp).as_string() if resp else None
 
     def set_online_mode(self, enable: bool) -> Optional[str]:
         cmd = self.proto.set_online_mode(enable)
-        resp = tcp_client.send_command(cmd)
+        resp = self._send(cmd)
         return self.proto.parse_generic(resp, "SONL").as_string() if resp else None
 
     def set_laser_tuning_interval(self, interval: int) -> Optional[str]:
         cmd = self.proto.set_laser_tuning_interval(interval)
-        resp = tcp_client.send_command(cmd)
+        resp = self._send(cmd)
         return self.proto.parse_generic(resp, "STUN").as_string() if resp else None
 
     def get_task_parameters(self, task_id: int) -> Optional[str]:
         cmd = self.proto.get_task_parameters(task_id)
-        resp = tcp_client.send_command(cmd)
+        resp = self._send(cmd)
         return self.proto.parse_atsp(resp).as_string() if resp else None
 
     def get_system_parameters(self) -> Optional[str]:
         cmd = self.proto.get_system_parameters()
-        resp = tcp_client.send_command(cmd)
+        resp = self._send(cmd)
         return self.proto.parse_asyp(resp).as_string() if resp else None
 
     def get_sampler_parameters(self) -> Optional[str]:
         cmd = self.proto.get_sampler_parameters()
-        resp = tcp_client.send_command(cmd)
+        resp = self._send(cmd)
         return self.proto.parse_amps(resp).as_string() if resp else None
 
     def start_self_test(self) -> Optional[str]:
         cmd = self.proto.start_self_test()
-        resp = tcp_client.send_command(cmd)
+        resp = self._send(cmd)
         return self.proto.parse_generic(resp, "STST").as_string() if resp else None
 
     def get_self_test_result(self) -> Optional[str]:
         cmd = self.proto.get_self_test_result()
-        resp = tcp_client.send_command(cmd)
+        resp = self._send(cmd)
         return self.proto.parse_astr(resp).as_string() if resp else None
 
     def reboot_device(self) -> Optional[str]:
         cmd = self.proto.reboot_device()
-        resp = tcp_client.send_command(cmd)
+        resp = self._send(cmd)
         return self.proto.parse_generic(resp, "RDEV").as_string() if resp else None
 
-# lazy singleton instance
-gasera = GaseraController()
\ No newline at end of file
+# lazy singleton instance; under GASERA_ASYNC_TRANSPORT the asyncio engine
+# (controller_facade.py) owns the device session, so this one sends nothing itself
+gasera = GaseraController(compact=compact_from_config(TaskIDs.DEFAULT), warm=not GASERA_ASYNC_TRANSPORT)
+if not GASERA_ASYNC_TRANSPORT:
+    gasera.register_metrics(metrics)
+    if GASERA_DISCOVERY_FOLLOW:
+        discovery.follow(gasera)
+    default_scheduler.start()
+    link_monitor.start()
\ No newline at end of file
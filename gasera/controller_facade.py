@@ -0,0 +1,116 @@
+# controller_facade.py — blocking facade over AsyncGaseraController (event loop in a thread)
+import threading
+import asyncio
+import atexit
+import inspect
+from .async_client import AsyncGaseraClient
+from .async_controller import AsyncGaseraController
+from .circuit_breaker import CircuitBreaker
+from .compact_acon import compact_from_config
+from .controller import TaskIDs
+from .metrics import metrics
+from .response_cache import response_cache
+from . import deadline
+from .config import GASERA_IP_ADDRESS, GASERA_PORT_NUMBER, GASERA_PERSISTENT_SESSION
+
+# Create the async engine here (bound to the loop thread started at the bottom).
+# It opens its own session to GASERA_IP_ADDRESS, next to the threaded
+# tcp_client: under GASERA_ASYNC_TRANSPORT every frame for the default device
+# (routes, dispatcher, measurement sequence, telemetry, journal, AK proxy)
+# must come through this engine, never through gasera.controller.gasera, whose
+# scheduler and link monitor then stay stopped. The client carries its own
+# breaker, control-first queue and idle prober (see AsyncGaseraClient).
+client = AsyncGaseraClient(
+    GASERA_IP_ADDRESS,
+    GASERA_PORT_NUMBER,
+    connect_timeout=2.0,
+    io_timeout=2.0,
+    persistent=GASERA_PERSISTENT_SESSION,
+    breaker=CircuitBreaker(),
+)
+engine = AsyncGaseraController(client, cache=response_cache, compact=compact_from_config(TaskIDs.DEFAULT))
+
+RESULT_TIMEOUT = 30.0  # upper bound a Flask thread waits for one call
+
+_loop = None
+_thread = None
+_ready = threading.Event()
+_lock = threading.Lock()
+
+def _loop_thread():
+    global _loop
+    _loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(_loop)
+    _ready.set()
+    _loop.run_forever()
+
+def init_gasera_loop(timeout: float = 3.0):
+    global _thread
+    with _lock:
+        if _thread and _thread.is_alive() and _ready.is_set():
+            return
+        if not _thread or not _thread.is_alive():
+            _ready.clear()
+            _thread = threading.Thread(target=_loop_thread, daemon=True, name="gasera-async-loop")
+            _thread.start()
+    if not _ready.wait(timeout=timeout):
+        raise RuntimeError("Gasera async loop failed to initialize in time.")
+
+def _ensure_loop():
+    if _loop is None or not _ready.is_set():
+        init_gasera_loop()
+    if _loop.is_closed():
+        with _lock:
+            _ready.clear()
+        init_gasera_loop()
+
+def _submit(coro):
+    _ensure_loop()
+    return asyncio.run_coroutine_threadsafe(coro, _loop)
+
+class GaseraControllerFacade:
+    """
+    Synchronous GaseraController surface for Flask routes and the dispatcher.
+    Every coroutine method of the engine becomes a blocking call; waiting
+    threads only hold a future while the device I/O runs as coroutines.
+    Plain attributes (transport, proto, check_device_connection, ...) pass through.
+    """
+
+    def __getattr__(self, name):
+        attr = getattr(engine, name)
+        if not inspect.iscoroutinefunction(attr):
+            return attr
+
+        def call(*args, **kwargs):
+            left = deadline.remaining()  # request deadline of the calling (Flask) thread
+            timeout = RESULT_TIMEOUT if left is None else max(0.0, min(RESULT_TIMEOUT, left))
+            fut = _submit(attr(*args, **kwargs))
+            try:
+                return fut.result(timeout=timeout)
+            except TimeoutError:
+                fut.cancel()
+                deadline.EXPIRED.inc("facade")
+                return None
+        call.__name__ = name
+        return call
+
+    def shutdown(self):
+        if _loop is None or not _ready.is_set():
+            return
+        try:
+            _submit(client.disconnect()).result(timeout=2)
+        except Exception:
+            pass
+        finally:
+            try:
+                _loop.call_soon_threadsafe(_loop.stop)
+            except Exception:
+                pass
+
+# Export singleton; the loop thread starts here with the link prober, so the
+# link state is known before the first trigger (importing = async mode is on)
+gasera_async = GaseraControllerFacade()
+engine.register_metrics(metrics)
+_submit(client.monitor_link())
+
+atexit.register(gasera_async.shutdown)
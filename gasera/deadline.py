@@ -0,0 +1,75 @@
+# deadline.py — request-scoped deadlines carried from the HTTP layer down to the socket
+
+from __future__ import annotations
+
+import math
+import threading
+import time
+from contextlib import contextmanager
+from typing import Optional
+
+from .metrics import metrics
+
+DEADLINE_HEADER = "X-Request-Deadline"
+
+EXPIRED = metrics.counter("gasera_deadline_expired_total",
+                          "Device work abandoned because the caller's deadline had passed", ("stage",))
+
+class DeadlineExceeded(Exception):
+    """Raised by the transport when it gives up because the caller's deadline passed."""
+
+_local = threading.local()
+
+def current() -> Optional[float]:
+    """Deadline of the calling thread as a time.monotonic() instant, or None (no limit)."""
+    return getattr(_local, "deadline", None)
+
+def remaining() -> Optional[float]:
+    dl = current()
+    return None if dl is None else dl - time.monotonic()
+
+def expired(stage: str, deadline: Optional[float] = None) -> bool:
+    """True (and counted under stage) when deadline — default: the thread's — has passed."""
+    dl = current() if deadline is None else deadline
+    if dl is not None and time.monotonic() >= dl:
+        EXPIRED.inc(stage)
+        return True
+    return False
+
+def set_deadline(deadline: Optional[float]) -> None:
+    _local.deadline = deadline
+
+@contextmanager
+def scope(seconds: Optional[float]):
+    """Run the enclosed calls with at most `seconds` left; nested scopes only tighten."""
+    prev = current()
+    dl = prev
+    if seconds is not None:
+        dl = time.monotonic() + seconds
+        if prev is not None:
+            dl = min(prev, dl)
+    _local.deadline = dl
+    try:
+        yield
+    finally:
+        _local.deadline = prev
+
+def parse_header(value: Optional[str]) -> Optional[float]:
+    """
+    X-Request-Deadline → seconds left. Accepts a relative budget in seconds ("3",
+    "2.5") or an absolute Unix time in seconds/milliseconds (as sent by JS Date.now()).
+    None for a missing, unparsable or non-finite value (inf, nan).
+    """
+    if not value:
+        return None
+    try:
+        v = float(value)
+    except ValueError:
+        return None
+    if not math.isfinite(v):
+        return None
+    if v > 1e11:      # epoch milliseconds
+        v = v / 1000.0 - time.time()
+    elif v > 1e9:     # epoch seconds
+        v = v - time.time()
+    return max(0.0, v)
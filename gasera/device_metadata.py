@@ -0,0 +1,161 @@
+# device_metadata.py — cached ADEV/ANAM/ATSK/ATSP/ASYP answers and the task table built from them
+
+from __future__ import annotations
+
+import threading
+import time
+from typing import Dict, List, Optional, Sequence, Set, Tuple
+
+import system.log_utils as log
+from .config import GASERA_METADATA_MAX_AGE
+from .protocol import GaseraProtocol, tokenize
+
+# Queries whose answers only change when the analyzer restarts or is reconfigured on its panel
+METADATA_QUERIES = {"ADEV", "ANAM", "ATSK", "ATSP", "ASYP"}
+
+# Fetched together when the link comes up; ATSP follows once ATSK has named the tasks
+WARM_QUERIES = ("ADEV", "ANAM", "ATSK", "ASYP")
+
+# Replies observe() decodes itself (task table, iteration counter)
+TABLE_QUERIES = {"ATSK", "ATSP", "AITR"}
+
+class TaskTable:
+    """
+    Measurement tasks the analyzer offers, as reported by ATSK (ids and names)
+    and ATSP (each task's gases).
+
+      • Until ATSK has been answered, the factory tasks passed in are assumed.
+      • A task missing from ATSK is gone from the table: start requests for it
+        are refused before they reach the device.
+    """
+
+    def __init__(self, fallback: Dict[str, str]):
+        self._fallback = [(tid, name) for name, tid in fallback.items()]  # name → id
+        self._lock = threading.Lock()
+        self.tasks: List[Tuple[str, str]] = list(self._fallback)  # (id, name)
+        self.cas: Dict[str, List[str]] = {}  # id → CAS list (ATSP)
+        self.from_device = False
+
+    def update(self, tasks: Sequence[Tuple[str, str]]) -> None:
+        with self._lock:
+            self.tasks = list(tasks)
+            ids = {tid for tid, _ in tasks}
+            self.cas = {tid: cas for tid, cas in self.cas.items() if tid in ids}
+            self.from_device = True
+
+    def set_cas(self, task_id: str, cas_list: List[str]) -> None:
+        with self._lock:
+            self.cas[task_id] = list(cas_list)
+
+    def ids(self) -> List[str]:
+        return [tid for tid, _ in self.tasks]
+
+    def names(self) -> List[str]:
+        return [name for _, name in self.tasks]
+
+    def id_of(self, name: str) -> Optional[str]:
+        return next((tid for tid, n in self.tasks if n == name), None)
+
+    def match_cas(self, cas: Set[str]) -> Optional[str]:
+        """Id of the task whose ATSP gases are exactly `cas` (None if no known task)."""
+        with self._lock:
+            return next((tid for tid, cas_list in self.cas.items() if set(cas_list) == cas), None)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "source": "device" if self.from_device else "default",
+                "tasks": [{"id": tid, "name": name, "cas": self.cas.get(tid)} for tid, name in self.tasks],
+            }
+
+class DeviceMetadata:
+    """
+    Read-through store for metadata replies, keyed by the framed request.
+
+      • Raw framed replies are kept, so the controller's parsers (and AK proxy
+        clients) see exactly what the device sent. Device errors are not kept.
+      • invalidate() runs on RDEV, whenever the link comes (back) online, and when
+        AITR goes backwards (a restart, or a new measurement started on the
+        analyzer's panel — where tasks may also have been edited).
+      • A reply fetched across an invalidation is not stored (generation check).
+      • Entries older than max_age are refetched; max_age=0 turns caching off.
+      • ATSK / ATSP replies also maintain the TaskTable.
+    """
+
+    def __init__(self, tasks: TaskTable, max_age: float = GASERA_METADATA_MAX_AGE):
+        self.tasks = tasks
+        self.max_age = max_age
+        self.proto = GaseraProtocol()
+        self._lock = threading.Lock()
+        self._entries: Dict[str, Tuple[float, str]] = {}  # framed request → (stored_at, framed reply)
+        self._iteration: Optional[int] = None  # last AITR value seen
+        self.generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self.last_reason: Optional[str] = None
+
+    def get(self, cmd: str) -> Optional[str]:
+        with self._lock:
+            entry = self._entries.get(cmd)
+            if entry is not None and time.monotonic() - entry[0] <= self.max_age:
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+            return None
+
+    def forget(self, cmd: str) -> None:
+        with self._lock:
+            self._entries.pop(cmd, None)
+
+    def invalidate(self, reason: str) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._iteration = None
+            self.generation += 1
+            self.invalidations += 1
+            self.last_reason = reason
+        log.debug(f"Device metadata invalidated: {reason}")
+
+    def observe(self, cmd: str, resp: Optional[str], generation: int) -> None:
+        """Take note of one exchange sent while `generation` was current (any function)."""
+        func = cmd[2:6]
+        if resp is None or (func not in METADATA_QUERIES and func != "AITR"):
+            return
+        if func in TABLE_QUERIES:
+            try:
+                result = self.proto.decode(resp, func)
+            except (ValueError, IndexError):
+                return
+            if result.error:
+                return
+            if func == "AITR":
+                self._check_iteration(result.iteration)
+                return
+        elif resp[1:].split(None, 2)[1:2] != ["0"]:  # status only: the reply is parsed by whoever asked
+            return
+        with self._lock:
+            if generation != self.generation:
+                return
+            self._entries[cmd] = (time.monotonic(), resp)
+        if func == "ATSK":
+            self.tasks.update(result.tasks)
+        elif func == "ATSP":
+            self.tasks.set_cas(cmd[1:-1].split()[2], result.cas_list)
+
+    def _check_iteration(self, iteration: int) -> None:
+        with self._lock:
+            last, self._iteration = self._iteration, iteration
+        if last is not None and iteration < last:
+            self.invalidate(f"iteration counter went back from {last} to {iteration}")
+            with self._lock:
+                self._iteration = iteration
+
+    def snapshot(self) -> dict:
+        now = time.monotonic()
+        with self._lock:
+            entries = [{"request": cmd[1:-1].strip(), "age": round(now - t, 1)}
+                       for cmd, (t, _resp) in self._entries.items()]
+            stats = {"hits": self.hits, "misses": self.misses, "invalidations": self.invalidations,
+                     "last_invalidation": self.last_reason}
+        return {"entries": entries, **stats, "task_table": self.tasks.snapshot()}
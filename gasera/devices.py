@@ -0,0 +1,166 @@
+# devices.py — registry of the analyzers served by this Pi, each on its own isolated stack
+
+from __future__ import annotations
+
+import os
+import threading
+from typing import Dict, List, Optional
+
+import system.log_utils as log
+from system.preferences import prefs, KEY_MEASUREMENT_DURATION
+from .circuit_breaker import CircuitBreaker
+from .compact_acon import compact_from_config
+from .config import (GASERA_ASYNC_TRANSPORT, GASERA_DEVICE_ID, GASERA_DEVICES, GASERA_JOURNAL_FILE,
+                     GASERA_PERSISTENT_SESSION, GASERA_PORT_NUMBER)
+from .controller import GaseraController, TaskIDs
+from .dispatcher import GaseraCommandDispatcher
+from .journal import start_journal
+from .liveness import LinkMonitor
+from .measurement import MeasurementController
+from .response_cache import ResponseCache
+from .result_store import ResultStore
+from .scheduler import DeviceScheduler
+from .tcp_client import GaseraTCPClient
+from .telemetry import start_telemetry
+
+class Device:
+    """
+    One analyzer and everything that talks to it.
+
+      • Transport, circuit breaker, link monitor, scheduler (own worker thread),
+        controller, response cache, result store, dispatcher and measurement
+        sequence are per device: a slow or dead analyzer only queues and times
+        out its own work.
+      • `gasera` is what everything sending frames calls: web routes, the
+        measurement sequence, telemetry and journal. For the default device
+        under GASERA_ASYNC_TRANSPORT it is the asyncio facade, the device's
+        only session; `controller` (threaded, its scheduler and link monitor
+        stopped) then only backs the scheduler/results properties and must
+        not be sent through.
+      • Telemetry and journal are attached by start() when configured.
+    """
+
+    def __init__(self, device_id: str, controller: GaseraController, dispatcher: GaseraCommandDispatcher,
+                 measurement: MeasurementController, gasera=None, default: bool = False):
+        self.id = device_id
+        self.controller = controller
+        self.gasera = gasera or controller
+        self.dispatcher = dispatcher
+        self.measurement = measurement
+        self.default = default
+        self.telemetry = None
+        self.watcher = None  # StatusWatcher, with its DeviceJournal
+        self._started = False
+
+    @property
+    def scheduler(self) -> DeviceScheduler:
+        return self.controller.scheduler
+
+    @property
+    def results(self) -> ResultStore:
+        return self.controller.results
+
+    def start(self, journal_path: Optional[str] = None) -> None:
+        if self._started:
+            return
+        self._started = True
+        self.telemetry = start_telemetry(self.gasera)
+        self.watcher = start_journal(self.gasera, journal_path)
+
+    def snapshot(self) -> dict:
+        transport = self.gasera.transport
+        return {
+            "id": self.id,
+            "host": transport.host,
+            "port": transport.port,
+            "default": self.default,
+            "online": transport.is_connected(),
+            "measurement": self.measurement.get_status()["state"],
+        }
+
+def build_device(device_id: str, host: str, port: int) -> Device:
+    """A fresh stack for one more analyzer; its workers are running on return."""
+    transport = GaseraTCPClient(host, port, connect_timeout=2.0, io_timeout=2.0,
+                                persistent=GASERA_PERSISTENT_SESSION)
+    breaker = CircuitBreaker()
+    scheduler = DeviceScheduler(transport, breaker=breaker)
+    monitor = LinkMonitor(transport, breaker=breaker)
+    cache = ResponseCache()
+    controller = GaseraController(scheduler, monitor, cache, ResultStore(), compact_from_config(TaskIDs.DEFAULT))
+    measurement = MeasurementController(controller, hardware=False)
+    prefs.register_callback(KEY_MEASUREMENT_DURATION, measurement.set_timeout)
+    scheduler.start()
+    monitor.start()
+    measurement.launch_tick_loop()
+    return Device(device_id, controller, GaseraCommandDispatcher(controller, cache), measurement)
+
+def _default_device() -> Device:
+    # the process-wide singletons, already started by their modules
+    from .controller import gasera as controller
+    from .dispatcher import dispatcher
+    from .measurement import measurement
+    gasera = controller
+    if GASERA_ASYNC_TRANSPORT:
+        from .controller_facade import gasera_async as gasera
+    return Device(GASERA_DEVICE_ID, controller, dispatcher, measurement, gasera=gasera, default=True)
+
+class DeviceRegistry:
+    """
+    Devices by id; get(None) is the default one (GASERA_IP_ADDRESS).
+
+    Only the default device drives the probe motors and the trigger pin, follows
+    discovery, backs the AK proxy and exports scheduler/link metrics.
+    """
+
+    def __init__(self, default: Device):
+        self._lock = threading.Lock()
+        self._devices: Dict[str, Device] = {default.id: default}
+        self.default = default
+
+    def add(self, device: Device) -> Device:
+        with self._lock:
+            if device.id in self._devices:
+                raise ValueError(f"Duplicate device id '{device.id}'")
+            self._devices[device.id] = device
+        return device
+
+    def get(self, device_id: Optional[str] = None) -> Device:
+        """Device by id (None/"" = default); KeyError for an unknown id."""
+        if not device_id:
+            return self.default
+        return self._devices[device_id]
+
+    def ids(self) -> List[str]:
+        return list(self._devices)
+
+    def __iter__(self):
+        return iter(list(self._devices.values()))
+
+    def __len__(self) -> int:
+        return len(self._devices)
+
+    def start(self) -> None:
+        """Attach telemetry and journal to every device; one journal file per device."""
+        root, ext = os.path.splitext(GASERA_JOURNAL_FILE or "")
+        for device in self:
+            path = GASERA_JOURNAL_FILE if device.default or not GASERA_JOURNAL_FILE else f"{root}.{device.id}{ext}"
+            device.start(path)
+
+    def snapshot(self) -> dict:
+        return {"default": self.default.id, "devices": [d.snapshot() for d in self]}
+
+registry = DeviceRegistry(_default_device())
+for _id, _spec in GASERA_DEVICES.items():
+    try:
+        _host, _port = _spec["host"], int(_spec.get("port", GASERA_PORT_NUMBER))
+        if str(_id) in registry.ids():
+            raise ValueError("duplicate id")
+        registry.add(build_device(str(_id), _host, _port))
+        log.info(f"Device '{_id}' at {_host}:{_port}")
+    except (KeyError, TypeError, ValueError) as e:
+        log.error(f"Device '{_id}' not added: bad GASERA_DEVICES entry ({e})")
+
+def start_devices() -> DeviceRegistry:
+    """Start the per-device background services (telemetry, journal)."""
+    registry.start()
+    return registry
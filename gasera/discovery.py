@@ -0,0 +1,229 @@
+# discovery.py — concurrent subnet scan for GASERA analyzers (AK port + ANAM/ADEV confirm)
+
+from __future__ import annotations
+
+import asyncio
+import ipaddress
+import threading
+import time
+from dataclasses import dataclass, asdict
+from typing import List, Optional, Sequence, Set, Tuple
+
+import system.log_utils as log
+from .circuit_breaker import CircuitBreaker
+from .config import GASERA_DEVICES, GASERA_IP_ADDRESS, GASERA_PORT_NUMBER, GASERA_DISCOVERY_SUBNETS
+from .framing import FrameDecoder
+from .protocol import GaseraProtocol, encode_frame
+
+@dataclass
+class DiscoveredAnalyzer:
+    host: str
+    port: int
+    name: str
+    info: str  # ADEV summary (manufacturer, serial, version), "" if it did not answer
+    rtt_ms: float  # TCP connect time
+
+def _default_subnets() -> List[str]:
+    # the /24 around the configured address; DHCP rarely moves a device further than that
+    return [str(ipaddress.ip_network(f"{GASERA_IP_ADDRESS}/24", strict=False))]
+
+def _registered_endpoints() -> Set[Tuple[str, int]]:
+    # analyzers configured as devices of their own (GASERA_DEVICES); never retarget onto one
+    taken = set()
+    for spec in GASERA_DEVICES.values():
+        try:
+            taken.add((spec["host"], int(spec.get("port", GASERA_PORT_NUMBER))))
+        except (KeyError, TypeError, ValueError, AttributeError):
+            pass  # reported by the device registry
+    return taken
+
+class AnalyzerDiscovery:
+    """
+    Finds GASERA analyzers on the local subnets.
+
+      • Every host of every subnet gets a TCP connect to the AK port with a short
+        timeout, `concurrency` at a time (asyncio), so a /24 takes about
+        256 / concurrency × connect_timeout seconds.
+      • Open ports are confirmed with ANAM (must parse without error) and
+        described with ADEV, over the same connection.
+      • Results are cached for `ttl` seconds; discover(force=True) rescans.
+      • follow(controller): remember the bound analyzer's ANAM whenever the link
+        comes up; when the circuit to it opens, rescan in the background and
+        retarget the transport if it shows up elsewhere: same device name, or,
+        before any name was learned, the only analyzer found. Addresses of the
+        other GASERA_DEVICES are never taken over.
+    """
+
+    def __init__(self, subnets: Optional[Sequence[str]] = None, port: int = GASERA_PORT_NUMBER,
+                 connect_timeout: float = 0.4, io_timeout: float = 1.5,
+                 concurrency: int = 128, ttl: float = 300.0):
+        self.subnets = list(subnets or _default_subnets())
+        self.port = port
+        self.connect_timeout = connect_timeout
+        self.io_timeout = io_timeout
+        self.concurrency = concurrency
+        self.ttl = ttl
+        self.proto = GaseraProtocol()
+        self.known_name: Optional[str] = None  # ANAM of the analyzer we are bound to
+        self._found: List[DiscoveredAnalyzer] = []
+        self._scanned_at = 0.0
+        self._scan_seconds = 0.0
+        self._lock = threading.Lock()
+        self._running = threading.Lock()
+        self._relocating = threading.Lock()  # one follow-up relocation at a time
+
+    # ---- Scanning ------------------------------------------------------------
+
+    def discover(self, force: bool = False) -> List[DiscoveredAnalyzer]:
+        """Cached analyzers, rescanning when the cache expired or force is set."""
+        with self._lock:
+            fresh = self._scanned_at and time.monotonic() - self._scanned_at < self.ttl
+            if fresh and not force:
+                return list(self._found)
+        with self._running:  # one scan at a time; latecomers get its result
+            with self._lock:
+                if not force and self._scanned_at and time.monotonic() - self._scanned_at < self.ttl:
+                    return list(self._found)
+            t0 = time.monotonic()
+            found = asyncio.run(self._scan())
+            with self._lock:
+                self._found = found
+                self._scanned_at = time.monotonic()
+                self._scan_seconds = self._scanned_at - t0
+            log.info(f"Discovery: {len(found)} analyzer(s) in {', '.join(self.subnets)} "
+                     f"({self._scan_seconds:.1f}s)")
+            return list(found)
+
+    def _hosts(self) -> List[str]:
+        hosts = []
+        for net in self.subnets:
+            network = ipaddress.ip_network(net, strict=False)
+            hosts.extend(str(h) for h in (network.hosts() if network.num_addresses > 1 else [network.network_address]))
+        return hosts
+
+    async def _scan(self) -> List[DiscoveredAnalyzer]:
+        sem = asyncio.Semaphore(self.concurrency)
+
+        async def one(host: str) -> Optional[DiscoveredAnalyzer]:
+            async with sem:
+                return await self._probe(host)
+
+        results = await asyncio.gather(*(one(h) for h in self._hosts()))
+        return [r for r in results if r is not None]
+
+    async def _probe(self, host: str) -> Optional[DiscoveredAnalyzer]:
+        t0 = time.monotonic()
+        try:
+            reader, writer = await asyncio.wait_for(asyncio.open_connection(host, self.port), self.connect_timeout)
+        except (asyncio.TimeoutError, OSError):
+            return None
+        rtt_ms = round(1000.0 * (time.monotonic() - t0), 1)
+        try:
+            resp = await self._ask(reader, writer, self.proto.get_device_name())
+            if resp is None:
+                return None
+            anam = self.proto.parse_anam(resp)
+            if anam.error:
+                return None
+            resp = await self._ask(reader, writer, self.proto.get_device_info())
+            info = self.proto.parse_adev(resp).as_string() if resp else ""
+            return DiscoveredAnalyzer(host, self.port, anam.name, info, rtt_ms)
+        except (ValueError, IndexError, OSError):
+            return None  # something listens on the port, but it does not speak AK
+        finally:
+            writer.close()
+
+    async def _ask(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter, cmd: str) -> Optional[str]:
+        writer.write(encode_frame(cmd))
+        await writer.drain()
+        dec = FrameDecoder(256)
+        deadline = time.monotonic() + self.io_timeout
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return None
+            try:
+                data = await asyncio.wait_for(reader.read(1024), remaining)
+            except asyncio.TimeoutError:
+                return None
+            if not data:
+                return None
+            dec.feed(data)
+            frames = dec.frames()
+            if frames:
+                return frames[-1]
+
+    # ---- Following the configured analyzer ------------------------------------
+
+    def follow(self, controller) -> None:
+        """Track controller's analyzer: learn its name when online, go looking for it when the circuit opens."""
+        breaker: Optional[CircuitBreaker] = controller.scheduler.breaker
+
+        def learn_name():
+            result = controller.get_device_name()
+            if result and not result.error:
+                self.known_name = result.name
+
+        def on_connection_change(online: bool):
+            # runs inside the transport's exchange; ask for ANAM from another thread
+            if online:
+                threading.Thread(target=learn_name, daemon=True, name="gasera-discovery-name").start()
+
+        def on_open():
+            threading.Thread(target=self._relocate, args=(controller,), daemon=True,
+                             name="gasera-discovery").start()
+
+        controller.add_connection_listener(on_connection_change)
+        if breaker:
+            breaker.on_open = on_open
+
+    def _relocate(self, controller) -> None:
+        if not self._relocating.acquire(blocking=False):
+            return  # a relocation is already under way
+        try:
+            self._relocate_locked(controller)
+        finally:
+            self._relocating.release()
+
+    def _relocate_locked(self, controller) -> None:
+        transport = controller.transport
+        try:
+            found = self.discover(force=True)
+        except Exception as e:
+            log.error(f"Discovery failed: {e}")
+            return
+        if any(a.host == transport.host for a in found):
+            return  # still where we left it; the outage is something else
+        taken = _registered_endpoints()
+        free = [a for a in found if (a.host, a.port) not in taken]
+        if self.known_name:
+            match = [a for a in free if a.name == self.known_name]
+        else:
+            match = free if len(free) == 1 else []
+        if not match:
+            if found:
+                log.warn(f"Discovery: analyzer not at {transport.host}; candidates: "
+                         + ", ".join(f"{a.host} ({a.name})" for a in found))
+            return
+        new = match[0]
+        log.warn(f"Discovery: analyzer '{new.name}' moved {transport.host} → {new.host}")
+        transport.retarget(new.host, new.port)
+        # answers and layout belonged to the old endpoint
+        controller.cache.invalidate()
+        controller.metadata.invalidate("analyzer moved")
+        if controller.compact:
+            controller.compact.invalidate()
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            age = time.monotonic() - self._scanned_at if self._scanned_at else None
+            return {
+                "subnets": self.subnets,
+                "port": self.port,
+                "scanned_ago": round(age, 1) if age is not None else None,
+                "scan_seconds": round(self._scan_seconds, 2),
+                "known_name": self.known_name,
+                "analyzers": [asdict(a) for a in self._found],
+            }
+
+discovery = AnalyzerDiscovery(GASERA_DISCOVERY_SUBNETS)
@@ -1,27 +1,55 @@
 from .commands import GASERA_COMMANDS
-from .controller import gasera
+from .controller import gasera, WRITE_COMMANDS
+from .response_cache import response_cache
+from .config import GASERA_ASYNC_TRANSPORT
+from . import deadline
 import system.log_utils as log
 
+if GASERA_ASYNC_TRANSPORT:
+    from .controller_facade import gasera_async as gasera
+
 class GaseraCommandDispatcher:
+    def __init__(self, controller=None, cache=None):
+        # None = the process-wide controller / response cache
+        self.controller = controller
+        self.cache = cache or response_cache
+
     def handle(self, command: str, args=None) -> dict:
         args = args or []
         if command not in GASERA_COMMANDS:
             msg = f"Unknown command: {command}"
             log.warn(msg)
             return {"error": msg}
+        if deadline.expired("dispatch"):
+            return {"error": f"Deadline exceeded before '{command}' was sent"}
         try:
-            handler = GASERA_COMMANDS[command]["handler"]
-            result = handler(gasera, args)
-            log.verbose(f"Executed command '{command}', result: {result}", sound = "ok")
-            return self._wrap(result)
+            meta = GASERA_COMMANDS[command]
+            ttl = meta.get("cooldown", 0)
+            if ttl > 0 and meta.get("ak") not in WRITE_COMMANDS:
+                key = (command, tuple(args))
+                wrapped = self.cache.get_or_fetch(key, ttl, lambda: self._execute(command, args))
+                return wrapped if wrapped is not None else self._wrap(None)
+            return self._wrap(self._execute_raw(command, args))
         except Exception as e:
             msg = f"Exception while executing '{command}': {str(e)}"
             log.error(msg)
             return {"error": msg}
 
+    def _execute_raw(self, command: str, args: list):
+        handler = GASERA_COMMANDS[command]["handler"]
+        result = handler(self.controller or gasera, args)
+        log.verbose(f"Executed command '{command}', result: {result}", sound = "ok")
+        return result
+
+    def _execute(self, command: str, args: list):
+        """Run the handler and wrap it; None when the device gave no answer (not cacheable)."""
+        result = self._execute_raw(command, args)
+        return self._wrap(result) if result is not None else None
+
     def _wrap(self, result):
+        # protocol results are slotted; to_dict() is their precompiled JSON shape
         return {
-            "structured": result.__dict__ if hasattr(result, '__dict__') else str(result),
+            "structured": result.to_dict() if hasattr(result, 'to_dict') else str(result),
             "string": result.as_string() if hasattr(result, 'as_string') else str(result)
         }
 
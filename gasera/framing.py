@@ -0,0 +1,130 @@
+# framing.py — incremental STX..ETX frame decoder over a reusable receive buffer
+
+from __future__ import annotations
+
+import socket
+from typing import List
+
+STX_B = b"\x02"
+ETX_B = b"\x03"
+
+class FrameDecoder:
+    """
+    Streaming decoder for AK frames.
+
+    Bytes are received straight into one preallocated bytearray (recv_into on a
+    memoryview), and frames() resumes scanning where the previous call stopped,
+    so each byte is looked at once no matter how the response is chunked.
+
+    Framing rules match the original reader:
+      • bytes before an STX are junk and are discarded (counted in .discarded);
+      • an STX seen before the pending frame's ETX restarts the frame there;
+      • a frame is returned including its STX and ETX, decoded as ASCII (errors ignored).
+    Several complete frames in one recv are all returned, in order.
+    """
+
+    MAX_BUFFER = 1 << 20  # a runaway peer can't grow us past 1 MiB
+
+    def __init__(self, size: int = 4096):
+        self._buf = bytearray(size)
+        self._view = memoryview(self._buf)
+        self.reset()
+
+    def reset(self) -> None:
+        self._start = 0    # first unconsumed byte
+        self._end = 0      # one past the last received byte
+        self._scan = 0     # resume point for the next search
+        self._stx = -1     # index of the pending frame's STX, or -1
+        self.discarded = 0
+
+    @property
+    def in_frame(self) -> bool:
+        """True while an STX has been seen whose ETX has not arrived yet."""
+        return self._stx >= 0
+
+    @property
+    def pending(self) -> int:
+        """Unconsumed bytes currently buffered."""
+        return self._end - self._start
+
+    def tail(self, limit: int = 64) -> bytes:
+        """Copy of the first unconsumed bytes (for diagnostics only)."""
+        return bytes(self._view[self._start:min(self._end, self._start + limit)])
+
+    def recv_into(self, sock: socket.socket) -> int:
+        """Receive once from sock into free buffer space. Returns bytes read (0 on EOF)."""
+        self._make_room()
+        n = sock.recv_into(self._view[self._end:])
+        self._end += n
+        return n
+
+    def feed(self, data: bytes) -> None:
+        """Append bytes that did not come from recv_into (tests, replay)."""
+        view = memoryview(data)
+        while view:
+            self._make_room()
+            n = min(len(view), len(self._buf) - self._end)
+            self._view[self._end:self._end + n] = view[:n]
+            self._end += n
+            view = view[n:]
+
+    def frames(self) -> List[str]:
+        """Extract every complete frame received so far."""
+        out = []
+        buf = self._buf
+        end = self._end
+        while True:
+            if self._stx < 0:
+                i = buf.find(STX_B, self._scan, end)
+                if i < 0:
+                    self.discarded += end - self._start
+                    self._start = self._scan = end
+                    break
+                self.discarded += i - self._start
+                self._start = self._stx = i
+                self._scan = i + 1
+
+            j = buf.find(ETX_B, self._scan, end)
+            k = buf.find(STX_B, self._scan, j if j >= 0 else end)
+            if k >= 0:
+                # new STX before the pending frame closed: drop the partial frame
+                self.discarded += k - self._stx
+                self._start = self._stx = k
+                self._scan = k + 1
+                continue
+            if j < 0:
+                self._scan = end
+                break
+
+            out.append(str(self._view[self._stx:j + 1], "ascii", "ignore"))
+            self._start = self._scan = j + 1
+            self._stx = -1
+
+        if self._start == self._end:
+            self._start = self._end = self._scan = 0  # empty: rewind for free
+        return out
+
+    def _make_room(self) -> None:
+        if self._end < len(self._buf):
+            return
+        if self._start > 0:
+            # compact unconsumed bytes to the front
+            n = self._end - self._start
+            self._view[:n] = self._view[self._start:self._end]
+            shift = self._start
+            self._start = 0
+            self._end = n
+            self._scan -= shift
+            if self._stx >= 0:
+                self._stx -= shift
+            return
+        if len(self._buf) >= self.MAX_BUFFER:
+            # overflow: drop the buffer, but keep it counted (reset() zeroes the counter)
+            dropped = self.discarded + self._end
+            self.reset()
+            self.discarded = dropped
+            return
+        # grow: the memoryview export must be released before resizing
+        self._view.release()
+        self._buf.extend(bytes(len(self._buf)))
+        self._view = memoryview(self._buf)
@@ -0,0 +1,231 @@
+# journal.py — transition-only journal of device status, measurement phase, active errors and link state
+
+from __future__ import annotations
+
+import json
+import os
+import threading
+import time
+from bisect import bisect_left, bisect_right
+from datetime import datetime
+from typing import Dict, List, Optional, Set
+
+import system.log_utils as log
+from .config import (GASERA_JOURNAL, GASERA_JOURNAL_CAPACITY, GASERA_JOURNAL_FILE,
+                     GASERA_JOURNAL_IDLE_GAP, GASERA_JOURNAL_INTERVAL)
+from .protocol import GaseraProtocol
+
+# Replies the watcher diffs; anyone's ASTS/AMST/AERR counts, the watcher only fills the gaps
+WATCHED = ("ASTS", "AMST", "AERR")
+
+class DeviceJournal:
+    """
+    Time-ordered list of state transitions, indexed by time.
+
+      • Entries are dicts: {"t": epoch s, "kind": "status" | "phase" | "error" | "link", ...}.
+        status/phase carry from/to (text) and code; error carries code and
+        to = "active" | "cleared"; link carries to = "online" | "offline".
+      • between(t0, t1) bisects a parallel list of times, so a query costs
+        O(log n + answer) whatever the journal size.
+      • Bounded to `capacity` entries (oldest dropped in chunks); with `path`,
+        entries are appended there as JSON lines and reloaded at startup. The
+        file is rewritten with the kept entries on load and whenever it holds
+        a quarter more lines than that, so it stays bounded too.
+    """
+
+    def __init__(self, capacity: int = GASERA_JOURNAL_CAPACITY, path: Optional[str] = GASERA_JOURNAL_FILE):
+        self.capacity = capacity
+        self.path = path
+        self._lock = threading.Lock()
+        self._times: List[float] = []
+        self._entries: List[dict] = []
+        self._file_lines = 0  # lines in `path`, kept or not
+        if path:
+            self._load(path)
+
+    def _load(self, path: str) -> None:
+        try:
+            with open(path, encoding="utf-8") as fh:
+                for line in fh:
+                    self._file_lines += 1
+                    try:
+                        entry = json.loads(line)
+                        self._append(entry)
+                    except (ValueError, KeyError, TypeError):
+                        continue  # a torn last line after a power cut
+        except FileNotFoundError:
+            return
+        log.info(f"Journal: {len(self._entries)} entries loaded from {path}")
+        if self._file_lines > self.capacity:
+            self._compact()
+
+    def _compact(self) -> None:
+        # rewrite the file with the newest `capacity` entries (atomic replace)
+        kept = self._entries[-self.capacity:]
+        tmp = self.path + ".tmp"
+        try:
+            with open(tmp, "w", encoding="utf-8") as fh:
+                fh.writelines(json.dumps(e) + "\n" for e in kept)
+            os.replace(tmp, self.path)
+        except OSError as e:
+            log.error(f"Journal: cannot compact {self.path}: {e}")
+            return
+        log.info(f"Journal: {self.path} compacted from {self._file_lines} to {len(kept)} lines")
+        self._file_lines = len(kept)
+
+    def _append(self, entry: dict) -> None:
+        t = max(entry["t"], self._times[-1]) if self._times else entry["t"]  # keep the index sorted
+        self._times.append(t)
+        self._entries.append(entry)
+        if len(self._entries) > self.capacity + self.capacity // 4:
+            drop = len(self._entries) - self.capacity
+            del self._times[:drop]
+            del self._entries[:drop]
+
+    def record(self, kind: str, **fields) -> dict:
+        entry = {"t": round(time.time(), 3), "kind": kind, **fields}
+        with self._lock:
+            self._append(entry)
+            if self.path:
+                try:
+                    with open(self.path, "a", encoding="utf-8") as fh:
+                        fh.write(json.dumps(entry) + "\n")
+                    self._file_lines += 1
+                except OSError as e:
+                    log.error(f"Journal: cannot write {self.path}: {e}")
+                if self._file_lines > self.capacity + self.capacity // 4:
+                    self._compact()
+        return entry
+
+    def between(self, t0: float = 0.0, t1: Optional[float] = None, kinds: Optional[Set[str]] = None) -> List[dict]:
+        """Entries with t0 <= t <= t1 (epoch seconds), oldest first, optionally of some kinds only."""
+        with self._lock:
+            lo = bisect_left(self._times, t0)
+            hi = len(self._times) if t1 is None else bisect_right(self._times, t1)
+            found = self._entries[lo:hi]
+        if kinds:
+            found = [e for e in found if e["kind"] in kinds]
+        return [{**e, "time": datetime.fromtimestamp(e["t"]).strftime("%Y-%m-%d %H:%M:%S")} for e in found]
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+class StatusWatcher:
+    """
+    Feeds DeviceJournal with transitions of ASTS, AMST and AERR.
+
+      • Passive first: every ASTS/AMST/AERR reply the controller gets (measurement
+        state machine, UI polling, console) is diffed against the last snapshot.
+      • Only what nobody else asked for within `interval` s is polled, in one
+        batch, and only in an idle gap like telemetry: link up, nothing queued
+        or on the wire in the scheduler, no exchange for `idle_gap` s. Link
+        changes are journaled too.
+      • The first reading after startup or a reconnect is journaled as a
+        transition from None, so every interval starts from a known state.
+    """
+
+    def __init__(self, controller, journal: DeviceJournal, interval: float = GASERA_JOURNAL_INTERVAL,
+                 idle_gap: float = GASERA_JOURNAL_IDLE_GAP):
+        self.controller = controller
+        self.journal = journal
+        self.interval = interval
+        self.idle_gap = idle_gap
+        self.proto = GaseraProtocol()
+        self._lock = threading.Lock()
+        self._seen: Dict[str, float] = dict.fromkeys(WATCHED, 0.0)  # monotonic time of the last reply
+        self.status: Optional[tuple] = None  # (code, text)
+        self.phase: Optional[tuple] = None
+        self.errors: Optional[Set[str]] = None
+        self.polls = 0
+        self._thread = None
+        controller.add_exchange_listener(self.observe)
+        controller.add_connection_listener(self._on_link)
+
+    def start(self):
+        if self._thread and self._thread.is_alive():
+            return  # already running
+        self._thread = threading.Thread(target=self._loop, daemon=True, name="gasera-journal")
+        self._thread.start()
+
+    def _loop(self):
+        while True:
+            try:
+                self.poll_stale()
+            except Exception as e:
+                log.error(f"Journal poll failed: {e}")
+            time.sleep(min(1.0, self.interval / 2))
+
+    def _idle(self) -> bool:
+        transport = self.controller.transport
+        if not transport.is_connected():
+            return False
+        scheduler = getattr(self.controller, "scheduler", None)
+        if scheduler is not None and not scheduler.idle():
+            return False
+        return time.monotonic() - transport.last_activity >= self.idle_gap
+
+    def poll_stale(self) -> bool:
+        now = time.monotonic()
+        stale = [f for f in WATCHED if now - self._seen[f] >= self.interval]
+        if not stale or not self._idle():
+            return False
+        self.polls += 1
+        self.controller.batch(stale)  # replies come back through observe()
+        return True
+
+    def _on_link(self, online: bool) -> None:
+        self.journal.record("link", to="online" if online else "offline")
+        with self._lock:
+            self.status = self.phase = self.errors = None  # re-baseline after the gap
+
+    def observe(self, func: str, resp: str) -> None:
+        if func not in WATCHED:
+            return
+        try:
+            result = self.proto.decode(resp, func)
+        except (ValueError, IndexError):
+            return
+        if result.error:
+            return
+        with self._lock:
+            self._seen[func] = time.monotonic()
+            if func == "ASTS":
+                new = (result.status_code, result.status_str)
+                if new != self.status:
+                    self._transition("status", self.status, new)
+                    self.status = new
+            elif func == "AMST":
+                new = (result.status_code, result.description)
+                if new != self.phase:
+                    self._transition("phase", self.phase, new)
+                    self.phase = new
+            else:
+                codes = set(result.codes)
+                old = self.errors or set()
+                for code in sorted(codes - old):
+                    self.journal.record("error", code=code, to="active")
+                if self.errors is not None:
+                    for code in sorted(old - codes):
+                        self.journal.record("error", code=code, to="cleared")
+                self.errors = codes
+
+    def _transition(self, kind: str, old: Optional[tuple], new: tuple) -> None:
+        self.journal.record(kind, code=new[0], to=new[1], **{"from": old[1] if old else None})
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "status": self.status[1] if self.status else None,
+                "phase": self.phase[1] if self.phase else None,
+                "errors": sorted(self.errors) if self.errors is not None else None,
+                "entries": len(self.journal),
+                "polls": self.polls,
+            }
+
+def start_journal(controller, path: Optional[str] = GASERA_JOURNAL_FILE) -> Optional[StatusWatcher]:
+    """Start journaling `controller`'s analyzer (None when GASERA_JOURNAL is False)."""
+    if not GASERA_JOURNAL:
+        return None
+    watcher = StatusWatcher(controller, DeviceJournal(path=path))
+    watcher.start()
+    return watcher
@@ -0,0 +1,93 @@
+# liveness.py — passive link liveness with an idle-only background prober
+
+from __future__ import annotations
+
+import threading
+import time
+
+from typing import Optional
+
+import system.log_utils as log
+from .circuit_breaker import CircuitBreaker
+from .protocol import GaseraProtocol
+from .tcp_client import GaseraTCPClient, tcp_client
+
+class LinkMonitor:
+    """
+    Keeps GaseraTCPClient's link state fresh without touching the wire on reads.
+
+    Real exchanges already report their outcome to the client (send_command →
+    on_connection_change). This monitor only steps in when the link has been
+    quiet for idle_after seconds, and then sends one ASTS: only an answered AK
+    exchange counts as online (a port that accepts TCP but resets or ignores the
+    protocol is offline). The exchange reports its own outcome to the client.
+    Readers call client.is_connected(), which is a memory lookup.
+
+    With a CircuitBreaker attached, probe results feed the breaker too, and while
+    it is open the monitor probes on the breaker's backoff schedule instead.
+    """
+
+    def __init__(self, client: GaseraTCPClient, idle_after: float = 15.0, poll_interval: float = 0.5,
+                 breaker: Optional[CircuitBreaker] = None):
+        self.client = client
+        self.idle_after = idle_after
+        self.poll_interval = poll_interval
+        self.breaker = breaker
+        self._last_probe = 0.0
+        self._probe_cmd = GaseraProtocol().build_command("ASTS")
+        self._thread = None
+
+    def start(self):
+        if self._thread and self._thread.is_alive():
+            return  # already running
+        self._thread = threading.Thread(target=self._loop, daemon=True, name="gasera-liveness")
+        self._thread.start()
+
+    def _loop(self):
+        while True:
+            try:
+                self.probe_if_idle()
+            except Exception as e:
+                log.error(f"Liveness probe failed: {e}")
+            time.sleep(self.poll_interval)
+
+    def probe_if_idle(self) -> bool:
+        """
+        Probe once if the open breaker's backoff has elapsed, or (breaker closed)
+        if neither traffic nor a previous probe happened within idle_after.
+        """
+        breaker = self.breaker
+        if breaker and not breaker.allow():
+            if not breaker.probe_due():
+                return False
+        else:
+            quiet_since = max(self.client.last_activity, self._last_probe)
+            if time.monotonic() - quiet_since < self.idle_after:
+                return False
+        # a real exchange (bounded by the client's own timeouts), serialized with
+        # the scheduler's on the transport lock
+        ok = self.client.send_command(self._probe_cmd) is not None
+        self._last_probe = time.monotonic()
+        if breaker:
+            if ok:
+                breaker.record_success()
+            else:
+                breaker.record_failure()
+        return True
+
+    def snapshot(self) -> dict:
+        """Link state plus seconds since the last real exchange or probe, from memory."""
+        last = max(self.client.last_activity, self._last_probe)
+        snap = {
+            "online": self.client.is_connected(),
+            "checked_ago": round(time.monotonic() - last, 1) if last else None,
+        }
+        if self.breaker:
+            snap["circuit"] = self.breaker.snapshot()
+        return snap
+
+# Shared breaker for the default device link (fed by the scheduler and the monitor)
+breaker = CircuitBreaker()
+
+# started by controller.py once on_connection_change is wired
+link_monitor = LinkMonitor(tcp_client, breaker=breaker)
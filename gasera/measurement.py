@@ -1,14 +1,21 @@
 import time
 import threading
 import re
+from contextlib import nullcontext
 from gpio.motor_control import motor
 from gpio.gpio_control import gpio
 from .controller import gasera
+from .config import GASERA_ASYNC_TRANSPORT
+from .scheduler import Lane
 from system.preferences import prefs, KEY_MEASUREMENT_DURATION
 from config.constants import (TRIGGER_PIN, DEBOUNCE_INTERVAL, MEASUREMENT_CHECK_INTERVAL, DEFAULT_MEASUREMENT_DURATION)
 from .async_timer_bank import AsyncTimerBank
 import system.log_utils as log
 
+if GASERA_ASYNC_TRANSPORT:
+    # one session per analyzer: the sequence must share the routes' transport
+    from .controller_facade import gasera_async as gasera
+
 class MeasurementController:
     class State:
         IDLE = 'idle'
@@ -22,7 +29,12 @@ class MeasurementController:
         MOVING_HOME = 'moving_home'
         CLEAN_UP_STATE = 'clean_up_state'
 
-    def __init__(self):
+    def __init__(self, controller=None, hardware: bool = True):
+        # controller: the analyzer this sequence drives (None = the process-wide one).
+        # hardware: this sequence owns the probe motors and the trigger pin; the Pi has
+        # one set, so the state machines of additional analyzers run without them.
+        self.gasera = controller or gasera
+        self.hardware = hardware
         self.measurement_duration_sec: int = prefs.get_int(KEY_MEASUREMENT_DURATION, DEFAULT_MEASUREMENT_DURATION)
         self.state = self.State.IDLE
         self.last_event = None
@@ -41,6 +53,8 @@ class MeasurementController:
         return self.measurement_duration_sec
 
     def check_hw_trigger(self):
+        if not self.hardware:
+            return
         now = time.monotonic()
         current = gpio.read(TRIGGER_PIN)
         if self._last_trigger_state == 1 and current == 0:
@@ -54,7 +68,7 @@ class MeasurementController:
 
     def trigger(self, source: str = "API"):
         with self.lock:
-            if gasera.check_device_connection() is False:
+            if self.gasera.check_device_connection() is False:
                 self.last_event = log.warn("Cannot trigger measurement: Gasera not connected")
                 return self.last_event
             if self.state == self.State.IDLE:
@@ -76,7 +90,8 @@ class MeasurementController:
                 self.task_triggered = False
                 self.last_event = log.warn("Aborting Measurement Sequence!", sound="cancel")
                 if self.state in {self.State.MOVE_TO_PROBE, self.State.MOVING_TO_PROBE}:
-                    motor.stop_both() # stop movement first to let motor move to home
+                    if self.hardware:
+                        motor.stop_both() # stop movement first to let motor move to home
                     self.transition(self.State.MOVE_HOME, delay=2.0)
                 elif self.state in {self.State.START_MEASUREMENT, self.State.GASERA_MEASURES} :
                     self.transition(self.State.STOP_MEASUREMENT, delay=2.0)
@@ -92,12 +107,16 @@ class MeasurementController:
             return  # already running
 
         def loop():
-            while True:
-                self.check_hw_trigger()
-                self.tick()
-                time.sleep(interval)
+            # state-machine traffic gets its own lane, ahead of UI polling
+            # (the asyncio engine has no scheduler and no lanes)
+            scheduler = getattr(self.gasera, "scheduler", None)
+            with scheduler.lane(Lane.MEASUREMENT) if scheduler else nullcontext():
+                while True:
+                    self.check_hw_trigger()
+                    self.tick()
+                    time.sleep(interval)
 
-        self._tick_thread = threading.Thread(target=loop, daemon=True)
+        self._tick_thread = threading.Thread(target=loop, daemon=True, name="gasera-measurement")
         self._tick_thread.start()
 
     def tick(self):
@@ -108,8 +127,11 @@ class MeasurementController:
                 self.last_event = log.info("Checking Gasera status...")
         elif self.state == self.State.CHECK_GASERA_STATUS:
             if self.timers.expired("state_delay"):
-                status = gasera.get_device_status()
-                status_str = status.status_str if status else "No Response"
+                # status and active errors in one device session
+                status, errors = self.gasera.batch(["ASTS", "AERR"])
+                status_str = status.result.status_str if status.ok else "No Response"
+                if errors.ok and errors.result.codes:
+                    log.warn(f"Gasera active errors: {', '.join(errors.result.codes)}")
                 if "IDLE" in status_str.upper():
                     self.last_event = log.info("Gasera is IDLE.")
                     self.transition(self.State.MOVE_TO_PROBE, delay=2.0)
@@ -122,16 +144,17 @@ class MeasurementController:
                         self.last_event = log.warn(f"Gasera not ready: {status_str}. Retrying...")
                         self.timers.restart("state_delay", 2.0)
         elif self.state == self.State.MOVE_TO_PROBE:
-            motor.start_both("cw")
+            if self.hardware:
+                motor.start_both("cw")
             self.last_event = log.info("Moving to probe...")
             self.transition(self.State.MOVING_TO_PROBE)
         elif self.state == self.State.MOVING_TO_PROBE:
-            if motor.are_both_done():
+            if not self.hardware or motor.are_both_done():
                 self.last_event = log.info("Reached probe position. Starting measurement...")
                 self.transition(self.State.START_MEASUREMENT, delay=2.0)
         elif self.state == self.State.START_MEASUREMENT:
             if self.timers.expired("state_delay"):
-                resp = gasera.start_measurement()
+                resp = self.gasera.start_measurement()
                 if resp:
                     self.last_event = log.info("Measurement started.")
                     self.wait_seconds = self.measurement_duration_sec
@@ -152,7 +175,7 @@ class MeasurementController:
                     self.transition(self.State.STOP_MEASUREMENT, delay=2.0)
         elif self.state == self.State.STOP_MEASUREMENT:
             if self.timers.expired("state_delay"):
-                resp = gasera.stop_measurement()
+                resp = self.gasera.stop_measurement()
                 if resp:
                     self.last_event = log.info("Measurement stopped.")
                 else:
@@ -160,11 +183,12 @@ class MeasurementController:
                 self.transition(self.State.MOVE_HOME, delay=2.0)
         elif self.state == self.State.MOVE_HOME:
             if self.timers.expired("state_delay"):
-                motor.start_both("ccw")
+                if self.hardware:
+                    motor.start_both("ccw")
                 self.last_event = log.info("Returning to home position...")
                 self.transition(self.State.MOVING_HOME)
         elif self.state == self.State.MOVING_HOME:
-            if motor.are_both_done():
+            if not self.hardware or motor.are_both_done():
                 self.last_event = log.info("Measurement sequence complete!")
                 self.transition(self.State.CLEAN_UP_STATE, delay=2.0)
         elif self.state == self.State.CLEAN_UP_STATE:
@@ -0,0 +1,157 @@
+# metrics.py — minimal Prometheus-style counters/histograms for the analyzer link
+
+from __future__ import annotations
+
+import threading
+from bisect import bisect_left
+from typing import Callable, Dict, Iterable, List, Tuple
+
+# Latency buckets (seconds) sized for a LAN device: sub-ms up to the 10 s worst case
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+def _fmt_labels(names: Tuple[str, ...], values: Tuple[str, ...], extra: str = "") -> str:
+    parts = [f'{n}="{v}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+def _fmt_value(v: float) -> str:
+    if v == float("inf"):
+        return "+Inf"
+    return repr(float(v)) if isinstance(v, float) and not v.is_integer() else str(int(v))
+
+class Counter:
+    kind = "counter"
+
+    def __init__(self, name: str, help: str, labelnames: Tuple[str, ...] = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = labelnames
+        self._lock = threading.Lock()
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, *labels: str, amount: float = 1.0) -> None:
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def value(self, *labels: str) -> float:
+        return self._values.get(labels, 0.0)
+
+    def samples(self) -> Iterable[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        for labels, v in items:
+            yield f"{self.name}{_fmt_labels(self.labelnames, labels)} {_fmt_value(v)}"
+
+class Histogram:
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, labelnames: Tuple[str, ...] = (),
+                 buckets: Tuple[float, ...] = LATENCY_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labelnames = labelnames
+        self.buckets = tuple(buckets)
+        self._lock = threading.Lock()
+        self._series: Dict[Tuple[str, ...], List] = {}  # labels -> [bucket counts..., sum, count]
+
+    def observe(self, value: float, *labels: str) -> None:
+        idx = bisect_left(self.buckets, value)  # first bucket with le >= value
+        with self._lock:
+            s = self._series.get(labels)
+            if s is None:
+                s = self._series[labels] = [0] * (len(self.buckets) + 1) + [0.0, 0]
+            s[idx] += 1
+            s[-2] += value
+            s[-1] += 1
+
+    def samples(self) -> Iterable[str]:
+        with self._lock:
+            items = sorted((k, list(v)) for k, v in self._series.items())
+        for labels, s in items:
+            cumulative = 0
+            for le, n in zip(self.buckets + (float("inf"),), s[:-2]):
+                cumulative += n
+                le_label = 'le="%s"' % _fmt_value(le)
+                yield f"{self.name}_bucket{_fmt_labels(self.labelnames, labels, le_label)} {cumulative}"
+            yield f"{self.name}_sum{_fmt_labels(self.labelnames, labels)} {_fmt_value(s[-2])}"
+            yield f"{self.name}_count{_fmt_labels(self.labelnames, labels)} {s[-1]}"
+
+class GaugeFunc:
+    """
+    Value read at scrape time: fn() returns {label values tuple: number} or a number.
+    kind="counter" exports an existing monotonic tally (e.g. scheduler stats) as a counter.
+    """
+
+    def __init__(self, name: str, help: str, fn: Callable, labelnames: Tuple[str, ...] = (),
+                 kind: str = "gauge"):
+        self.kind = kind
+        self.name = name
+        self.help = help
+        self.labelnames = labelnames
+        self.fn = fn
+
+    def samples(self) -> Iterable[str]:
+        try:
+            values = self.fn()
+        except Exception:
+            return
+        if not isinstance(values, dict):
+            values = {(): values}
+        for labels, v in sorted(values.items()):
+            yield f"{self.name}{_fmt_labels(self.labelnames, labels)} {_fmt_value(v)}"
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics: Dict[str, object] = {}
+        self._lock = threading.Lock()
+
+    def _register(self, metric):
+        with self._lock:
+            return self._metrics.setdefault(metric.name, metric)
+
+    def counter(self, name: str, help: str, labelnames: Tuple[str, ...] = ()) -> Counter:
+        return self._register(Counter(name, help, labelnames))
+
+    def histogram(self, name: str, help: str, labelnames: Tuple[str, ...] = (),
+                  buckets: Tuple[float, ...] = LATENCY_BUCKETS) -> Histogram:
+        return self._register(Histogram(name, help, labelnames, buckets))
+
+    def gauge_func(self, name: str, help: str, fn: Callable, labelnames: Tuple[str, ...] = (),
+                   kind: str = "gauge") -> GaugeFunc:
+        with self._lock:
+            g = GaugeFunc(name, help, fn, labelnames, kind)
+            self._metrics[name] = g  # latest provider wins (re-created singletons)
+            return g
+
+    def render(self) -> str:
+        """Prometheus text exposition format (version 0.0.4)."""
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = []
+        for m in metrics:
+            lines.append(f"# HELP {m.name} {m.help}")
+            lines.append(f"# TYPE {m.name} {m.kind}")
+            lines.extend(m.samples())
+        return "\n".join(lines) + "\n"
+
+metrics = MetricsRegistry()
+
+# ---- Analyzer link (labelled by AK function code) -----------------------------
+
+LINK_CONNECT = metrics.histogram("gasera_connect_seconds", "TCP connect time to the analyzer", ("func",))
+LINK_FIRST_BYTE = metrics.histogram("gasera_first_byte_seconds", "Request sent to first response byte", ("func",))
+LINK_FRAME = metrics.histogram("gasera_frame_seconds", "Request sent to complete STX..ETX frame", ("func",))
+LINK_EXCHANGE = metrics.histogram("gasera_exchange_seconds", "Whole send_command call incl. retries and jitter", ("func",))
+LINK_RETRIES = metrics.counter("gasera_retries_total", "Second attempts taken by send_command", ("func",))
+LINK_TIMEOUTS = metrics.counter("gasera_timeouts_total", "Reads that hit their deadline without a frame", ("func",))
+LINK_CONNECT_FAILURES = metrics.counter("gasera_connect_failures_total", "Failed TCP connects", ("func",))
+LINK_FAILURES = metrics.counter("gasera_failures_total", "send_command calls that returned no response", ("func",))
+LINK_BYTES_SENT = metrics.counter("gasera_bytes_sent_total", "Request bytes written", ("func",))
+LINK_BYTES_RECEIVED = metrics.counter("gasera_bytes_received_total", "Response bytes read (incl. junk)", ("func",))
+LINK_DRAINED = metrics.counter("gasera_drained_bytes_total", "Stale bytes discarded by the pre-send drain", ("func",))
+LINK_JUNK = metrics.counter("gasera_junk_bytes_total", "Bytes discarded before STX or in dropped frames", ("func",))
+
+# ---- Scheduler ----------------------------------------------------------------
+
+SCHED_WAIT = metrics.histogram("gasera_scheduler_wait_seconds", "Queue wait before a command hits the wire", ("lane",))
@@ -1,5 +1,6 @@
-from dataclasses import dataclass
-from typing import List, Tuple
+import re
+from dataclasses import dataclass, fields
+from typing import Callable, Dict, List, Optional, Tuple, get_args, get_origin
 from datetime import datetime
 from .config import get_cas_details
 
@@ -8,7 +9,38 @@ ETX = chr(3)
 
 # --- Data Classes ---
 
-@dataclass
+def _dict_expr(cls, var: str, depth: int = 0) -> str:
+    """Source of a dict literal for an instance of result class cls held in var (nested results inlined)."""
+    items = []
+    for f in fields(cls):
+        attr = f"{var}.{f.name}"
+        args = get_args(f.type) if get_origin(f.type) is list else ()
+        if args and hasattr(args[0], "__dataclass_fields__"):
+            item = f"_{depth}"
+            expr = f"[{_dict_expr(args[0], item, depth + 1)} for {item} in {attr}]"
+        elif hasattr(f.type, "__dataclass_fields__"):
+            expr = _dict_expr(f.type, attr, depth + 1)
+        else:
+            expr = attr
+        items.append(f"{f.name!r}: {expr}")
+    return "{" + ", ".join(items) + "}"
+
+def result_type(cls):
+    """
+    Slotted dataclass plus a to_dict() compiled once from its field list.
+
+    to_dict() is the JSON shape served by the API (what __dict__ used to give):
+    nested result objects, and lists of them, are expanded inline in the same
+    expression; everything else is passed through as is.
+    """
+    cls = dataclass(slots=True)(cls)
+    ns: dict = {}
+    exec(f"def to_dict(self):\n    return {_dict_expr(cls, 'self')}\n", ns)
+    ns["to_dict"].__qualname__ = f"{cls.__qualname__}.to_dict"
+    cls.to_dict = ns["to_dict"]
+    return cls
+
+@result_type
 class DeviceStatus:
     error: bool
     status_code: int
@@ -17,7 +49,7 @@ class DeviceStatus:
     def as_string(self):
         return f"Device Status: {self.status_str} (code={self.status_code})"
 
-@dataclass
+@result_type
 class ErrorList:
     error: bool
     codes: List[str]
@@ -25,7 +57,7 @@ class ErrorList:
     def as_string(self):
         return "Active Errors: " + ", ".join(self.codes) if not self.error else "Error retrieving error list."
 
-@dataclass
+@result_type
 class TaskList:
     error: bool
     tasks: List[Tuple[str, str]]  # (task_id, task_name)
@@ -33,31 +65,37 @@ class TaskList:
     def as_string(self):
         return "Task List:\n" + "\n".join(f"{tid}: {tname}" for tid, tname in self.tasks)
 
-@dataclass
+def inlet_label(inlet: int, label: str) -> str:
+    """Gas label as shown for one sampler inlet (unchanged when there is no inlet column)."""
+    return f"Inlet {inlet}: {label}" if inlet else label
+
+@result_type
 class ACONRecord:
     timestamp: int
     cas: str
     ppm: float
+    inlet: int = 0  # sampler inlet; 0 when the reply has no inlet column
 
-@dataclass
+@result_type
 class ACONResult:
     error: bool
-    records: List[ACONRecord]  # (timestamp, CAS, ppm)
+    records: List[ACONRecord]
 
     def as_string(self):
             return f"Measurement Results ({self.readable_time}):\n" + "\n".join(
-                f"{get_cas_details(rec.cas)['label']}: {rec.ppm:.4f} ppm" for rec in self.records
+                f"{inlet_label(rec.inlet, get_cas_details(rec.cas)['label'])}: {rec.ppm:.4f} ppm" for rec in self.records
             ) if not self.error else "Error retrieving measurement results."
     
     @property
     def timestamp(self):
-        return self.records[0].timestamp if self.records else None
+        # newest row: with several inlets each one carries its own last result
+        return max(rec.timestamp for rec in self.records) if self.records else None
 
     @property
     def readable_time(self):
         return datetime.fromtimestamp(self.timestamp).strftime("%Y-%m-%d %H:%M:%S") if self.timestamp else None
 
-@dataclass
+@result_type
 class MeasurementStatus:
     error: bool
     status_code: int
@@ -66,7 +104,7 @@ class MeasurementStatus:
     def as_string(self):
         return f"Measurement Phase: {self.description} (code={self.status_code})"
 
-@dataclass
+@result_type
 class DeviceName:
     error: bool
     name: str
@@ -74,7 +112,7 @@ class DeviceName:
     def as_string(self):
         return f"Device Name: {self.name}" if not self.error else "Error retrieving device name."
 
-@dataclass
+@result_type
 class DeviceInfo:
     error: bool
     info: str
@@ -82,7 +120,7 @@ class DeviceInfo:
     def as_string(self):
         return f"Device Info: {self.info}" if not self.error else "Error retrieving device information."
 
-@dataclass
+@result_type
 class IterationNumber:
     error: bool
     iteration: int
@@ -90,7 +128,7 @@ class IterationNumber:
     def as_string(self):
         return f"Iteration: {self.iteration}" if not self.error else "Error retrieving iteration."
 
-@dataclass
+@result_type
 class NetworkSettings:
     error: bool
     use_dhcp: bool
@@ -101,7 +139,7 @@ class NetworkSettings:
     def as_string(self):
         return f"DHCP: {self.use_dhcp}, IP: {self.ip}, Netmask: {self.netmask}, Gateway: {self.gateway}"
 
-@dataclass
+@result_type
 class DateTimeResult:
     error: bool
     datetime_str: str
@@ -112,7 +150,7 @@ class DateTimeResult:
         clean_str = self.datetime_str.replace("T", " ") # Replace 'T' with space
         return f"Device Time: {clean_str}"
 
-@dataclass
+@result_type
 class SelfTestResult:
     error: bool
     code: int
@@ -121,10 +159,10 @@ class SelfTestResult:
     def as_string(self):
         return f"Self-Test: {self.description} (code={self.code})" if not self.error else "Error retrieving self-test result."
 
-@dataclass
+@result_type
 class TaskParameters:
     error: bool
-    cas_list: list
+    cas_list: List[str]
     target_pressure: float
     flush_bypass: float
     flush_cell: float
@@ -142,7 +180,7 @@ class TaskParameters:
             f"Flush Cycles: {self.flush_cycles}"
         )
 
-@dataclass
+@result_type
 class SystemParameter:
     name: str
     value: float
@@ -150,10 +188,10 @@ class SystemParameter:
     max_val: float
     unit: str
 
-@dataclass
+@result_type
 class SystemParameters:
     error: bool
-    params: list  # List[SystemParameter]
+    params: List[SystemParameter]
 
     def as_string(self):
         if self.error:
@@ -162,17 +200,17 @@ class SystemParameters:
             f"{p.name}: {p.value} [{p.min_val}..{p.max_val}] {p.unit}" for p in self.params
         )
 
-@dataclass
+@result_type
 class InletConfig:
     id: int
     active: bool
     bypass_time: float
 
-@dataclass
+@result_type
 class SamplerParameters:
     error: bool
     mps_connected: bool
-    inlets: list  # List[InletConfig]
+    inlets: List[InletConfig]
 
     def as_string(self):
         if self.error:
@@ -184,7 +222,7 @@ class SamplerParameters:
             for i in self.inlets
         )
 
-@dataclass
+@result_type
 class ParameterValue:
     error: bool
     value: str
@@ -192,7 +230,7 @@ class ParameterValue:
     def as_string(self):
         return f"Parameter Value: {self.value}" if not self.error else "Error retrieving parameter."
 
-@dataclass
+@result_type
 class GenericResponse:
     error: bool
     command: str
@@ -200,31 +238,238 @@ class GenericResponse:
     def as_string(self):
         return f"{self.command} response: {'Error' if self.error else 'Success'}"
 
+# --- Codec ---
+
+STATUS_MAP = {
+    0: "Initializing",
+    1: "Initialization error",
+    2: "Idle",
+    3: "Self-test in progress",
+    4: "Malfunction",
+    5: "Measuring",
+    6: "Calibration",
+    7: "Cancelling",
+    8: "Laser scan",
+}
+
+PHASE_MAP = {
+    0: "Idle",
+    1: "Gas exchange",
+    2: "Integration",
+    3: "Analysis",
+    4: "Laser tuning"
+}
+
+SELF_TEST_MAP = {
+    -2: "Result N/A",
+    -1: "Test in progress",
+     0: "Self-test failed",
+     1: "Self-test passed"
+}
+
+_QUOTED_TOKEN = re.compile(r'"([^"]*)"|(\S+)')
+
+def tokenize(response: str, quoted: bool = False) -> List[str]:
+    """
+    Framed response → [FUNC, status, field, ...], the one tokenizer behind every parser.
+    quoted=True keeps "double quoted" fields (ADEV) whole, without the quotes.
+    """
+    if response[:1] != STX or response[-1:] != ETX:
+        raise ValueError("Invalid response framing")
+    if quoted and '"' in response:
+        tokens = [bare or text for text, bare in _QUOTED_TOKEN.findall(response, 1, len(response) - 1)]
+    else:
+        tokens = response[1:-1].split()
+    if len(tokens) < 2:
+        raise ValueError("Malformed response")
+    return tokens
+
+# Reply decoders: (status token, fields after it) → result object
+
+def _asts(status: str, f: List[str]) -> DeviceStatus:
+    code = int(f[0]) if f and status == '0' else -1
+    return DeviceStatus(status != '0', code, STATUS_MAP.get(code, "Unknown"))
+
+def _aerr(status: str, f: List[str]) -> ErrorList:
+    error = status != '0'
+    return ErrorList(error, f if not error else [])
+
+def _atsk(status: str, f: List[str]) -> TaskList:
+    error = status != '0'
+    tasks = []
+    if not error:
+        i, n = 0, len(f)
+        while i < n:
+            task_id = f[i]
+            i += 1
+            j = i
+            while j < n and not f[j].isdigit():
+                j += 1
+            tasks.append((task_id, " ".join(f[i:j])))
+            i = j
+    return TaskList(error, tasks)
+
+def acon_stride(f: List[str]) -> int:
+    """
+    Fields per record of a full-format ACON reply: 3 (timestamp, CAS, ppm), or 4
+    with the inlet column (SCON 4th bit, MW 1.8.2+). The second record's CAS
+    number tells them apart; a single record is told by the field count.
+    """
+    if len(f) == 4:
+        return 4
+    return 4 if len(f) > 5 and "-" not in f[4] else 3
+
+def _acon(status: str, f: List[str]) -> ACONResult:
+    if status != '0':
+        return ACONResult(True, [])
+    k = acon_stride(f)
+    n = len(f) - len(f) % k  # an incomplete tail is ignored
+    stamps = f[0:n:k]
+    epoch = dict.fromkeys(stamps)  # rows of one reply share one or a few timestamps: convert each once
+    for t in epoch:
+        epoch[t] = int(t)
+    columns = [map(epoch.__getitem__, stamps), f[1:n:k], map(float, f[2:n:k])]
+    if k == 4:
+        columns.append(map(int, f[3:n:k]))
+    return ACONResult(False, list(map(ACONRecord, *columns)))
+
+def _amst(status: str, f: List[str]) -> MeasurementStatus:
+    error = status != '0'
+    code = int(f[0]) if f and not error else -1
+    return MeasurementStatus(error, code, PHASE_MAP.get(code, "Unknown"))
+
+def _anam(status: str, f: List[str]) -> DeviceName:
+    error = status != '0'
+    return DeviceName(error, " ".join(f) if not error else "")
+
+def _adev(status: str, f: List[str]) -> DeviceInfo:
+    error = status != '0'
+    info = " | ".join(part if part else "-" for part in f) if not error else ""
+    return DeviceInfo(error, info)
+
+def _aitr(status: str, f: List[str]) -> IterationNumber:
+    error = status != '0'
+    return IterationNumber(error, int(f[0]) if not error and f else -1)
+
+def _anet(status: str, f: List[str]) -> NetworkSettings:
+    if status != '0' or len(f) < 4:
+        return NetworkSettings(True, False, '', '', '')
+    return NetworkSettings(False, f[0] == '1', f[1], f[2], f[3])
+
+def _aclk(status: str, f: List[str]) -> DateTimeResult:
+    error = status != '0'
+    return DateTimeResult(error, f[0] if not error and f else "")
+
+def _astr(status: str, f: List[str]) -> SelfTestResult:
+    error = status != '0'
+    code = int(f[0]) if f and not error else -99
+    return SelfTestResult(error, code, SELF_TEST_MAP.get(code, "Unknown"))
+
+def _atsp(status: str, f: List[str]) -> TaskParameters:
+    if status != '0' or len(f) < 5:
+        return TaskParameters(True, [], 0.0, 0.0, 0.0, 0)
+    try:
+        # CAS list is comma-separated in one field
+        return TaskParameters(False, f[0].split(','), float(f[1]), float(f[2]), float(f[3]), int(f[4]))
+    except ValueError:
+        return TaskParameters(True, [], 0.0, 0.0, 0.0, 0)
+
+def _asyp(status: str, f: List[str]) -> SystemParameters:
+    if status != '0' or not f:
+        return SystemParameters(True, [])
+    params = []
+    for part in f:
+        tokens = part.split(',')
+        if len(tokens) != 5:
+            continue
+        try:
+            params.append(SystemParameter(tokens[0], float(tokens[1]), float(tokens[2]), float(tokens[3]), tokens[4]))
+        except ValueError:
+            continue  # skip malformed entry
+    return SystemParameters(False, params)
+
+def _amps(status: str, f: List[str]) -> SamplerParameters:
+    if status == '1':
+        return SamplerParameters(True, False, [])
+    elif status == '2':
+        return SamplerParameters(False, False, [])  # MPS not connected
+    try:
+        it = iter(f)  # (inlet id, active, bypass time) triples
+        inlets = [InletConfig(int(i), on == '1', float(bp)) for i, on, bp in zip(it, it, it)]
+    except ValueError:
+        return SamplerParameters(True, False, [])
+    return SamplerParameters(False, True, inlets)
+
+def _apar(status: str, f: List[str]) -> ParameterValue:
+    error = status != '0'
+    return ParameterValue(error, f[0] if not error and f else "")
+
+class CommandSpec:
+    """
+    One row of the AK command table.
+
+      • args: argument names in wire order; a command without arguments has a
+        constant request, built and ASCII-encoded once (frame / wire).
+      • reply: decoder for (status, fields); None → GenericResponse (ack only).
+      • quoted: the reply carries "double quoted" fields (kept whole by tokenize()).
+    """
+    __slots__ = ("func", "args", "reply", "quoted", "frame", "wire")
+
+    def __init__(self, func: str, args: Tuple[str, ...] = (),
+                 reply: Optional[Callable[[str, List[str]], object]] = None, quoted: bool = False):
+        self.func = func
+        self.args = args
+        self.reply = reply
+        self.quoted = quoted
+        self.frame = None if args else f"{STX} {func} K0 {ETX}"
+        self.wire = self.frame.encode("ascii") if self.frame else None
+
+COMMANDS: Dict[str, CommandSpec] = {spec.func: spec for spec in (
+    CommandSpec("ASTS", reply=_asts),
+    CommandSpec("AERR", reply=_aerr),
+    CommandSpec("ATSK", reply=_atsk),
+    CommandSpec("STAM", ("task_id",)),
+    CommandSpec("STAT", ("task_name",)),
+    CommandSpec("STPM"),
+    CommandSpec("ACON", reply=_acon),
+    CommandSpec("SCOR", ("cas_list",)),
+    CommandSpec("SCON", ("show_time", "show_cas", "show_conc", "show_inlet")),
+    CommandSpec("AMST", reply=_amst),
+    CommandSpec("ANAM", reply=_anam),
+    CommandSpec("AITR", reply=_aitr),
+    CommandSpec("ANET", reply=_anet),
+    CommandSpec("SNET", ("use_dhcp", "ip", "netmask", "gateway")),
+    CommandSpec("ACLK", reply=_aclk),
+    CommandSpec("APAR", ("name",), reply=_apar),
+    CommandSpec("SONL", ("enable",)),
+    CommandSpec("STUN", ("interval",)),
+    CommandSpec("ATSP", ("task_id",), reply=_atsp),
+    CommandSpec("ASYP", reply=_asyp),
+    CommandSpec("AMPS", reply=_amps),
+    CommandSpec("ADEV", reply=_adev, quoted=True),
+    CommandSpec("STST"),
+    CommandSpec("ASTR", reply=_astr),
+    CommandSpec("RDEV"),
+)}
+
+# Constant request frames → their ASCII bytes (what the transports put on the wire)
+FRAME_BYTES: Dict[str, bytes] = {spec.frame: spec.wire for spec in COMMANDS.values() if spec.frame}
+
+def encode_frame(frame: str) -> bytes:
+    """ASCII bytes of a request frame; constant frames come from the table."""
+    return FRAME_BYTES.get(frame) or frame.encode("ascii")
+
 # --- Protocol Class ---
 
 class GaseraProtocol:
-    status_map = {
-        0: "Initializing",
-        1: "Initialization error",
-        2: "Idle",
-        3: "Self-test in progress",
-        4: "Malfunction",
-        5: "Measuring",
-        6: "Calibration",
-        7: "Cancelling",
-        8: "Laser scan",
-    }
-
-    phase_map = {
-        0: "Idle",
-        1: "Gas exchange",
-        2: "Integration",
-        3: "Analysis",
-        4: "Laser tuning"
-    }
+    status_map = STATUS_MAP
+    phase_map = PHASE_MAP
 
     def build_command(self, func: str, data: str = "") -> str:
-        return f"{STX} {func} K0 {(data if data else '')}{ETX}"
+        if data:
+            return f"{STX} {func} K0 {data}{ETX}"
+        spec = COMMANDS.get(func)
+        return spec.frame if spec is not None and spec.frame else f"{STX} {func} K0 {ETX}"
 
     # Human-readable aliases
     def ask_current_status(self) -> str:
@@ -306,197 +551,65 @@ class GaseraProtocol:
         return self.build_command("RDEV")
 
     # Response parsers
+    def decode(self, response: str, func: str):
+        """Parse a framed reply with func's decoder from COMMANDS (GenericResponse for acks)."""
+        spec = COMMANDS.get(func)
+        if spec is None or spec.reply is None:
+            return self.parse_generic(response, func)
+        tokens = tokenize(response, spec.quoted)
+        if spec.quoted and tokens[0] != func:
+            raise ValueError(f"Malformed {func} response")
+        return spec.reply(tokens[1], tokens[2:])
+
     def parse_response(self, response: str) -> Tuple[str, List[str]]:
-        if not response.startswith(STX) or not response.endswith(ETX):
-            raise ValueError("Invalid response framing")
-        body = response[1:-1].strip()
-        parts = body.split()
-        if len(parts) < 2:
-            raise ValueError("Malformed response")
-        return parts[0], parts[1:]
+        tokens = tokenize(response)
+        return tokens[0], tokens[1:]
 
     def parse_asts(self, response: str) -> DeviceStatus:
-        cmd, parts = self.parse_response(response)
-        error = parts[0] != '0'
-        status_code = int(parts[1]) if len(parts) > 1 and parts[0] == '0' else -1
-        return DeviceStatus(error, status_code, self.status_map.get(status_code, "Unknown"))
+        return self.decode(response, "ASTS")
 
     def parse_aerr(self, response: str) -> ErrorList:
-        cmd, parts = self.parse_response(response)
-        error = parts[0] != '0'
-        codes = parts[1:] if not error else []
-        return ErrorList(error, codes)
+        return self.decode(response, "AERR")
 
     def parse_atsk(self, response: str) -> TaskList:
-        cmd, parts = self.parse_response(response)
-        error = parts[0] != '0'
-        tasks = []
-        if not error:
-            i = 1
-            while i < len(parts):
-                task_id = parts[i]
-                i += 1
-                task_name = []
-                while i < len(parts) and not parts[i].isdigit():
-                    task_name.append(parts[i])
-                    i += 1
-                tasks.append((task_id, " ".join(task_name)))
-        return TaskList(error, tasks)
+        return self.decode(response, "ATSK")
 
     def parse_acon(self, response: str) -> ACONResult:
-        cmd, parts = self.parse_response(response)
-        error = parts[0] != '0'
-        records = []
-        if not error:
-            i = 1
-            while i + 2 < len(parts):
-                timestamp = int(parts[i])
-                cas = parts[i + 1]
-                ppm = float(parts[i + 2])
-                records.append(ACONRecord(timestamp, cas, ppm))
-                i += 3
-        return ACONResult(error, records)
+        return self.decode(response, "ACON")
 
     def parse_amst(self, response: str) -> MeasurementStatus:
-        cmd, parts = self.parse_response(response)
-        error = parts[0] != '0'
-        code = int(parts[1]) if len(parts) > 1 and not error else -1
-        return MeasurementStatus(error, code, self.phase_map.get(code, "Unknown"))
+        return self.decode(response, "AMST")
 
     def parse_anam(self, response: str) -> DeviceName:
-        cmd, parts = self.parse_response(response)
-        error = parts[0] != '0'
-        name = " ".join(parts[1:]) if not error else ""
-        return DeviceName(error, name)
-    
-    def parse_adev(self, response: str) -> DeviceInfo:
-        if not response.startswith(STX) or not response.endswith(ETX):
-            raise ValueError("Invalid response framing")
-
-        import shlex
-        body = response[1:-1].strip()
-        tokens = shlex.split(body)  # handles quoted strings properly
-
-        if len(tokens) < 2 or tokens[0] != "ADEV":
-            raise ValueError("Malformed ADEV response")
+        return self.decode(response, "ANAM")
 
-        error = tokens[1] != '0'
-        info_parts = tokens[2:] if not error else []
-
-        info = " | ".join(part if part else "-" for part in info_parts)
-
-        return DeviceInfo(error, info)
+    def parse_adev(self, response: str) -> DeviceInfo:
+        return self.decode(response, "ADEV")
 
     def parse_aitr(self, response: str) -> IterationNumber:
-        cmd, parts = self.parse_response(response)
-        error = parts[0] != '0'
-        iteration = int(parts[1]) if not error and len(parts) > 1 else -1
-        return IterationNumber(error, iteration)
+        return self.decode(response, "AITR")
 
     def parse_anet(self, response: str) -> NetworkSettings:
-        cmd, parts = self.parse_response(response)
-        error = parts[0] != '0'
-        if error or len(parts) < 5:
-            return NetworkSettings(True, False, '', '', '')
-        return NetworkSettings(False, parts[1] == '1', parts[2], parts[3], parts[4])
+        return self.decode(response, "ANET")
 
     def parse_aclk(self, response: str) -> DateTimeResult:
-        cmd, parts = self.parse_response(response)
-        error = parts[0] != '0'
-        dt = parts[1] if not error and len(parts) > 1 else ""
-        return DateTimeResult(error, dt)
+        return self.decode(response, "ACLK")
 
     def parse_astr(self, response: str) -> SelfTestResult:
-        cmd, parts = self.parse_response(response)
-        error = parts[0] != '0'
-        code = int(parts[1]) if len(parts) > 1 and not error else -99
-
-        desc_map = {
-            -2: "Result N/A",
-            -1: "Test in progress",
-             0: "Self-test failed",
-             1: "Self-test passed"
-        }
-
-        description = desc_map.get(code, "Unknown")
-        return SelfTestResult(error, code, description)
+        return self.decode(response, "ASTR")
 
     def parse_atsp(self, response: str) -> TaskParameters:
-        cmd, parts = self.parse_response(response)
-        error = parts[0] != '0'
-
-        if error or len(parts) < 6:
-            return TaskParameters(True, [], 0.0, 0.0, 0.0, 0)
-
-        try:
-            # CAS list is comma-separated in one field
-            cas_list = parts[1].split(',')
-            target_pressure = float(parts[2])
-            flush_bypass = float(parts[3])
-            flush_cell = float(parts[4])
-            flush_cycles = int(parts[5])
-        except (ValueError, IndexError):
-            return TaskParameters(True, [], 0.0, 0.0, 0.0, 0)
-
-        return TaskParameters(False, cas_list, target_pressure, flush_bypass, flush_cell, flush_cycles)
+        return self.decode(response, "ATSP")
 
     def parse_asyp(self, response: str) -> SystemParameters:
-        cmd, parts = self.parse_response(response)
-        error = parts[0] != '0'
-
-        params = []
-
-        if error or len(parts) < 2:
-            return SystemParameters(True, [])
-
-        for part in parts[1:]:
-            tokens = part.split(',')
-            if len(tokens) != 5:
-                continue
-            try:
-                name = tokens[0]
-                value = float(tokens[1])
-                min_val = float(tokens[2])
-                max_val = float(tokens[3])
-                unit = tokens[4]
-                params.append(SystemParameter(name, value, min_val, max_val, unit))
-            except ValueError:
-                continue  # skip malformed entry
-
-        return SystemParameters(False, params)
+        return self.decode(response, "ASYP")
 
     def parse_amps(self, response: str) -> SamplerParameters:
-        cmd, parts = self.parse_response(response)
-
-        if not parts:
-            return SamplerParameters(True, False, [])
-
-        status = parts[0]
-        if status == '1':
-            return SamplerParameters(True, False, [])
-        elif status == '2':
-            return SamplerParameters(False, False, [])  # MPS not connected
-
-        inlets = []
-        try:
-            i = 1
-            while i + 2 < len(parts):
-                inlet_id = int(parts[i])
-                active = parts[i + 1] == '1'
-                bypass_time = float(parts[i + 2])
-                inlets.append(InletConfig(inlet_id, active, bypass_time))
-                i += 3
-        except ValueError:
-            return SamplerParameters(True, False, [])
-
-        return SamplerParameters(False, True, inlets)
+        return self.decode(response, "AMPS")
 
     def parse_apar(self, response: str) -> ParameterValue:
-        cmd, parts = self.parse_response(response)
-        error = parts[0] != '0'
-        value = parts[1] if not error and len(parts) > 1 else ""
-        return ParameterValue(error, value)
+        return self.decode(response, "APAR")
 
     def parse_generic(self, response: str, command: str) -> GenericResponse:
-        cmd, parts = self.parse_response(response)
-        return GenericResponse(error=(parts[0] != '0'), command=command)
+        tokens = tokenize(response)
+        return GenericResponse(error=(tokens[1] != '0'), command=command)
@@ -0,0 +1,94 @@
+# response_cache.py — read-through cache for console commands, TTL = command cooldown
+
+from __future__ import annotations
+
+import threading
+import time
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+class ResponseCache:
+    """
+    Cache of wrapped dispatcher results keyed by (command, args).
+
+    • Fresh hit (age <= ttl): served from memory.
+    • Stale hit (ttl < age <= ttl + stale_window): served immediately and
+      refreshed in the background (stale-while-revalidate).
+    • Expired or missing: fetched synchronously; if the device does not answer,
+      the last known value is served instead, flagged with its age.
+    Any device write clears the whole cache (see invalidate()).
+    """
+
+    def __init__(self, stale_window: float = 30.0):
+        self.stale_window = stale_window
+        self._lock = threading.Lock()
+        self._entries: Dict[Hashable, Tuple[float, dict]] = {}  # key -> (stored_at, wrapped)
+        self._refreshing: set = set()
+        self._generation = 0  # bumped on invalidate; drops refreshes that raced a write
+
+    def get_or_fetch(self, key: Hashable, ttl: float, fetch: Callable[[], Optional[dict]]) -> Optional[dict]:
+        """
+        Return a cached or freshly fetched result. fetch() returns the wrapped
+        result dict, or None when the device gave no usable answer.
+        """
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            generation = self._generation
+
+        if entry:
+            age = now - entry[0]
+            if age <= ttl:
+                return self._flag(entry[1], age, stale=False)
+            if age <= ttl + self.stale_window:
+                self._refresh_async(key, fetch)
+                return self._flag(entry[1], age, stale=True)
+
+        fresh = fetch()
+        if fresh is not None:
+            self._store(key, fresh, generation)
+            return fresh
+
+        if entry:
+            return self._flag(entry[1], now - entry[0], stale=True)
+        return None
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._generation += 1
+
+    def _store(self, key: Hashable, wrapped: dict, generation: int) -> None:
+        with self._lock:
+            if generation == self._generation:
+                self._entries[key] = (time.monotonic(), wrapped)
+
+    def _refresh_async(self, key: Hashable, fetch: Callable[[], Optional[dict]]) -> None:
+        with self._lock:
+            if key in self._refreshing:
+                return
+            self._refreshing.add(key)
+            generation = self._generation
+
+        def run():
+            try:
+                fresh = fetch()
+                if fresh is not None:
+                    self._store(key, fresh, generation)
+            except Exception:
+                pass  # keep serving the stale entry; the next request retries
+            finally:
+                with self._lock:
+                    self._refreshing.discard(key)
+
+        threading.Thread(target=run, daemon=True).start()
+
+    @staticmethod
+    def _flag(wrapped: dict, age: float, stale: bool) -> dict:
+        out: Dict[str, Any] = dict(wrapped)
+        out["cached"] = True
+        out["stale"] = stale
+        out["age"] = round(age, 1)
+        return out
+
+# Shared instance: the dispatcher reads through it, the controller invalidates it on writes
+response_cache = ResponseCache()
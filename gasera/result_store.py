@@ -0,0 +1,104 @@
+# result_store.py — bounded in-memory history of ACON batches for charts and CSV export
+
+from __future__ import annotations
+
+import csv
+import io
+import threading
+from collections import deque
+from datetime import datetime
+from typing import Deque, Dict, Iterable, List, Optional, Tuple
+
+from .acon_batch import ACONBatch, CasTable, cas_table
+from .config import GASERA_RESULT_HISTORY
+
+class ResultStore:
+    """
+    The last `capacity` distinct ACON results per sampler inlet, oldest first.
+
+      • add() splits a reply by inlet (ACONBatch.by_inlet; inlet 0 = no inlet
+        column) and keeps each part only when its timestamp is new for that
+        inlet: the live chart polls ACON far more often than the analyzer
+        finishes a measurement, and every reply repeats each inlet's last result.
+      • Each inlet has its own deque, so a query for some inlets only walks
+        their history, however many inlets the sampler has.
+      • series(since, inlets) → chart columns (one ppm list per (inlet, gas),
+        None where a stream has no value at that moment); to_csv(since, inlets)
+        → one row per measurement moment, one column per stream.
+    Batches are stored as they come (ACONBatch), never as per-gas objects.
+    capacity <= 0 keeps nothing (history and export stay empty).
+    """
+
+    def __init__(self, capacity: int = GASERA_RESULT_HISTORY, table: CasTable = cas_table):
+        self.table = table
+        self.capacity = max(0, capacity)
+        self._lock = threading.Lock()
+        self._by_inlet: Dict[int, Deque[ACONBatch]] = {}
+
+    def add(self, batch: ACONBatch) -> bool:
+        if batch.error or not len(batch) or not self.capacity:
+            return False
+        added = False
+        with self._lock:
+            for inlet, part in batch.by_inlet():
+                history = self._by_inlet.get(inlet)
+                if history is None:
+                    history = self._by_inlet[inlet] = deque(maxlen=self.capacity)
+                elif history and history[-1].timestamp == part.timestamp:
+                    continue
+                history.append(part)
+                added = True
+        return added
+
+    def inlets(self) -> List[int]:
+        with self._lock:
+            return sorted(self._by_inlet)
+
+    def since(self, since: float = 0, inlets: Optional[Iterable[int]] = None) -> List[Tuple[int, ACONBatch]]:
+        """(inlet, batch) stored with a timestamp after `since` (epoch seconds), oldest first."""
+        with self._lock:
+            wanted = self._by_inlet if inlets is None else {i: self._by_inlet[i] for i in inlets if i in self._by_inlet}
+            found = [(inlet, b) for inlet, history in wanted.items() for b in history if b.timestamp > since]
+        if len(wanted) > 1:
+            found.sort(key=lambda e: e[1].timestamp)
+        return found
+
+    def __len__(self) -> int:
+        return sum(map(len, self._by_inlet.values()))
+
+    def _columns(self, entries: List[Tuple[int, ACONBatch]]) -> Tuple[List[int], dict]:
+        # one slot per distinct timestamp: inlets finishing in the same second share it
+        stamps: List[int] = []
+        cols: dict = {}  # (inlet, cas id) → ppm per slot
+        for inlet, batch in entries:
+            ts = batch.timestamp
+            if not stamps or stamps[-1] != ts:
+                stamps.append(ts)
+            i = len(stamps) - 1
+            for cid, ppm in zip(batch.cas_ids, batch.ppm):
+                col = cols.get((inlet, cid))
+                if col is None:
+                    col = cols[(inlet, cid)] = [None] * len(entries)
+                col[i] = ppm
+        n = len(stamps)
+        return stamps, {key: col[:n] for key, col in cols.items()}
+
+    def series(self, since: float = 0, inlets: Optional[Iterable[int]] = None) -> dict:
+        stamps, cols = self._columns(self.since(since, inlets))
+        meta = self.table.inlet_meta
+        return {
+            "timestamps": stamps,
+            "series": [{**meta(inlet, cid), "ppm": col} for (inlet, cid), col in cols.items()],
+        }
+
+    def to_csv(self, since: float = 0, inlets: Optional[Iterable[int]] = None) -> str:
+        stamps, cols = self._columns(self.since(since, inlets))
+        out = io.StringIO()
+        writer = csv.writer(out, lineterminator="\n")
+        writer.writerow(["Time", "Timestamp"] + [self.table.label(cid, inlet) for inlet, cid in cols])
+        for i, ts in enumerate(stamps):
+            writer.writerow([datetime.fromtimestamp(ts).strftime("%Y-%m-%d %H:%M:%S"), ts]
+                            + ["" if col[i] is None else col[i] for col in cols.values()])
+        return out.getvalue()
+
+result_store = ResultStore()
@@ -1,15 +1,52 @@
-from flask import Blueprint, Response, json, request, jsonify
+from flask import Blueprint, Response, g, json, request, jsonify
 from system.preferences import prefs
-from .controller import gasera
-from .dispatcher import dispatcher
-from .measurement import measurement
+from .devices import Device, registry
 from .commands import GASERA_COMMANDS
 from datetime import datetime
-from .config import get_cas_details
-import random, time
+from .config import GASERA_TRACE_DIR, get_cas_details
+from . import deadline
+import os, random, re, time
 
 gasera_bp = Blueprint("gasera", __name__)
 
+# Device-work budget per endpoint (seconds); an X-Request-Deadline header can only shorten it.
+# Matched to how long the browser-side pollers are willing to wait
+ROUTE_DEADLINES = {
+    "gasera.gasera_api_data_live": 3.0,
+    "gasera.gasera_api_dispatch_instruction": 8.0,
+}
+DEFAULT_ROUTE_DEADLINE = 10.0
+
+# Analyzer a request is about: ?device=<id> or this header; neither = the default device
+DEVICE_HEADER = "X-Gasera-Device"
+
+# Trace file names a client may choose (no separators, no leading dot)
+TRACE_NAME = re.compile(r"[A-Za-z0-9_\-][A-Za-z0-9_.\-]{0,63}")
+
+@gasera_bp.before_request
+def _start_request_deadline():
+    # the client's header can only shorten the route's budget, never extend it
+    seconds = ROUTE_DEADLINES.get(request.endpoint, DEFAULT_ROUTE_DEADLINE)
+    header = deadline.parse_header(request.headers.get(deadline.DEADLINE_HEADER))
+    if header is not None:
+        seconds = min(seconds, header)
+    deadline.set_deadline(time.monotonic() + seconds)
+
+@gasera_bp.before_request
+def _select_device():
+    device_id = request.args.get("device") or request.headers.get(DEVICE_HEADER)
+    try:
+        g.device = registry.get(device_id)
+    except KeyError:
+        return jsonify({"error": f"Unknown device '{device_id}'", "devices": registry.ids()}), 404
+
+def _device() -> Device:
+    return g.device
+
+@gasera_bp.teardown_request
+def _clear_request_deadline(exc):
+    deadline.set_deadline(None)  # Waitress reuses threads
+
 @gasera_bp.route("/command_map.js")
 def serve_command_map():
     filtered = {
@@ -22,7 +59,7 @@ def serve_command_map():
 @gasera_bp.route("/api/measurement/start", methods=["POST"])
 def gasera_api_start_measurement():
     try:
-        msg = measurement.trigger()
+        msg = _device().measurement.trigger()
         return jsonify({"message": msg}), 200
     except Exception as e:
         return jsonify({"message": f"Trigger error: {e}"}), 500
@@ -30,18 +67,69 @@ def gasera_api_start_measurement():
 @gasera_bp.route("/api/measurement/abort", methods=["POST"])
 def gasera_api_abort_measurement():
     try:
-        msg = measurement.set_abort()
+        msg = _device().measurement.set_abort()
         return jsonify({"message": msg}), 200
     except Exception as e:
         return jsonify({"message": f"[ERROR] Abort failed: {e}"}), 500
 
 @gasera_bp.route("/api/measurement/state")
 def gasera_api_measurement_state():
-    return jsonify(measurement.get_status())
+    return jsonify(_device().measurement.get_status())
 
 @gasera_bp.route("/api/connection_status")
 def gasera_api_connection_status():
-    return jsonify({"online": gasera.check_device_connection()})
+    return jsonify(_device().gasera.connection_status())
+
+@gasera_bp.route("/api/devices")
+def gasera_api_devices():
+    return jsonify(registry.snapshot())
+
+@gasera_bp.route("/api/scheduler/stats")
+def gasera_api_scheduler_stats():
+    return jsonify(_device().scheduler.stats())
+
+@gasera_bp.route("/api/proxy/stats")
+def gasera_api_proxy_stats():
+    from .ak_proxy import ak_proxy
+    return jsonify(ak_proxy.stats() if ak_proxy else {"listening": None, "clients": 0})
+
+@gasera_bp.route("/api/discovery")
+def gasera_api_discovery():
+    from .discovery import discovery
+    if request.args.get("refresh"):
+        discovery.discover(force=True)
+    return jsonify(discovery.snapshot())
+
+@gasera_bp.route("/api/device/metadata")
+def gasera_api_device_metadata():
+    # cached ADEV/ANAM/ATSK/ATSP/ASYP replies and the task table built from them
+    return jsonify(_device().gasera.metadata.snapshot())
+
+@gasera_bp.route("/api/link/rtt")
+def gasera_api_link_rtt():
+    return jsonify(_device().gasera.transport.rtt_stats())
+
+@gasera_bp.route("/api/trace/start", methods=["POST"])
+def gasera_api_trace_start():
+    # recordings only ever go to GASERA_TRACE_DIR; a client may pick a plain file name, no path
+    data = request.get_json(silent=True) or {}
+    name = data.get("name") or f"gasera_trace_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+    if not isinstance(name, str) or not TRACE_NAME.fullmatch(name):
+        return jsonify({"error": "name must be a plain file name: up to 64 letters, digits, '_', '-' or '.'"}), 400
+    if not name.endswith(".trace"):
+        name += ".trace"
+    path = os.path.join(GASERA_TRACE_DIR, name)
+    try:
+        os.makedirs(GASERA_TRACE_DIR, exist_ok=True)
+        _device().gasera.transport.start_trace(path)
+        return jsonify({"ok": True, "path": path})
+    except Exception as e:
+        return jsonify({"error": str(e)}), 400
+
+@gasera_bp.route("/api/trace/stop", methods=["POST"])
+def gasera_api_trace_stop():
+    path = _device().gasera.transport.stop_trace()
+    return jsonify({"ok": path is not None, "path": path})
 
 @gasera_bp.route("/api/data/dummy")
 def gasera_api_data_dummy():
@@ -85,7 +173,7 @@ def gasera_api_data_dummy():
 
 @gasera_bp.route("/api/data/live")
 def gasera_api_data_live():
-    result = gasera.acon_proxy()
+    result = _device().gasera.acon_proxy()
 
     # Success path: dict, no error, has components
     if isinstance(result, dict) and not result.get("error") and result.get("components"):
@@ -105,6 +193,56 @@ def gasera_api_data_live():
 
     return jsonify({"message": msg}), 200
 
+def _float_arg(name: str, default=None):
+    try:
+        return float(request.args[name])
+    except (KeyError, ValueError):
+        return default
+
+def _since_arg() -> float:
+    return _float_arg("since", 0.0)
+
+def _inlets_arg():
+    # ?inlet=1,3 → [1, 3]; absent or unreadable = every inlet (0 = results without an inlet column)
+    try:
+        return [int(i) for i in request.args["inlet"].split(",") if i] or None
+    except (KeyError, ValueError):
+        return None
+
+@gasera_bp.route("/api/data/history")
+def gasera_api_data_history():
+    # ACON results seen by /api/data/live, one column per (inlet, gas) (?since=<epoch seconds>&inlet=1,2)
+    return jsonify(_device().results.series(_since_arg(), _inlets_arg()))
+
+@gasera_bp.route("/api/data/export.csv")
+def gasera_api_data_export():
+    stamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    return Response("\uFEFF" + _device().results.to_csv(_since_arg(), _inlets_arg()), mimetype="text/csv",
+                    headers={"Content-Disposition": f"attachment; filename=gasera_data_{stamp}.csv"})
+
+@gasera_bp.route("/api/telemetry")
+def gasera_api_telemetry():
+    # APAR readings, ?names=CELLTEMP,CELLPRESSURE&since=<epoch seconds>&points=<max per series>
+    telemetry = _device().telemetry
+    if telemetry is None:
+        return jsonify({"params": {}})
+    names = [n for n in request.args.get("names", "").split(",") if n]
+    try:
+        points = max(1, min(2000, int(request.args.get("points", 300))))
+    except ValueError:
+        points = 300
+    return jsonify(telemetry.series(names or None, _since_arg(), points))
+
+@gasera_bp.route("/api/journal")
+def gasera_api_journal():
+    # status/phase/error/link transitions, ?from=<epoch s>&to=<epoch s>&kind=status,error
+    watcher = _device().watcher
+    if watcher is None:
+        return jsonify({"entries": [], "current": None})
+    kinds = {k for k in request.args.get("kind", "").split(",") if k}
+    entries = watcher.journal.between(_float_arg("from", 0.0), _float_arg("to"), kinds or None)
+    return jsonify({"entries": entries, "current": watcher.snapshot()})
+
 @gasera_bp.route("/api/settings/read", methods=["GET"])
 def gasera_api_read_settings():
     return jsonify(prefs.as_dict())
@@ -125,7 +263,7 @@ def gasera_api_dispatch_instruction():
         data = request.get_json(force=True)
         cmd = data.get("cmd")
         args = data.get("args", [])
-        result = dispatcher.handle(cmd, args)
+        result = _device().dispatcher.handle(cmd, args)
         return jsonify(result)
     except Exception as e:
         return jsonify({"error": str(e)}), 400
@@ -134,5 +272,5 @@ def gasera_api_dispatch_instruction():
 @gasera_bp.route("/api/test/serial")
 def gasera_api_test_serial():
     test_line = "get_status"
-    result = dispatcher.handle(test_line.strip().split()[0])
+    result = _device().dispatcher.handle(test_line.strip().split()[0])
     return result.get("string", str(result))
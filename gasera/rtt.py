@@ -0,0 +1,87 @@
+# rtt.py — per-function smoothed RTT and retransmission-style timeouts (RFC 6298 flavour)
+
+from __future__ import annotations
+
+import threading
+from typing import Dict
+
+ALPHA = 1 / 8   # SRTT gain
+BETA = 1 / 4    # RTTVAR gain
+K = 4           # variance multiplier
+GRANULARITY = 0.01  # seconds; floor for the variance term
+
+class _Estimator:
+    __slots__ = ("srtt", "rttvar", "rto", "samples", "backoffs")
+
+    def __init__(self, initial: float):
+        self.srtt = None
+        self.rttvar = None
+        self.rto = initial
+        self.samples = 0
+        self.backoffs = 0
+
+class RttTracker:
+    """
+    Smoothed round-trip time and variance per key (AK function code), giving an
+    adaptive timeout:  RTO = SRTT + max(G, K·RTTVAR), clamped to [min_rto, max_rto].
+
+      • Unknown keys start at `initial` (the old fixed budget) until sampled.
+      • sample(key, rtt) after every successful exchange.
+      • backoff(key) after a timeout doubles that key's RTO (up to max_rto),
+        so a retry or the next call waits longer; the next sample resets it.
+    """
+
+    def __init__(self, initial: float, min_rto: float, max_rto: float):
+        self.initial = initial
+        self.min_rto = min_rto
+        self.max_rto = max_rto
+        self._lock = threading.Lock()
+        self._est: Dict[str, _Estimator] = {}
+
+    def _get(self, key: str) -> _Estimator:
+        est = self._est.get(key)
+        if est is None:
+            est = self._est[key] = _Estimator(self.initial)
+        return est
+
+    def _clamp(self, value: float) -> float:
+        return min(self.max_rto, max(self.min_rto, value))
+
+    def timeout(self, key: str) -> float:
+        est = self._est.get(key)
+        return est.rto if est else self.initial
+
+    def srtt(self, key: str):
+        est = self._est.get(key)
+        return est.srtt if est else None
+
+    def sample(self, key: str, rtt: float) -> None:
+        with self._lock:
+            est = self._get(key)
+            if est.srtt is None:
+                est.srtt = rtt
+                est.rttvar = rtt / 2
+            else:
+                est.rttvar = (1 - BETA) * est.rttvar + BETA * abs(est.srtt - rtt)
+                est.srtt = (1 - ALPHA) * est.srtt + ALPHA * rtt
+            est.rto = self._clamp(est.srtt + max(GRANULARITY, K * est.rttvar))
+            est.samples += 1
+
+    def backoff(self, key: str) -> None:
+        with self._lock:
+            est = self._get(key)
+            est.rto = self._clamp(est.rto * 2)
+            est.backoffs += 1
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                key: {
+                    "srtt_ms": round(1000.0 * est.srtt, 1) if est.srtt is not None else None,
+                    "rttvar_ms": round(1000.0 * est.rttvar, 1) if est.rttvar is not None else None,
+                    "rto_ms": round(1000.0 * est.rto, 1),
+                    "samples": est.samples,
+                    "backoffs": est.backoffs,
+                }
+                for key, est in sorted(self._est.items())
+            }
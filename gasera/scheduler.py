@@ -0,0 +1,260 @@
+# scheduler.py — priority-lane command scheduler in front of the Gasera transport
+
+from __future__ import annotations
+
+import heapq
+import itertools
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, List, Optional, Sequence, Union
+
+import system.log_utils as log
+from .circuit_breaker import CircuitBreaker
+from .metrics import SCHED_WAIT
+from . import deadline as _deadline
+from .deadline import DeadlineExceeded
+from .liveness import breaker as default_breaker
+from .tcp_client import GaseraTCPClient, tcp_client
+
+class Lane:
+    CONTROL = 0      # STAM/STAT/STPM/RDEV: always first, no depth/age limits
+    MEASUREMENT = 1  # measurement state machine
+    UI = 2           # browser polling and console clicks
+
+    NAMES = {CONTROL: "control", MEASUREMENT: "measurement", UI: "ui"}
+
+# Function codes that always ride the control lane, whoever sends them
+CONTROL_COMMANDS = {"STAM", "STAT", "STPM", "RDEV"}
+
+class SchedulerRejected(Exception):
+    """Raised when a command is refused at admission or shed before reaching the device."""
+
+class _Job:
+    __slots__ = ("command", "lane", "enqueued", "done", "response", "shed", "deadline", "abandoned")
+
+    def __init__(self, command: Union[str, Sequence[str]], lane: int, deadline: Optional[float] = None):
+        self.command = command  # one framed command, or a list of them for a batch
+        self.lane = lane
+        self.enqueued = time.monotonic()
+        self.done = threading.Event()
+        self.response = None  # Optional[str], or List[Optional[str]] for a batch
+        self.shed: Optional[str] = None  # reason, when dropped before reaching the device
+        self.deadline = deadline  # monotonic; the job (or the rest of a batch) is dropped after it
+        self.abandoned = False  # the submitter stopped waiting (its deadline passed)
+
+    @property
+    def batch(self) -> bool:
+        return not isinstance(self.command, str)
+
+class _LaneStats:
+    __slots__ = ("depth", "submitted", "executed", "rejected", "shed", "wait_total", "wait_max")
+
+    def __init__(self):
+        self.depth = 0
+        self.submitted = 0
+        self.executed = 0
+        self.rejected = 0
+        self.shed = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+
+    def as_dict(self) -> dict:
+        return {
+            "depth": self.depth,
+            "submitted": self.submitted,
+            "executed": self.executed,
+            "rejected": self.rejected,
+            "shed": self.shed,
+            "wait_avg_ms": round(1000.0 * self.wait_total / self.executed, 1) if self.executed else 0.0,
+            "wait_max_ms": round(1000.0 * self.wait_max, 1),
+        }
+
+class DeviceScheduler:
+    """
+    Single worker that owns the device link and runs commands by lane priority.
+
+    • submit() blocks the caller until its command has been executed (or refused).
+    • Lower lane number wins; FIFO within a lane.
+    • Admission control: a lane with max_depth rejects new work when full; a lane
+      with max_age sheds queued work that waited too long before it hits the wire.
+    • The caller's lane comes from the lane() context (per thread), default UI;
+      CONTROL_COMMANDS are promoted to the control lane regardless.
+    • With a CircuitBreaker, commands are refused up front while it is open,
+      and every exchange outcome is reported to it. The control lane is never
+      refused: a stop or abort always gets its attempt on the wire.
+    • submit_batch() runs an ordered list of commands as one job, so nothing else
+      is interleaved and the transport can reuse one connection for all of them.
+    • Deadlines (explicit, or the submitting thread's request deadline) bound the
+      queue wait and are handed to the transport; expired work is dropped, counted
+      in gasera_deadline_expired_total and not reported to the breaker.
+    """
+
+    def __init__(self, transport: GaseraTCPClient,
+                 max_depth: Optional[Dict[int, int]] = None,
+                 max_age: Optional[Dict[int, float]] = None,
+                 breaker: Optional[CircuitBreaker] = None):
+        self.transport = transport
+        self.breaker = breaker
+        self.max_depth = max_depth if max_depth is not None else {Lane.MEASUREMENT: 8, Lane.UI: 8}
+        self.max_age = max_age if max_age is not None else {Lane.UI: 6.0}
+        self.fast_failed = 0
+        self._heap = []
+        self._busy = False  # a job is on the wire
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+        self._stats = {lane: _LaneStats() for lane in Lane.NAMES}
+        self._local = threading.local()
+        self._thread = None
+
+    # ---- Lane context --------------------------------------------------------
+
+    @contextmanager
+    def lane(self, lane: int):
+        """Run the enclosed device calls of this thread on the given lane."""
+        prev = getattr(self._local, "lane", Lane.UI)
+        self._local.lane = lane
+        try:
+            yield
+        finally:
+            self._local.lane = prev
+
+    def resolve_lane(self, command: str) -> int:
+        if command[2:6] in CONTROL_COMMANDS:
+            return Lane.CONTROL
+        return getattr(self._local, "lane", Lane.UI)
+
+    # ---- Submission ----------------------------------------------------------
+
+    def submit(self, command: str, lane: Optional[int] = None,
+               deadline: Optional[float] = None) -> Optional[str]:
+        """Queue a framed command and wait for its response (None on device failure)."""
+        lane = self.resolve_lane(command) if lane is None else lane
+        return self._enqueue(_Job(command, lane, deadline if deadline is not None else _deadline.current()))
+
+    def submit_batch(self, commands: Sequence[str], lane: Optional[int] = None,
+                     deadline: Optional[float] = None) -> List[Optional[str]]:
+        """
+        Queue an ordered list of framed commands as one job and wait for it.
+        The batch rides the most urgent lane of its commands. Returns one response
+        (or None) per command that was started before deadline (time.monotonic()).
+        """
+        if lane is None:
+            lane = min((self.resolve_lane(c) for c in commands), default=Lane.UI)
+        return self._enqueue(_Job(list(commands), lane, deadline if deadline is not None else _deadline.current()))
+
+    def _enqueue(self, job: _Job):
+        lane = job.lane
+        if _deadline.expired("submit", job.deadline):
+            raise SchedulerRejected("deadline passed before queueing")
+        if self.breaker and lane != Lane.CONTROL and not self.breaker.allow():
+            self.fast_failed += 1
+            raise SchedulerRejected("device offline (circuit open)")
+        stats = self._stats[lane]
+        with self._cond:
+            limit = self.max_depth.get(lane)
+            if limit is not None and stats.depth >= limit:
+                stats.rejected += 1
+                raise SchedulerRejected(f"{Lane.NAMES[lane]} lane full ({stats.depth} queued)")
+            heapq.heappush(self._heap, (lane, next(self._seq), job))
+            stats.depth += 1
+            stats.submitted += 1
+            self._cond.notify()
+
+        timeout = None if job.deadline is None else max(0.0, job.deadline - time.monotonic())
+        if not job.done.wait(timeout):
+            job.abandoned = True  # dropped by the worker if it has not started yet
+            _deadline.EXPIRED.inc("wait")
+            raise SchedulerRejected(f"{Lane.NAMES[lane]} command: deadline passed while waiting")
+        if job.shed:
+            raise SchedulerRejected(f"{Lane.NAMES[lane]} command shed: {job.shed}")
+        return job.response
+
+    # ---- Worker --------------------------------------------------------------
+
+    def start(self):
+        if self._thread and self._thread.is_alive():
+            return  # already running
+        self._thread = threading.Thread(target=self._loop, daemon=True, name="gasera-scheduler")
+        self._thread.start()
+
+    def _loop(self):
+        while True:
+            with self._cond:
+                while not self._heap:
+                    self._cond.wait()
+                lane, _, job = heapq.heappop(self._heap)
+                stats = self._stats[lane]
+                stats.depth -= 1
+                self._busy = True
+
+            waited = time.monotonic() - job.enqueued
+            limit = self.max_age.get(lane)
+            if limit is not None and waited > limit:
+                job.shed = f"waited {waited:.1f}s"
+            elif job.abandoned:
+                job.shed = "caller gave up"
+            elif _deadline.expired("queue", job.deadline):
+                job.shed = "deadline passed in queue"
+            elif self.breaker and lane != Lane.CONTROL and not self.breaker.allow():
+                job.shed = "device offline (circuit open)"
+            if job.shed:
+                stats.shed += 1
+                self._busy = False
+                job.done.set()
+                continue
+
+            stats.executed += 1
+            stats.wait_total += waited
+            stats.wait_max = max(stats.wait_max, waited)
+            SCHED_WAIT.observe(waited, Lane.NAMES[lane])
+            ok = False
+            try:
+                if job.batch:
+                    job.response = self._run_batch(job)
+                    ok = any(r is not None for r in job.response)
+                elif job.deadline is not None:
+                    job.response = self.transport.send_command(job.command, job.deadline)
+                    ok = job.response is not None
+                else:
+                    job.response = self.transport.send_command(job.command)
+                    ok = job.response is not None
+            except DeadlineExceeded:
+                job.shed = "deadline passed on the wire"
+                ok = None  # says nothing about the link
+            except Exception as e:
+                log.error(f"Scheduler: transport error: {e}")
+                job.response = [] if job.batch else None
+            finally:
+                if self.breaker and ok is not None:
+                    if ok:
+                        self.breaker.record_success()
+                    else:
+                        self.breaker.record_failure()
+                self._busy = False
+                job.done.set()
+
+    def _run_batch(self, job: _Job) -> List[Optional[str]]:
+        send_batch = getattr(self.transport, "send_batch", None)
+        if send_batch:
+            return send_batch(job.command, job.deadline)
+        out = []  # transports without sessions (e.g. replay): one exchange per command
+        for command in job.command:
+            if _deadline.expired("transport", job.deadline):
+                break
+            out.append(self.transport.send_command(command))
+        return out
+
+    def idle(self) -> bool:
+        """Nothing queued and nothing on the wire."""
+        with self._cond:
+            return not self._heap and not self._busy
+
+    def stats(self) -> dict:
+        with self._cond:
+            out = {Lane.NAMES[lane]: s.as_dict() for lane, s in self._stats.items()}
+        out["fast_failed"] = self.fast_failed
+        return out
+
+# started by controller.py together with the link monitor
+scheduler = DeviceScheduler(tcp_client, breaker=default_breaker)
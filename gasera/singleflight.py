@@ -0,0 +1,63 @@
+# singleflight.py — coalesce identical concurrent device queries
+
+from __future__ import annotations
+
+from threading import Event, Lock
+from typing import Any, Callable, Dict, Optional
+
+class _Call:
+    __slots__ = ("done", "result", "exc", "waiters")
+
+    def __init__(self):
+        self.done = Event()
+        self.result: Any = None
+        self.exc: Optional[BaseException] = None
+        self.waiters = 0
+
+class SingleFlight:
+    """
+    Run at most one call per key at a time.
+
+    The first caller for a key (the leader) executes fn(); callers that arrive
+    while it is in flight block and receive the leader's result (or exception).
+    Nothing is cached: once the leader finishes, the next call goes to the wire again.
+    """
+
+    def __init__(self):
+        self._lock = Lock()
+        self._calls: Dict[str, _Call] = {}
+        self.executed = 0   # wire exchanges actually performed
+        self.coalesced = 0  # callers answered by someone else's exchange
+
+    def do(self, key: str, fn: Callable[[], Any]) -> Any:
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None:
+                call.waiters += 1
+                self.coalesced += 1
+                leader = False
+            else:
+                call = _Call()
+                self._calls[key] = call
+                self.executed += 1
+                leader = True
+
+        if not leader:
+            call.done.wait()
+            if call.exc is not None:
+                raise call.exc
+            return call.result
+
+        try:
+            call.result = fn()
+        except BaseException as e:
+            call.exc = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.result
+
+    def stats(self) -> dict:
+        return {"executed": self.executed, "coalesced": self.coalesced}
@@ -6,7 +6,14 @@ import socket
 import time
 import random
 from threading import RLock
-from typing import Optional, Callable
+from typing import Callable, List, Optional, Sequence
+
+from .framing import FrameDecoder
+from .protocol import encode_frame
+from .rtt import RttTracker
+from .deadline import DeadlineExceeded, expired
+from . import metrics as m
+from .trace import TraceRecorder
 
 # -----------------------------------------------------------------------------
 # Simple levelled logger
@@ -20,6 +27,10 @@ def _log(level: str, msg: str, *, verbose: bool = False) -> None:
         return
     print(f"[{level}] {msg}")
 
+def _debug_on(verbose: bool) -> bool:
+    """Guard for DEBUG lines whose message is expensive to build (hex dumps)."""
+    return verbose or ENABLE_VERBOSE_PRINTS
+
 def _hexsample(b: bytes, limit: int = 64) -> str:
     if not b:
         return "<empty>"
@@ -33,6 +44,34 @@ def _hexsample(b: bytes, limit: int = 64) -> str:
 STX = 0x02
 ETX = 0x03
 
+# TCP keepalive for persistent sessions: first probe after 10 s idle, then every 3 s, 3 misses → dead
+KEEPALIVE_IDLE_S = 10
+KEEPALIVE_INTERVAL_S = 3
+KEEPALIVE_COUNT = 3
+
+# Adaptive timeout clamps (see RttTracker): floors keep a busy device from being
+# declared dead on a single slow answer, ceilings bound detection of a dead link
+MIN_IO_RTO_S = 0.5
+MIN_CONNECT_RTO_S = 0.25
+DRAIN_WINDOW_S = (0.005, 0.05)  # pre-send drain window, scaled from the connect RTT
+
+def _enable_keepalive(sock: socket.socket) -> None:
+    """Turn on SO_KEEPALIVE and tighten the timers where the platform allows it."""
+    try:
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+    except OSError:
+        return
+    for opt, val in (
+        ("TCP_KEEPIDLE", KEEPALIVE_IDLE_S),
+        ("TCP_KEEPINTVL", KEEPALIVE_INTERVAL_S),
+        ("TCP_KEEPCNT", KEEPALIVE_COUNT),
+    ):
+        if hasattr(socket, opt):
+            try:
+                sock.setsockopt(socket.IPPROTO_TCP, getattr(socket, opt), val)
+            except OSError:
+                pass
+
 # -----------------------------------------------------------------------------
 # Client
 # -----------------------------------------------------------------------------
@@ -43,10 +82,23 @@ class GaseraTCPClient:
 
     Design:
       • One-shot send_command(): connect → drain → send → read → disconnect.
-      • Strict STX..ETX reader with overall deadline (handles junk-before-STX and chunking).
+      • Opt-in persistent session (persistent=True): keep one socket open, guard it
+        with TCP keepalive plus a cheap idle probe, reconnect transparently on failure.
+      • send_batch(): several commands back to back over one connection, bounded by
+        a single deadline.
+      • Adaptive timeouts (adaptive=True): smoothed RTT/variance per AK function code
+        sets each read deadline, the connect RTT sets the connect timeout and the
+        drain window; connect_timeout/io_timeout remain the initial values and ceilings.
+      • An optional per-call deadline caps jitter, connect, reads and the retry; running
+        out of time raises DeadlineExceeded instead of reporting a dead link.
+      • Strict STX..ETX reader with overall deadline (handles junk-before-STX and chunking),
+        built on an incremental FrameDecoder with a reusable receive buffer.
       • Optional verbose logging controlled by ENABLE_VERBOSE_PRINTS or per-instance flag.
-      • Emits connection-state changes via on_connection_change (debounced).
+      • Link state follows the outcome of real exchanges (and LinkMonitor probes when idle);
+        transitions are emitted via on_connection_change (debounced).
       • Exposes on_status_change attribute for ASTS callback compatibility (not used internally).
+      • Wire metrics (connect, first byte, frame, retries, timeouts, bytes) per AK function
+        code are recorded into gasera.metrics.
     """
 
     def __init__(
@@ -58,12 +110,21 @@ class GaseraTCPClient:
         *,
         on_connection_change: Optional[Callable[[bool], None]] = None,
         verbose: bool = False,
+        persistent: bool = False,
+        idle_probe_after: float = 5.0,
+        adaptive: bool = True,
     ):
         self.host = host
         self.port = port
         self.connect_timeout = connect_timeout
         self.io_timeout = io_timeout
         self.verbose = verbose
+        self.persistent = persistent
+        self.idle_probe_after = idle_probe_after  # seconds idle before probing a kept socket
+        self.adaptive = adaptive
+        # per-function read budget, initially the old fixed io_timeout + 0.5 s headroom
+        self.rtt = RttTracker(io_timeout + 0.5, MIN_IO_RTO_S, 2 * io_timeout + 0.5)
+        self.connect_rtt = RttTracker(connect_timeout, MIN_CONNECT_RTO_S, connect_timeout)
 
         # Callbacks
         self.on_connection_change = on_connection_change  # bool -> None
@@ -72,12 +133,49 @@ class GaseraTCPClient:
         # Internals
         self._sock: Optional[socket.socket] = None
         self._lock = RLock()
-        self._connected = False
+        self._decoder = FrameDecoder()  # reused across exchanges (guarded by _lock)
+        self._connected = False  # link state: did the last exchange/probe succeed?
+        self._last_io = 0.0  # monotonic time of the last successful exchange
+        self.last_activity = 0.0  # monotonic time of the last exchange attempt (success or not)
+        self.recorder: Optional[TraceRecorder] = None  # wire trace, see start_trace()
+        self._func = "?"  # AK function code of the exchange in progress (metrics label)
+        self._t_sent = 0.0  # monotonic time the current request was written
+        self._deadline: Optional[float] = None  # caller's deadline for the exchange in progress
+
+    # ---- Timeout budgets ------------------------------------------------------
+
+    def _io_budget(self, func: str) -> float:
+        return self.rtt.timeout(func) if self.adaptive else self.io_timeout + 0.5
+
+    def _connect_budget(self) -> float:
+        return self.connect_rtt.timeout("connect") if self.adaptive else self.connect_timeout
+
+    def _cap(self, budget: float) -> float:
+        """Shrink a timeout to what is left before the current call's deadline."""
+        dl = self._deadline
+        return budget if dl is None else max(0.001, min(budget, dl - time.monotonic()))
+
+    def _check_deadline(self) -> None:
+        if expired("transport", self._deadline):
+            raise DeadlineExceeded(f"{self._func}: deadline passed")
+
+    def _out_of_time(self) -> bool:
+        dl = self._deadline
+        return dl is not None and time.monotonic() >= dl
+
+    def _drain_window(self) -> float:
+        srtt = self.connect_rtt.srtt("connect") if self.adaptive else None
+        lo, hi = DRAIN_WINDOW_S
+        return hi if srtt is None else min(hi, max(lo, 2 * srtt))
+
+    def rtt_stats(self) -> dict:
+        return {"adaptive": self.adaptive, "connect": self.connect_rtt.snapshot().get("connect"),
+                "functions": self.rtt.snapshot()}
 
     # ---- Connection management ------------------------------------------------
 
     def _flip_connected(self, new_state: bool) -> None:
-        """Set connection state and notify only when it actually changes."""
+        """Set link state and notify only when it actually changes."""
         if self._connected == new_state:
             return
         self._connected = new_state
@@ -93,24 +191,29 @@ class GaseraTCPClient:
         with self._lock:
             self.disconnect()  # ensure clean start
             try:
-                _log("DEBUG", f"Connecting to {self.host}:{self.port} ct={self.connect_timeout}s io={self.io_timeout}s")
+                ct = self._connect_budget()
+                _log("DEBUG", f"Connecting to {self.host}:{self.port} ct={ct:.2f}s io={self.io_timeout}s")
                 sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-                # Optional keepalive (ignore if unsupported)
+                _enable_keepalive(sock)
+                sock.settimeout(self._cap(ct))
+                t0 = time.monotonic()
                 try:
-                    sock.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
-                except OSError:
-                    pass
-                sock.settimeout(self.connect_timeout)
-                sock.connect((self.host, self.port))
+                    sock.connect((self.host, self.port))
+                except socket.timeout:
+                    self.connect_rtt.backoff("connect")
+                    sock.close()
+                    raise
+                elapsed = time.monotonic() - t0
+                self.connect_rtt.sample("connect", elapsed)
+                m.LINK_CONNECT.observe(elapsed, self._func)
                 sock.settimeout(self.io_timeout)  # slice timeout for I/O
                 self._sock = sock
-                self._flip_connected(True)
                 _log("DEBUG", "Connection successful.")
                 return True
             except (socket.timeout, OSError) as e:
                 _log("WARN", f"Connection failed: {e}")
+                m.LINK_CONNECT_FAILURES.inc(self._func)
                 self._sock = None
-                self._flip_connected(False)
                 return False
 
     def disconnect(self) -> None:
@@ -123,11 +226,49 @@ class GaseraTCPClient:
                     pass
                 finally:
                     self._sock = None
-            self._flip_connected(False)
+
+    def retarget(self, host: str, port: int) -> None:
+        """Point the client at another endpoint: waits for the exchange in progress, then drops the session."""
+        with self._lock:
+            self.disconnect()
+            self.host = host
+            self.port = port
 
     def is_connected(self) -> bool:
+        """Last known link state, from memory (no I/O)."""
         return self._connected
 
+    def report_link(self, ok: bool) -> None:
+        """Feed an out-of-band liveness result (e.g. an idle probe) into the link state."""
+        self._flip_connected(ok)
+
+    def _session_alive(self) -> bool:
+        """
+        Cheap health check for a kept-open socket (persistent mode).
+        Fresh sockets are trusted; after idle_probe_after seconds of silence a
+        non-blocking MSG_PEEK tells us whether the peer has closed (b"") or the
+        socket errored, without putting anything on the wire.
+        """
+        if not self._sock:
+            return False
+        if time.monotonic() - self._last_io < self.idle_probe_after:
+            return True
+        try:
+            self._sock.setblocking(False)
+            try:
+                data = self._sock.recv(1, socket.MSG_PEEK)
+            finally:
+                self._sock.setblocking(True)
+        except (BlockingIOError, InterruptedError):
+            return True  # nothing pending, peer still there
+        except OSError as e:
+            _log("DEBUG", f"Idle probe failed: {e}", verbose=self.verbose)
+            return False
+        if not data:
+            _log("DEBUG", "Idle probe: peer closed the session", verbose=self.verbose)
+            return False
+        return True  # stale bytes pending; _drain_stale_input() clears them
+
     def is_online(self, timeout: float = 1.0) -> bool:
         """Lightweight reachability test (does not change this client's socket)."""
         try:
@@ -138,141 +279,316 @@ class GaseraTCPClient:
 
     # ---- I/O helpers ----------------------------------------------------------
 
-    def _drain_stale_input(self, max_ms: int = 50) -> None:
+    def _drain_stale_input(self, max_ms: Optional[int] = None) -> None:
         """
         Best-effort: clear straggler bytes so each command starts clean.
-        Useful if a previous response's tail arrives late.
+        Useful if a previous response's tail arrives late. The window defaults to
+        twice the smoothed connect RTT (5..50 ms).
         """
         if not self._sock:
             return
-        end = time.monotonic() + (max_ms / 1000.0)
+        window = self._drain_window() if max_ms is None else max_ms / 1000.0
+        end = time.monotonic() + window
+        dec = self._decoder
+        dec.reset()
+        drained = 0
+        sample = b""
+        debug = _debug_on(self.verbose)
         self._sock.setblocking(False)
-        drained = bytearray()
         try:
             while time.monotonic() < end:
                 try:
-                    data = self._sock.recv(4096)
-                    if not data:
+                    n = dec.recv_into(self._sock)
+                    if not n:
                         break
-                    drained += data
+                    drained += n
+                    if debug and not sample:
+                        sample = dec.tail()
+                    dec.reset()
                 except (BlockingIOError, InterruptedError):
                     break
                 except OSError:
                     break
         finally:
             self._sock.setblocking(True)
+            dec.reset()
         if drained:
-            _log("DEBUG", f"Drained {len(drained)}B stale: {_hexsample(bytes(drained))}", verbose=self.verbose)
+            m.LINK_DRAINED.inc(self._func, amount=drained)
+            if debug:
+                _log("DEBUG", f"Drained {drained}B stale: {_hexsample(sample)}", verbose=self.verbose)
 
     def _recv_until_stx_etx(self, overall_timeout: Optional[float] = None) -> Optional[str]:
         """
         Read until a full STX..ETX frame is present.
         Returns a *string containing the full frame including STX/ETX*,
         decoded with ASCII (errors='ignore'). Returns None on timeout/error.
+        The newest frame wins: earlier complete frames are late tails of previous
+        exchanges, and a frame that has started but not ended is waited for.
         """
         assert self._sock
-        deadline = time.monotonic() + (overall_timeout or self.io_timeout)
-        buf = bytearray()
+        budget = overall_timeout or self.io_timeout
+        deadline = time.monotonic() + budget
+        dec = self._decoder
+        dec.reset()
+        debug = _debug_on(self.verbose)
+        latest: Optional[str] = None
+        dropped = 0
+        dropped_bytes = 0
+        received = 0
+        func = self._func
 
         # small per-iteration timeout to honor overall deadline
-        self._sock.settimeout(0.25)
+        self._sock.settimeout(min(0.25, max(0.05, budget / 4)))
 
         while time.monotonic() < deadline:
             try:
-                chunk = self._sock.recv(4096)
+                n = dec.recv_into(self._sock)
             except socket.timeout:
                 continue
             except OSError as e:
                 _log("ERROR", f"recv OSError: {e}")
                 return None
 
-            if not chunk:
-                if buf:
+            if n and not received:
+                m.LINK_FIRST_BYTE.observe(time.monotonic() - self._t_sent, func)
+            received += n
+            m.LINK_BYTES_RECEIVED.inc(func, amount=n)
+
+            if not n:
+                if dec.pending:
                     _log("WARN", "Disconnected or empty chunk")
-                    _log("DEBUG", f"Received partial or malformed data: {_hexsample(bytes(buf))}", verbose=self.verbose)
+                    if debug:
+                        _log("DEBUG", f"Received partial or malformed data: {_hexsample(dec.tail())}", verbose=self.verbose)
                 return None
 
-            buf += chunk
-            _log("DEBUG", f"recv {len(chunk)}B: {_hexsample(chunk)} (buf={len(buf)}B)", verbose=self.verbose)
-
-            # keep only from the *last* STX onward (discard any junk before it)
-            last_stx = buf.rfind(bytes([STX]))
-            if last_stx != -1:
-                if last_stx > 0:
-                    junk = bytes(buf[:last_stx])
-                    if junk:
-                        _log("DEBUG", f"Discarding {len(junk)}B before STX: {_hexsample(junk)}", verbose=self.verbose)
-                    del buf[:last_stx]  # STX now at buf[0]
-
-                # find ETX after STX
-                try:
-                    etx_idx = buf.index(bytes([ETX]), 1)
-                    frame = bytes(buf[:etx_idx + 1])  # include STX+ETX
-                    payload = frame[1:-1]
-                    pretty = payload.decode("ascii", errors="ignore").strip()
-                    _log("DEBUG", f"STX..ETX frame {len(frame)}B found (payload {len(payload)}B): '{pretty}'", verbose=self.verbose)
-                    # return FULL frame so protocol.parse_response() is happy
-                    return frame.decode("ascii", errors="ignore")
-                except ValueError:
-                    # ETX not seen yet; keep reading
-                    pass
+            if debug:
+                _log("DEBUG", f"recv {n}B (buffered={dec.pending}B)", verbose=self.verbose)
+
+            frames = dec.frames()
+            if frames:
+                dropped += len(frames) - 1 + (latest is not None)
+                dropped_bytes += sum(map(len, frames[:-1])) + (len(latest) if latest else 0)
+                latest = frames[-1]
+            if latest is not None and not dec.in_frame:
+                rtt = time.monotonic() - self._t_sent
+                self.rtt.sample(func, rtt)
+                m.LINK_FRAME.observe(rtt, func)
+                junk = dec.discarded + dropped_bytes
+                if junk:
+                    m.LINK_JUNK.inc(func, amount=junk)
+                if debug:
+                    if dec.discarded:
+                        _log("DEBUG", f"Discarded {dec.discarded}B before STX", verbose=self.verbose)
+                    if dropped:
+                        _log("DEBUG", f"Dropped {dropped} stale frame(s)", verbose=self.verbose)
+                    _log("DEBUG", f"STX..ETX frame {len(latest)}B found: '{latest[1:-1].strip()}'", verbose=self.verbose)
+                # return FULL frame so protocol.parse_response() is happy
+                return latest
 
         # deadline
-        if buf:
+        m.LINK_TIMEOUTS.inc(func)
+        if budget >= self._io_budget(func):  # not cut short by a batch deadline
+            self.rtt.backoff(func)
+        if dec.pending:
             _log("WARN", "Timeout waiting for ETX")
-            _log("DEBUG", f"Buffer snapshot: {_hexsample(bytes(buf))}", verbose=self.verbose)
+            if debug:
+                _log("DEBUG", f"Buffer snapshot: {_hexsample(dec.tail())}", verbose=self.verbose)
         else:
             _log("WARN", "Timeout with no data")
         return None
 
     # ---- Public API -----------------------------------------------------------
 
-    def send_command(self, command: str) -> Optional[str]:
+    def _exchange(self, command: str, timeout: Optional[float] = None) -> Optional[str]:
+        """drain → send → read one full frame on the current socket. Raises OSError on I/O failure."""
+        assert self._sock
+        self._drain_stale_input()
+        if _debug_on(self.verbose):
+            _log("DEBUG", f"Sending command: {command.strip()}", verbose=self.verbose)
+        payload = encode_frame(command)  # Gasera expects no CR/LF
+        self._t_sent = time.monotonic()
+        self._sock.sendall(payload)
+        m.LINK_BYTES_SENT.inc(self._func, amount=len(payload))
+
+        resp = self._recv_until_stx_etx(timeout if timeout is not None else self._cap(self._io_budget(self._func)))
+        if resp is None:
+            _log("WARN", "No response or timeout occurred")
+            return None
+        if _debug_on(self.verbose):
+            _log("DEBUG", f"Response: {resp[1:-1].strip()}", verbose=self.verbose)
+        return resp
+
+    def send_command(self, command: str, deadline: Optional[float] = None) -> Optional[str]:
         """
         Stateless one-shot with a single quick retry on timeout/EPIPE:
           connect → drain → send → read full frame → (retry once if needed) → disconnect
+        In persistent mode the socket is reused instead (see _send_persistent).
         Returns the full STX..ETX framed string on success, or None on failure.
+        deadline (time.monotonic()) bounds the whole call: DeadlineExceeded if it passes before
+        the first attempt; an attempt cut short by it is a link failure (None).
         """
         with self._lock:
-            # small jitter avoids phase-locking with device internals
-            time.sleep(random.uniform(0.0, 0.12))
+            self._deadline = deadline
+            try:
+                resp = self._observed(command, self._send_locked)
+            finally:
+                self._deadline = None
+            self._flip_connected(resp is not None)
+            return resp
 
-            for attempt in (1, 2):
+    def send_batch(self, commands: Sequence[str], deadline: Optional[float] = None) -> List[Optional[str]]:
+        """
+        Run commands in order over one connection: one connect (and one jitter) for
+        the whole batch instead of one per command.
+          • deadline is a time.monotonic() instant; commands not started by then are
+            not sent, so the returned list is shorter than commands.
+          • A command that fails yields None and drops the socket; the next one
+            reconnects. There are no per-command retries inside a batch.
+        """
+        with self._lock:
+            out: List[Optional[str]] = []
+            self._deadline = deadline
+            if not self.persistent:
+                time.sleep(self._cap(random.uniform(0.0, 0.12)))
+            try:
+                for command in commands:
+                    if expired("transport", deadline):
+                        break
+                    out.append(self._observed(command, self._batch_exchange))
+            finally:
+                self._deadline = None
+                if not self.persistent:
+                    self.disconnect()
+            if out:
+                self._flip_connected(any(r is not None for r in out))
+            return out
+
+    def _batch_exchange(self, command: str) -> Optional[str]:
+        """One batch step on the shared socket (caller holds the lock)."""
+        if not self._session_alive() and not self.connect():
+            return None
+        try:
+            resp = self._exchange(command)
+        except (socket.timeout, BrokenPipeError, OSError) as e:
+            _log("ERROR", f"Communication error: {e}")
+            resp = None
+        if resp is None:
+            self.disconnect()
+        else:
+            self._last_io = time.monotonic()
+        return resp
+
+    def _observed(self, command: str, send: Callable[[str], Optional[str]]) -> Optional[str]:
+        """Run one exchange with trace recording and per-function metrics (caller holds the lock)."""
+        recorder = self.recorder
+        if recorder:
+            recorder.request(command)
+        self._func = command[2:6] or "?"
+        t0 = time.monotonic()
+        resp, attempted = None, False
+        try:
+            resp = send(command)
+            attempted = True  # DeadlineExceeded = nothing was tried, not a link failure
+        finally:
+            m.LINK_EXCHANGE.observe(time.monotonic() - t0, self._func)
+            if attempted and resp is None:
+                m.LINK_FAILURES.inc(self._func)
+            if recorder:
+                recorder.response(resp)
+            self.last_activity = time.monotonic()
+        return resp
+
+    # ---- Wire trace -----------------------------------------------------------
+
+    def start_trace(self, path: str) -> None:
+        """Record every request/response frame to path (replaces a running trace)."""
+        recorder = TraceRecorder(path, header=f"host={self.host}:{self.port}")
+        old, self.recorder = self.recorder, recorder
+        if old:
+            old.close()
+        _log("INFO", f"Wire trace started: {path}")
+
+    def stop_trace(self) -> Optional[str]:
+        """Stop recording; returns the trace path, or None if nothing was recording."""
+        recorder, self.recorder = self.recorder, None
+        if not recorder:
+            return None
+        recorder.close()
+        _log("INFO", f"Wire trace stopped: {recorder.path} ({recorder.events} events)")
+        return recorder.path
+
+    def _send_locked(self, command: str) -> Optional[str]:
+        if self.persistent:
+            return self._send_persistent(command)
+
+        # small jitter avoids phase-locking with device internals
+        time.sleep(self._cap(random.uniform(0.0, 0.12)))
+
+        for attempt in (1, 2):
+            if attempt == 1:
+                self._check_deadline()
+            elif self._out_of_time():
+                break  # the first attempt failed: report that, not the deadline
+            if attempt == 2:
+                m.LINK_RETRIES.inc(self._func)
+            if not self.connect():
+                if attempt == 1:
+                    continue
+                return None
+            try:
+                resp = self._exchange(command)
+                if resp is not None:
+                    return resp
+                # retry once on the next loop iteration
+
+            except (socket.timeout, BrokenPipeError, OSError) as e:
+                _log("ERROR", f"Communication error: {e}")
+                # fall through to retry
+
+            finally:
+                # close every time; next loop will reconnect cleanly if retrying
+                self.disconnect()
+
+        # both attempts failed (or the first did and no time was left for a second)
+        return None
+
+    def _send_persistent(self, command: str) -> Optional[str]:
+        """
+        Persistent-session exchange (caller holds the lock):
+          reuse healthy socket → drain → send → read full frame
+        Any failure drops the socket; the second attempt reconnects transparently.
+        No jitter here: there is no per-call handshake to de-phase.
+        """
+        for attempt in (1, 2):
+            if attempt == 1:
+                self._check_deadline()
+            elif self._out_of_time():
+                break  # the first attempt failed: report that, not the deadline
+            if attempt == 2:
+                m.LINK_RETRIES.inc(self._func)
+            if not self._session_alive():
                 if not self.connect():
                     if attempt == 1:
                         continue
                     return None
-                try:
-                    assert self._sock
-                    self._drain_stale_input()
-                    _log("DEBUG", f"Sending command: {command.strip()}", verbose=self.verbose)
-                    self._sock.sendall(command.encode("ascii"))  # Gasera expects no CR/LF
-
-                    resp = self._recv_until_stx_etx(self.io_timeout + 0.5)  # slight headroom
-                    if resp is None:
-                        _log("WARN", "No response or timeout occurred")
-                        # retry once on the next loop iteration
-                    else:
-                        pretty = resp.replace(chr(STX), "").replace(chr(ETX), "").strip()
-                        _log("DEBUG", f"Response: {pretty}", verbose=self.verbose)
-                        return resp
-
-                except (socket.timeout, BrokenPipeError, OSError) as e:
-                    _log("ERROR", f"Communication error: {e}")
-                    # fall through to retry
+            try:
+                resp = self._exchange(command)
+                if resp is not None:
+                    self._last_io = time.monotonic()
+                    return resp
+            except (socket.timeout, BrokenPipeError, OSError) as e:
+                _log("ERROR", f"Communication error: {e}")
 
-                finally:
-                    # close every time; next loop will reconnect cleanly if retrying
-                    self.disconnect()
+            # a timed-out or broken session may still deliver a late tail; start fresh
+            self.disconnect()
 
-            # both attempts failed
-            return None
+        return None
 
 # -----------------------------------------------------------------------------
 # Singleton
 # -----------------------------------------------------------------------------
 
-from .config import GASERA_IP_ADDRESS, GASERA_PORT_NUMBER
+from .config import GASERA_IP_ADDRESS, GASERA_PORT_NUMBER, GASERA_PERSISTENT_SESSION, GASERA_TRACE_FILE
 
 tcp_client = GaseraTCPClient(
     GASERA_IP_ADDRESS,
@@ -280,4 +596,8 @@ tcp_client = GaseraTCPClient(
     connect_timeout=2.0,
     io_timeout=2.0,
     verbose=False,  # set True (or ENABLE_VERBOSE_PRINTS=True) for [DEBUG] logs
+    persistent=GASERA_PERSISTENT_SESSION,
 )
+
+if GASERA_TRACE_FILE:
+    tcp_client.start_trace(GASERA_TRACE_FILE)
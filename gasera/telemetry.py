@@ -0,0 +1,165 @@
+# telemetry.py — APAR instrument readings sampled in idle gaps, kept in fixed-size array rings
+
+from __future__ import annotations
+
+import threading
+import time
+from array import array
+from bisect import bisect_left
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import system.log_utils as log
+from .config import (GASERA_TELEMETRY, GASERA_TELEMETRY_CAPACITY,
+                     GASERA_TELEMETRY_IDLE_GAP)
+
+class TelemetryRing:
+    """
+    Last `capacity` readings of one parameter as two array('d') columns
+    (epoch seconds, value), 16 bytes per reading; the oldest is overwritten.
+    """
+    __slots__ = ("capacity", "times", "values", "count", "_next")
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self.times = array("d", bytes(8 * capacity))
+        self.values = array("d", bytes(8 * capacity))
+        self.count = 0
+        self._next = 0
+
+    def append(self, t: float, value: float) -> None:
+        i = self._next
+        self.times[i] = t
+        self.values[i] = value
+        self._next = (i + 1) % self.capacity
+        if self.count < self.capacity:
+            self.count += 1
+
+    def since(self, t0: float = 0.0) -> Tuple[array, array]:
+        """Copies of the readings taken at or after t0, oldest first."""
+        if self.count < self.capacity:
+            times, values = self.times[:self.count], self.values[:self.count]
+        else:
+            i = self._next
+            times, values = self.times[i:] + self.times[:i], self.values[i:] + self.values[:i]
+        start = bisect_left(times, t0) if t0 else 0
+        return times[start:], values[start:]
+
+def downsample(times: Sequence[float], values: Sequence[float], points: int) -> dict:
+    """
+    At most `points` buckets of consecutive readings: mean time, mean/min/max value.
+    Short series are returned as they are (min = max = value).
+    """
+    n = len(times)
+    if n <= points:
+        v = list(values)
+        return {"t": list(times), "mean": v, "min": v, "max": v}
+    out = {"t": [], "mean": [], "min": [], "max": []}
+    step = n / points
+    for k in range(points):
+        a, b = int(k * step), int((k + 1) * step)
+        ts, vs = times[a:b], values[a:b]
+        out["t"].append(round(sum(ts) / len(ts), 1))
+        out["mean"].append(sum(vs) / len(vs))
+        out["min"].append(min(vs))
+        out["max"].append(max(vs))
+    return out
+
+class TelemetrySampler:
+    """
+    Reads APAR parameters on their own periods without competing with real traffic.
+
+      • params: name → period (s). Whatever is due is read in one batch (one
+        device session), then rescheduled one period later, answered or not.
+      • Sampling waits for an idle gap: nothing queued or on the wire in the
+        scheduler (when the controller has one) and no exchange for idle_gap
+        seconds. Under load a reading is late, never in the way.
+      • Readings land in a TelemetryRing per parameter; device errors and
+        non-numeric values are counted instead.
+    """
+
+    def __init__(self, controller, params: Dict[str, float],
+                 capacity: int = GASERA_TELEMETRY_CAPACITY, idle_gap: float = GASERA_TELEMETRY_IDLE_GAP,
+                 poll_interval: float = 0.5):
+        self.controller = controller
+        self.params = {name.upper(): float(period) for name, period in params.items()}
+        self.idle_gap = idle_gap
+        self.poll_interval = poll_interval
+        self.rings = {name: TelemetryRing(capacity) for name in self.params}
+        self.errors = dict.fromkeys(self.params, 0)
+        self.batches = 0
+        self._due = dict.fromkeys(self.params, 0.0)  # monotonic time each parameter is next wanted
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def start(self):
+        if self._thread and self._thread.is_alive():
+            return  # already running
+        self._thread = threading.Thread(target=self._loop, daemon=True, name="gasera-telemetry")
+        self._thread.start()
+
+    def _loop(self):
+        while True:
+            try:
+                self.sample_due()
+            except Exception as e:
+                log.error(f"Telemetry sampling failed: {e}")
+            time.sleep(self.poll_interval)
+
+    def _idle(self) -> bool:
+        transport = self.controller.transport
+        if not transport.is_connected():
+            return False  # the link monitor finds the device again; don't add timeouts to it
+        scheduler = getattr(self.controller, "scheduler", None)
+        if scheduler is not None and not scheduler.idle():
+            return False
+        return time.monotonic() - transport.last_activity >= self.idle_gap
+
+    def sample_due(self) -> int:
+        """Read every parameter that is due, if the link is idle; returns readings stored."""
+        now = time.monotonic()
+        due = [name for name, t in self._due.items() if now >= t]
+        if not due or not self._idle():
+            return 0
+        for name in due:
+            self._due[name] = now + self.params[name]
+        results = self.controller.batch([("APAR", name) for name in due], deadline=max(2.0, len(due)))
+        self.batches += 1
+        stamp = time.time()
+        stored = 0
+        with self._lock:
+            for name, r in zip(due, results or []):
+                try:
+                    if not r.ok:
+                        raise ValueError(r.status)
+                    self.rings[name].append(stamp, float(r.result.value))
+                    stored += 1
+                except ValueError:
+                    self.errors[name] += 1
+        return stored
+
+    def series(self, names: Optional[List[str]] = None, since: float = 0.0, points: int = 300) -> dict:
+        """Downsampled readings per parameter since `since` (epoch seconds)."""
+        wanted = [n.upper() for n in names] if names else list(self.params)
+        out = {}
+        with self._lock:
+            for name in wanted:
+                ring = self.rings.get(name)
+                if ring is not None:
+                    out[name] = {"period": self.params[name], **downsample(*ring.since(since), points)}
+        return {"params": out}
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "params": {name: {"period": self.params[name], "readings": self.rings[name].count,
+                                  "errors": self.errors[name]} for name in self.params},
+                "batches": self.batches,
+            }
+
+def start_telemetry(controller) -> Optional[TelemetrySampler]:
+    """Start sampling GASERA_TELEMETRY through `controller` (None when telemetry is off)."""
+    if not GASERA_TELEMETRY:
+        return None
+    sampler = TelemetrySampler(controller, GASERA_TELEMETRY)
+    sampler.start()
+    return sampler
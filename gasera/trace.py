@@ -0,0 +1,187 @@
+# trace.py — wire-level AK trace recorder and deterministic replay transport
+
+from __future__ import annotations
+
+import threading
+import time
+from collections import deque
+from datetime import datetime
+from typing import Callable, Deque, Dict, Iterator, List, Optional, Tuple
+
+STX = chr(2)
+ETX = chr(3)
+
+# Trace file format (text, one event per line, tab separated):
+#   # gasera-trace v1 <free-form header>
+#   <t>\t><TAB><request body>     request sent        (t = seconds since trace start, monotonic)
+#   <t>\t<<TAB><response body>    full frame received
+#   <t>\t!<TAB>                   exchange failed (timeout / no frame)
+# Bodies are the frame without STX/ETX, backslash-escaped so one event stays on one line.
+
+TRACE_MAGIC = "# gasera-trace v1"
+
+def _escape(body: str) -> str:
+    return body.replace("\\", "\\\\").replace("\t", "\\t").replace("\n", "\\n").replace("\r", "\\r")
+
+def _unescape(body: str) -> str:
+    out = []
+    i = 0
+    while i < len(body):
+        c = body[i]
+        if c == "\\" and i + 1 < len(body):
+            nxt = body[i + 1]
+            out.append({"t": "\t", "n": "\n", "r": "\r"}.get(nxt, nxt))
+            i += 2
+        else:
+            out.append(c)
+            i += 1
+    return "".join(out)
+
+def _strip_frame(frame: str) -> str:
+    if frame.startswith(STX):
+        frame = frame[1:]
+    if frame.endswith(ETX):
+        frame = frame[:-1]
+    return frame
+
+class TraceRecorder:
+    """Append-only writer for request/response events, safe to call from any thread."""
+
+    def __init__(self, path: str, header: str = ""):
+        self.path = path
+        self._lock = threading.Lock()
+        self._t0 = time.monotonic_ns()
+        self._fh = open(path, "w", encoding="ascii", errors="backslashreplace")
+        self._fh.write(f"{TRACE_MAGIC} started={datetime.now().isoformat(timespec='seconds')} {header}".rstrip() + "\n")
+        self.events = 0
+
+    def _write(self, tag: str, body: str) -> None:
+        t = (time.monotonic_ns() - self._t0) / 1e9
+        with self._lock:
+            if self._fh.closed:
+                return
+            self._fh.write(f"{t:.6f}\t{tag}\t{_escape(body)}\n")
+            self.events += 1
+
+    def request(self, frame: str) -> None:
+        self._write(">", _strip_frame(frame))
+
+    def response(self, frame: Optional[str]) -> None:
+        if frame is None:
+            self._write("!", "")
+        else:
+            self._write("<", _strip_frame(frame))
+
+    def close(self) -> None:
+        with self._lock:
+            if not self._fh.closed:
+                self._fh.close()
+
+class Exchange:
+    __slots__ = ("t", "request", "response", "latency")
+
+    def __init__(self, t: float, request: str, response: Optional[str], latency: float):
+        self.t = t                  # seconds since trace start when the request was sent
+        self.request = request      # full framed request
+        self.response = response    # full framed response, or None if the exchange failed
+        self.latency = latency      # request → response (or failure) in seconds
+
+def load_trace(path: str) -> List[Exchange]:
+    """Parse a trace file into request/response exchanges, in recorded order."""
+    exchanges: List[Exchange] = []
+    pending: Optional[Tuple[float, str]] = None
+    with open(path, encoding="ascii", errors="replace") as fh:
+        for line in fh:
+            line = line.rstrip("\n")
+            if not line or line.startswith("#"):
+                continue
+            t_str, tag, body = line.split("\t", 2)
+            t = float(t_str)
+            if tag == ">":
+                pending = (t, STX + _unescape(body) + ETX)
+            elif pending is not None:
+                resp = STX + _unescape(body) + ETX if tag == "<" else None
+                exchanges.append(Exchange(pending[0], pending[1], resp, t - pending[0]))
+                pending = None
+    return exchanges
+
+class ReplayTransport:
+    """
+    Stand-in for GaseraTCPClient that answers from a recorded trace.
+
+    Each request string gets its own FIFO of recorded answers, so replies stay
+    deterministic even if callers interleave differently than in the field.
+    Recorded latency is reproduced, divided by speed (speed=0 → no sleeping).
+    When a request's answers run out they wrap around if loop=True, else None.
+    """
+
+    def __init__(self, exchanges: List[Exchange], speed: float = 1.0, loop: bool = True):
+        self.exchanges = exchanges
+        self.speed = speed
+        self.loop = loop
+        self.host = "replay"
+        self.port = 0
+        self.on_connection_change: Optional[Callable[[bool], None]] = None
+        self.on_status_change: Optional[Callable[[object], None]] = None
+        self.last_activity = 0.0
+        self._connected = False
+        self._lock = threading.Lock()
+        self._answers: Dict[str, Deque[Exchange]] = {}
+        self._all: Dict[str, List[Exchange]] = {}
+        for ex in exchanges:
+            self._all.setdefault(ex.request, []).append(ex)
+        self.rewind()
+
+    @classmethod
+    def from_file(cls, path: str, speed: float = 1.0, loop: bool = True) -> "ReplayTransport":
+        return cls(load_trace(path), speed=speed, loop=loop)
+
+    def rewind(self) -> None:
+        with self._lock:
+            self._answers = {req: deque(lst) for req, lst in self._all.items()}
+
+    # ---- GaseraTCPClient surface --------------------------------------------
+
+    def send_command(self, command: str, deadline: Optional[float] = None) -> Optional[str]:
+        # deadline accepted for transport compatibility; replayed latencies are not cut short
+        with self._lock:
+            queue = self._answers.get(command)
+            if queue is not None and not queue and self.loop:
+                queue.extend(self._all[command])
+            ex = queue.popleft() if queue else None
+        if ex is not None and self.speed > 0:
+            time.sleep(ex.latency / self.speed)
+        resp = ex.response if ex is not None else None
+        self.last_activity = time.monotonic()
+        self.report_link(resp is not None)
+        return resp
+
+    def report_link(self, ok: bool) -> None:
+        if self._connected == ok:
+            return
+        self._connected = ok
+        if self.on_connection_change:
+            self.on_connection_change(ok)
+
+    def is_connected(self) -> bool:
+        return self._connected
+
+    def is_online(self, timeout: float = 1.0) -> bool:
+        return bool(self._all)
+
+    def disconnect(self) -> None:
+        pass
+
+def replay_requests(exchanges: List[Exchange], send: Callable[[str], Optional[str]],
+                    speed: float = 1.0) -> Iterator[Tuple[Exchange, Optional[str]]]:
+    """
+    Re-issue recorded requests through send() with the recorded inter-arrival
+    gaps (divided by speed; speed=0 → back to back). Yields (exchange, answer).
+    """
+    start = time.monotonic()
+    for ex in exchanges:
+        if speed > 0:
+            delay = start + ex.t / speed - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+        yield ex, send(ex.request)
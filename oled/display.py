@@ -28,9 +28,12 @@ def get_wifi_ssid():
 
 def get_gasera_status():
     try:
-        r = requests.get("http://127.0.0.1:5001/api/connection_status", timeout=2)
+        r = requests.get("http://127.0.0.1:5001/gasera/api/connection_status", timeout=2)
         data = r.json()
-        return "Online" if data.get("online") else "Offline"
+        if data.get("online"):
+            return "Online"
+        retry = (data.get("circuit") or {}).get("retry_in")
+        return f"Offline ({int(retry)}s)" if retry is not None else "Offline"
     except Exception:
         return "Unknown"
 
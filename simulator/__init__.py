@@ -0,0 +1,2 @@
+from .device import SimulatedDevice
+from .server import AKSimulatorServer, FaultConfig
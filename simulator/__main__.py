@@ -0,0 +1,32 @@
+# python -m simulator — run a local GASERA ONE AK simulator
+
+import argparse
+import asyncio
+
+from .device import SimulatedDevice
+from .server import AKSimulatorServer, FaultConfig
+
+def main():
+    ap = argparse.ArgumentParser(description="GASERA ONE AK-protocol simulator")
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=8888)
+    ap.add_argument("--components", type=int, default=7, help="gas components per result (7..50)")
+    ap.add_argument("--inlets", type=int, default=0, help="multi-point sampler inlets (0 = no MPS)")
+    ap.add_argument("--time-scale", type=float, default=1.0, help=">1 runs measurement cycles faster")
+    ap.add_argument("--seed", type=int, default=None)
+    for f in ("latency", "jitter", "junk", "split", "drop", "silence"):
+        ap.add_argument(f"--{f}", type=float, default=getattr(FaultConfig, f))
+    args = ap.parse_args()
+
+    device = SimulatedDevice(components=args.components, time_scale=args.time_scale,
+                             inlets=args.inlets, seed=args.seed)
+    faults = FaultConfig(latency=args.latency, jitter=args.jitter, junk=args.junk,
+                         split=args.split, drop=args.drop, silence=args.silence)
+    server = AKSimulatorServer(device, faults, host=args.host, port=args.port, seed=args.seed)
+    try:
+        asyncio.run(server.serve_forever())
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,267 @@
+# device.py — simulated GASERA ONE state machine answering AK requests
+
+from __future__ import annotations
+
+import random
+import time
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Tuple
+
+# Default component set, in the order the docs use for SCOR
+DEFAULT_CAS = ["74-82-8", "124-38-9", "7732-18-5", "630-08-0", "10024-97-2", "7664-41-7", "7446-09-5"]
+
+# Typical levels (ppm) used as the centre of each component's random walk
+BASELINE_PPM = {
+    "74-82-8": 1.9, "124-38-9": 420.0, "7732-18-5": 7200.0, "630-08-0": 0.2,
+    "10024-97-2": 0.33, "7664-41-7": 0.005, "7446-09-5": 0.01,
+}
+
+TASKS = {
+    "7": ("Calibration task", ["74-82-8", "124-38-9"], 900.0, 10.0, 8.0, 3),
+    "11": ("DEFAULT", DEFAULT_CAS, 1000.0, 15.0, 10.0, 2),
+    "12": ("FLUSH", [], 1000.0, 60.0, 60.0, 5),
+    "13": ("MTEST2", DEFAULT_CAS[:4], 1000.0, 15.0, 10.0, 2),
+}
+
+SYSTEM_PARAMS = [
+    ("CELLTEMP", 50.0, 20.0, 60.0, "C"),
+    ("CELLPRESSURE", 1000.0, 500.0, 1100.0, "mbar"),
+    ("HEATERPOWER", 4.2, 0.0, 20.0, "W"),
+    ("VAISALACO2VALUE", 421.0, 0.0, 5000.0, "ppm"),
+]
+
+# Measurement cycle phases (AMST codes) and their nominal durations in seconds
+PHASES = [(1, 20.0), (2, 30.0), (3, 10.0)]
+
+class SimulatedDevice:
+    """
+    In-memory GASERA ONE: device status, measurement phases, iteration counter,
+    per-CAS (and per-inlet) last results, SCOR/SCON formatting, network and
+    self-test state. Time-driven state advances lazily on every request.
+
+    time_scale > 1 runs measurement cycles faster than real time.
+    """
+
+    def __init__(self, components: int = 7, time_scale: float = 1.0,
+                 inlets: int = 0, name: str = "GASERA ONE SIM", seed: Optional[int] = None):
+        self.rng = random.Random(seed)
+        self.time_scale = time_scale
+        self.name = name
+        self.serial = "SIM-%06d" % self.rng.randint(0, 999999)
+        self.cas = list(DEFAULT_CAS[:components])
+        for i in range(len(self.cas), components):
+            self.cas.append(f"{9000 + i}-00-{i % 10}")  # synthetic components beyond the real set
+        self.inlets = [(i + 1, True, 30.0) for i in range(inlets)]  # (id, active, bypass s)
+        self.errors: List[str] = []
+        self.online_mode = False
+        self.tune_interval = 1
+        self.net = (1, "192.168.0.100", "255.255.255.0", "192.168.0.1")
+        self.ppm: Dict[str, float] = {c: BASELINE_PPM.get(c, self.rng.uniform(0.01, 50.0)) for c in self.cas}
+        self._boot()
+
+    # ---- Lifecycle ----------------------------------------------------------
+
+    def _boot(self) -> None:
+        now = time.monotonic()
+        self.status = 0                # initializing
+        self._init_until = now + 2.0 / self.time_scale
+        self.phase = 0
+        self.iteration = 0
+        self.task_id: Optional[str] = None
+        self._phase_idx = 0
+        self._phase_until = 0.0
+        self._cancel_until = 0.0
+        self._selftest_until = 0.0
+        self.selftest_result = -2
+        self.order: Optional[List[str]] = None      # SCOR, lost on reboot
+        self.fmt = (1, 1, 1, 0)                     # SCON bits, lost on reboot
+        self.results: List[Tuple[int, str, float, int]] = []  # (epoch, cas, ppm, inlet)
+        self._inlet_cursor = 0
+        self.reboot_pending = False
+
+    def advance(self) -> None:
+        now = time.monotonic()
+        if self.status == 0 and now >= self._init_until:
+            self.status = 2
+        if self.status == 3 and now >= self._selftest_until:
+            self.status = 2
+            self.selftest_result = 1 if not self.errors else 0
+        if self.status == 7 and now >= self._cancel_until:
+            self.status, self.phase = 2, 0
+        while self.status == 5 and now >= self._phase_until:
+            code, _ = PHASES[self._phase_idx]
+            if code == 3:
+                self._complete_iteration()
+            self._phase_idx = (self._phase_idx + 1) % len(PHASES)
+            self.phase = PHASES[self._phase_idx][0]
+            self._phase_until += PHASES[self._phase_idx][1] / self.time_scale
+
+    def _complete_iteration(self) -> None:
+        epoch = int(time.time())
+        active = [i for i, on, _ in self.inlets if on] or [0]
+        inlet = active[self._inlet_cursor % len(active)]
+        self._inlet_cursor += 1
+        cas_list = TASKS.get(self.task_id or "", (None, self.cas))[1] or self.cas
+        fresh = []
+        for cas in cas_list:
+            if cas not in self.ppm:
+                continue
+            base = BASELINE_PPM.get(cas, self.ppm[cas])
+            self.ppm[cas] = max(0.0, self.ppm[cas] + self.rng.gauss(0, 0.02 * base) + 0.05 * (base - self.ppm[cas]))
+            fresh.append((epoch, cas, self.ppm[cas], inlet))
+        # keep the latest record per (inlet, cas)
+        keep = {(r[3], r[1]): r for r in self.results}
+        for r in fresh:
+            keep[(r[3], r[1])] = r
+        self.results = list(keep.values())
+        self.iteration += 1
+
+    # ---- Request handling ---------------------------------------------------
+
+    def handle(self, func: str, args: List[str]) -> Tuple[int, str]:
+        """Return (error_status, data) for one AK request."""
+        self.advance()
+        h = getattr(self, f"_cmd_{func.lower()}", None)
+        if h is None:
+            return 1, ""
+        try:
+            return h(args)
+        except (ValueError, IndexError):
+            return 1, ""
+
+    def _cmd_asts(self, a):
+        return 0, str(self.status)
+
+    def _cmd_aerr(self, a):
+        return 0, " ".join(self.errors)
+
+    def _cmd_atsk(self, a):
+        return 0, " ".join(f"{tid} {name}" for tid, (name, *_rest) in TASKS.items())
+
+    def _start(self, task_id: str):
+        if self.status != 2 or task_id not in TASKS:
+            return 1, ""
+        self.status, self.task_id = 5, task_id
+        self._phase_idx, self.phase = 0, PHASES[0][0]
+        self._phase_until = time.monotonic() + PHASES[0][1] / self.time_scale
+        self.iteration = 0
+        return 0, ""
+
+    def _cmd_stam(self, a):
+        return self._start(a[0])
+
+    def _cmd_stat(self, a):
+        name = " ".join(a)
+        for tid, (tname, *_rest) in TASKS.items():
+            if tname == name:
+                return self._start(tid)
+        return 1, ""
+
+    def _cmd_stpm(self, a):
+        if self.status != 5:
+            return 1, ""
+        self.status = 7
+        self._cancel_until = time.monotonic() + 2.0 / self.time_scale
+        return 0, ""
+
+    def _cmd_acon(self, a):
+        if not self.results:
+            return 1, ""
+        rank = {c: i for i, c in enumerate(self.order or self.cas)}
+        rows = sorted(self.results, key=lambda r: (r[3], rank.get(r[1], len(rank))))
+        show_time, show_cas, show_conc, show_inlet = self.fmt
+        out = []
+        for epoch, cas, ppm, inlet in rows:
+            if show_time:
+                out.append(str(epoch))
+            if show_cas:
+                out.append(cas)
+            if show_conc:
+                out.append(f"{ppm:.6g}")
+            if show_inlet:
+                out.append(str(inlet))
+        return 0, " ".join(out)
+
+    def _cmd_scor(self, a):
+        if not a:
+            return 1, ""
+        self.order = list(a)
+        return 0, ""
+
+    def _cmd_scon(self, a):
+        bits = [int(x) for x in a]
+        if len(bits) not in (3, 4) or any(b not in (0, 1) for b in bits):
+            return 1, ""
+        if len(bits) == 3:
+            bits.append(self.fmt[3])  # inlet bit is optional and keeps its value
+        self.fmt = tuple(bits)
+        return 0, ""
+
+    def _cmd_amst(self, a):
+        return 0, str(self.phase if self.status == 5 else 0)
+
+    def _cmd_anam(self, a):
+        return 0, self.name
+
+    def _cmd_aitr(self, a):
+        return 0, str(self.iteration)
+
+    def _cmd_anet(self, a):
+        return 0, " ".join(str(x) for x in self.net)
+
+    def _cmd_snet(self, a):
+        self.net = (int(a[0]), a[1], a[2], a[3])
+        return 0, ""
+
+    def _cmd_aclk(self, a):
+        return 0, datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%S")
+
+    def _cmd_apar(self, a):
+        name = a[0].upper()
+        for pname, value, lo, hi, _unit in SYSTEM_PARAMS:
+            if pname == name:
+                return 0, f"{min(hi, max(lo, value + self.rng.gauss(0, 0.002 * (hi - lo)))):.3f}"
+        return 1, ""
+
+    def _cmd_sonl(self, a):
+        self.online_mode = a[0] == "1"
+        return 0, ""
+
+    def _cmd_stun(self, a):
+        self.tune_interval = int(a[0])
+        return 0, ""
+
+    def _cmd_atsp(self, a):
+        task = TASKS.get(a[0])
+        if not task:
+            return 1, ""
+        _name, cas, pressure, bypass, cell, cycles = task
+        return 0, f"{','.join(cas) or '-'} {pressure} {bypass} {cell} {cycles}"
+
+    def _cmd_asyp(self, a):
+        return 0, " ".join(f"{n},{v},{lo},{hi},{u}" for n, v, lo, hi, u in SYSTEM_PARAMS)
+
+    def _cmd_amps(self, a):
+        if not self.inlets:
+            return 2, ""
+        return 0, " ".join(f"{i} {int(on)} {bp:g}" for i, on, bp in self.inlets)
+
+    def _cmd_adev(self, a):
+        return 0, f'"Gasera Ltd." "{self.serial}" "{self.name}" "2.4.1-sim"'
+
+    def _cmd_stst(self, a):
+        if self.status != 2:
+            return 1, ""
+        self.status, self.selftest_result = 3, -1
+        self._selftest_until = time.monotonic() + 5.0 / self.time_scale
+        return 0, ""
+
+    def _cmd_astr(self, a):
+        return 0, str(self.selftest_result)
+
+    def _cmd_rdev(self, a):
+        self.reboot_pending = True  # the server drops all sessions, then calls reboot()
+        return 0, ""
+
+    def reboot(self) -> None:
+        self._boot()
@@ -0,0 +1,160 @@
+# server.py — asyncio AK-protocol server around SimulatedDevice, with fault injection
+
+from __future__ import annotations
+
+import asyncio
+import random
+from dataclasses import dataclass, fields
+from typing import Optional, Set
+
+from .device import SimulatedDevice
+
+STX = 0x02
+ETX = 0x03
+
+@dataclass
+class FaultConfig:
+    latency: float = 0.02     # base response delay (s)
+    jitter: float = 0.01      # + uniform(0, jitter)
+    junk: float = 0.0         # probability of junk bytes before STX
+    split: float = 0.0        # probability a response is sent in several chunks
+    drop: float = 0.0         # probability the connection is closed instead of answering
+    silence: float = 0.0      # probability the request is swallowed (client times out)
+
+    def update(self, **kv) -> None:
+        names = {f.name for f in fields(self)}
+        for k, v in kv.items():
+            if k in names:
+                setattr(self, k, float(v))
+
+    def as_string(self) -> str:
+        return " ".join(f"{f.name}={getattr(self, f.name):g}" for f in fields(self))
+
+class AKSimulatorServer:
+    """
+    Serves SimulatedDevice over the AK protocol to any number of concurrent clients.
+
+    Besides the real AK commands it understands one simulator-only request,
+        XSIM K0 [key=value ...]
+    which updates FaultConfig at runtime (keys: latency, jitter, junk, split,
+    drop, silence) plus errors=8001,8002 / errors= to set active AERR codes.
+    It answers with the resulting settings.
+    """
+
+    def __init__(self, device: SimulatedDevice, faults: Optional[FaultConfig] = None,
+                 host: str = "127.0.0.1", port: int = 8888, seed: Optional[int] = None):
+        self.device = device
+        self.faults = faults or FaultConfig()
+        self.host = host
+        self.port = port
+        self.rng = random.Random(seed)
+        self.requests = 0
+        self._writers: Set[asyncio.StreamWriter] = set()
+        self._server: Optional[asyncio.base_events.Server] = None
+
+    async def start(self) -> None:
+        self._server = await asyncio.start_server(self._handle_client, self.host, self.port, backlog=1024)
+        sock = self._server.sockets[0].getsockname()
+        self.port = sock[1]
+        print(f"[SIM] AK simulator listening on {sock[0]}:{sock[1]} ({self.faults.as_string()})")
+
+    async def serve_forever(self) -> None:
+        if not self._server:
+            await self.start()
+        async with self._server:
+            await self._server.serve_forever()
+
+    async def close(self) -> None:
+        if self._server:
+            self._server.close()
+            await self._server.wait_closed()
+        for w in list(self._writers):
+            w.close()
+
+    # ---- Per-connection loop ------------------------------------------------
+
+    async def _handle_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self._writers.add(writer)
+        buf = bytearray()
+        try:
+            while True:
+                chunk = await reader.read(4096)
+                if not chunk:
+                    break
+                buf += chunk
+                while True:
+                    start = buf.find(STX)
+                    if start < 0:
+                        buf.clear()
+                        break
+                    end = buf.find(ETX, start + 1)
+                    if end < 0:
+                        del buf[:start]
+                        break
+                    body = buf[start + 1:end].decode("ascii", errors="ignore")
+                    del buf[:end + 1]
+                    if not await self._answer(body, writer):
+                        return
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            self._writers.discard(writer)
+            writer.close()
+
+    async def _answer(self, body: str, writer: asyncio.StreamWriter) -> bool:
+        """Answer one request. Returns False when the connection should be dropped."""
+        parts = body.split()
+        if len(parts) < 2:
+            return True  # not an AK request; real device ignores it too
+        func, args = parts[0], parts[2:]  # parts[1] is the K<channel> field
+        self.requests += 1
+        f = self.faults
+
+        delay = f.latency + self.rng.uniform(0.0, f.jitter)
+        if delay > 0:
+            await asyncio.sleep(delay)
+        if self.rng.random() < f.drop:
+            return False
+        if self.rng.random() < f.silence:
+            return True
+
+        if func == "XSIM":
+            status, data = 0, self._control(args)
+        else:
+            status, data = self.device.handle(func, args)
+        frame = f"\x02 {func} {status}" + (f" {data}" if data else "") + "\x03"
+        payload = frame.encode("ascii", errors="replace")
+
+        if self.rng.random() < f.junk:
+            payload = bytes(self.rng.choice(b"abcXYZ \r\n\x00\x7f") for _ in range(self.rng.randint(1, 16))) + payload
+
+        if self.rng.random() < f.split and len(payload) > 2:
+            cuts = sorted(self.rng.sample(range(1, len(payload)), min(3, len(payload) - 1)))
+            prev = 0
+            for cut in cuts + [len(payload)]:
+                writer.write(payload[prev:cut])
+                await writer.drain()
+                prev = cut
+                await asyncio.sleep(self.rng.uniform(0.001, 0.02))
+        else:
+            writer.write(payload)
+            await writer.drain()
+
+        if self.device.reboot_pending:
+            await self._reboot()
+            return False
+        return True
+
+    def _control(self, args) -> str:
+        kv = dict(a.split("=", 1) for a in args if "=" in a)
+        if "errors" in kv:
+            self.device.errors = [e for e in kv.pop("errors").split(",") if e]
+        self.faults.update(**kv)
+        return self.faults.as_string()
+
+    async def _reboot(self) -> None:
+        # device drops every session ~immediately after acknowledging RDEV
+        await asyncio.sleep(0.1)
+        for w in list(self._writers):
+            w.close()
+        self.device.reboot()
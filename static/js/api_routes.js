@@ -7,9 +7,36 @@ API_PATHS = {
     "connection": {
         "status": "/gasera/api/connection_status"
     },
+    "devices": {
+        "list": "/gasera/api/devices"
+    },
+    "scheduler": {
+        "stats": "/gasera/api/scheduler/stats"
+    },
+    "proxy": {
+        "stats": "/gasera/api/proxy/stats"
+    },
+    "discovery": {
+        "scan": "/gasera/api/discovery"
+    },
+    "link": {
+        "rtt": "/gasera/api/link/rtt"
+    },
+    "trace": {
+        "start": "/gasera/api/trace/start",
+        "stop": "/gasera/api/trace/stop"
+    },
     "data": {
         "dummy": "/gasera/api/data/dummy",
-        "live": "/gasera/api/data/live"
+        "live": "/gasera/api/data/live",
+        "history": "/gasera/api/data/history",
+        "export": "/gasera/api/data/export.csv"
+    },
+    "telemetry": {
+        "series": "/gasera/api/telemetry"
+    },
+    "journal": {
+        "query": "/gasera/api/journal"
     },
     "settings": {
         "read": "/gasera/api/settings/read",
@@ -0,0 +1,28 @@
+# conftest.py — hardware-free test setup
+
+import os
+import sys
+import types
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+# gasera/__init__ pulls in the measurement loop, which claims the GPIO chip on import.
+# The modules under test don't need it, so register the package without running it.
+if "gasera" not in sys.modules:
+    _pkg = types.ModuleType("gasera")
+    _pkg.__path__ = [os.path.join(ROOT, "gasera")]
+    sys.modules["gasera"] = _pkg
+
+CORPUS_DIR = os.path.join(ROOT, "bench", "corpus")
+GOLDEN_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "golden")
+
+def corpus_traces():
+    return sorted(os.path.join(CORPUS_DIR, f) for f in os.listdir(CORPUS_DIR) if f.endswith(".trace"))
+
+@pytest.fixture
+def proto():
+    from gasera.protocol import GaseraProtocol
+    return GaseraProtocol()
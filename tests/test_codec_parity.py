@@ -0,0 +1,43 @@
+# test_codec_parity.py — table-driven codec vs the original parse_* output
+
+import json
+import os
+
+import pytest
+
+from conftest import GOLDEN_DIR, corpus_traces
+from gasera.protocol import encode_frame
+from gasera.trace import load_trace
+
+# Expected values were produced by the dataclass parse_* parsers that the codec
+# replaced, over every distinct reply in bench/corpus (ACON from traces recorded
+# with inlets is left out: those parsers predate the inlet column).
+with open(os.path.join(GOLDEN_DIR, "decode_baseline.json")) as _fh:
+    GOLDEN = json.load(_fh)["replies"]
+
+def view(obj, like):
+    """obj reduced to the shape of the golden value, as JSON would store it."""
+    if isinstance(like, dict):
+        return {key: view(getattr(obj, key), sub) for key, sub in like.items()}
+    if isinstance(like, list) and like and isinstance(like[0], dict):
+        return [view(item, like[0]) for item in obj]
+    return json.loads(json.dumps(obj))
+
+@pytest.mark.parametrize("entry", GOLDEN, ids=lambda e: f"{e['trace']}:{e['func']}")
+def test_decode_matches_baseline(proto, entry):
+    result = proto.decode(entry["response"], entry["func"])
+    assert view(result, entry["expected"]) == entry["expected"]
+
+@pytest.mark.parametrize("entry", GOLDEN[:5], ids=lambda e: e["func"])
+def test_parse_wrappers_match_decode(proto, entry):
+    parse = getattr(proto, f"parse_{entry['func'].lower()}")
+    assert view(parse(entry["response"]), entry["expected"]) == entry["expected"]
+
+def test_golden_covers_corpus():
+    funcs = {e["func"] for e in GOLDEN}
+    assert {"ASTS", "ACON", "ADEV", "ASYP", "AMPS"} <= funcs
+
+@pytest.mark.parametrize("path", corpus_traces(), ids=os.path.basename)
+def test_encode_frame_matches_ascii(path):
+    for frame in {ex.request for ex in load_trace(path)}:
+        assert encode_frame(frame) == frame.encode("ascii")
@@ -0,0 +1,122 @@
+# test_framing.py — FrameDecoder and the client's frame reader
+
+import time
+
+import pytest
+
+from gasera.framing import FrameDecoder
+from gasera.tcp_client import GaseraTCPClient
+
+ASTS = b"\x02 ASTS 0 2\x03"
+ACON = b"\x02 ACON 0 1792206173 74-82-8 1.90354 1792206173 124-38-9 423.474\x03"
+
+class ChunkedSocket:
+    """Socket stand-in whose recv_into() hands out the loaded bytes `chunk` at a time."""
+
+    def __init__(self, data: bytes, chunk: int):
+        self.data = memoryview(data)
+        self.chunk = chunk
+        self.pos = 0
+
+    def settimeout(self, timeout) -> None:
+        pass
+
+    def recv_into(self, view, nbytes: int = 0) -> int:
+        n = min(len(view), self.chunk, len(self.data) - self.pos)
+        view[:n] = self.data[self.pos:self.pos + n]
+        self.pos += n
+        return n
+
+def read_frame(payload: bytes, chunk: int, func: str = "ASTS"):
+    client = GaseraTCPClient("test", 0)
+    client._sock = ChunkedSocket(payload, chunk)
+    client._func = func
+    client._t_sent = time.monotonic()
+    return client._recv_until_stx_etx(1.0)
+
+# ---- FrameDecoder -------------------------------------------------------------
+
+def test_frame_split_byte_by_byte():
+    dec = FrameDecoder(size=16)
+    out = []
+    for i in range(len(ACON)):
+        assert not out
+        dec.feed(ACON[i:i + 1])
+        out += dec.frames()
+    assert out == [ACON.decode("ascii")]
+    assert dec.discarded == 0
+    assert dec.pending == 0 and not dec.in_frame
+
+def test_frame_split_keeps_state_between_calls():
+    dec = FrameDecoder()
+    dec.feed(ACON[:10])
+    assert dec.frames() == []
+    assert dec.in_frame
+    dec.feed(ACON[10:])
+    assert dec.frames() == [ACON.decode("ascii")]
+    assert not dec.in_frame
+
+def test_junk_before_stx_is_counted():
+    dec = FrameDecoder()
+    dec.feed(b"\r\n\x00noise" + ASTS)
+    assert dec.frames() == [ASTS.decode("ascii")]
+    assert dec.discarded == len(b"\r\n\x00noise")
+
+def test_junk_without_stx_is_dropped():
+    dec = FrameDecoder()
+    dec.feed(b"no frame here")
+    assert dec.frames() == []
+    assert dec.discarded == 13
+    assert dec.pending == 0
+
+def test_stx_restarts_partial_frame():
+    dec = FrameDecoder()
+    partial = b"\x02 ACON 0 17922"
+    dec.feed(partial + ASTS)
+    assert dec.frames() == [ASTS.decode("ascii")]
+    assert dec.discarded == len(partial)
+
+def test_several_frames_in_one_chunk_in_order():
+    dec = FrameDecoder()
+    dec.feed(ASTS + ACON + ASTS[:4])
+    assert dec.frames() == [ASTS.decode("ascii"), ACON.decode("ascii")]
+    assert dec.in_frame
+
+def test_overflow_is_counted_not_grown():
+    dec = FrameDecoder(size=1024)
+    dec.MAX_BUFFER = 4096
+    blob = b"\x02" + b"x" * 10000  # a frame that never ends
+    dec.feed(blob)
+    dec.frames()
+    assert len(dec._buf) <= dec.MAX_BUFFER
+    assert dec.discarded > 0
+    assert dec.discarded + dec.pending == len(blob)
+    dec.feed(ASTS)
+    assert dec.frames() == [ASTS.decode("ascii")]
+
+def test_reset_clears_counters():
+    dec = FrameDecoder()
+    dec.feed(b"junk\x02 AS")
+    dec.frames()
+    dec.reset()
+    assert dec.discarded == 0 and dec.pending == 0 and not dec.in_frame
+
+# ---- GaseraTCPClient._recv_until_stx_etx --------------------------------------
+
+@pytest.mark.parametrize("chunk", [1460, 64, 8, 1])
+def test_client_reads_frame_across_chunks(chunk):
+    assert read_frame(b"\r\n" + ACON, chunk, "ACON") == ACON.decode("ascii")
+
+@pytest.mark.parametrize("chunk", [1460, 4096])
+def test_client_newest_frame_wins(chunk):
+    stale = b"\x02 ASTS 0 0\x03"
+    assert read_frame(b"\r\n\x00" + stale + ASTS, chunk) == ASTS.decode("ascii")
+
+def test_client_waits_for_started_frame():
+    # the stale frame is complete in the first chunk, but the next one has already started
+    stale = b"\x02 ASTS 0 0\x03"
+    payload = stale + ASTS
+    assert read_frame(payload, len(stale) + 2) == ASTS.decode("ascii")
+
+def test_client_truncated_frame_is_none():
+    assert read_frame(ACON[:-1], 64, "ACON") is None
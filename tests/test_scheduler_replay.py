@@ -0,0 +1,168 @@
+# test_scheduler_replay.py — scheduler admission and breaker paths over a recorded trace
+
+import os
+import threading
+import time
+
+import pytest
+
+from conftest import CORPUS_DIR
+from gasera.circuit_breaker import CircuitBreaker
+from gasera.scheduler import DeviceScheduler, Lane, SchedulerRejected
+from gasera.trace import Exchange, ReplayTransport, load_trace
+
+TRACE = os.path.join(CORPUS_DIR, "sim_c7.trace")
+
+class RecordingReplay(ReplayTransport):
+    """ReplayTransport that also remembers the order requests reached the wire."""
+
+    def __init__(self, exchanges, **kw):
+        super().__init__(exchanges, **kw)
+        self.sent = []
+
+    def send_command(self, command, deadline=None):
+        self.sent.append(command[2:6])
+        return super().send_command(command, deadline)
+
+def replay(latency: float) -> RecordingReplay:
+    """The corpus trace with every exchange taking `latency` seconds."""
+    exchanges = [Exchange(ex.t, ex.request, ex.response, latency) for ex in load_trace(TRACE)]
+    return RecordingReplay(exchanges)
+
+def wait_until(pred, timeout: float = 2.0) -> None:
+    end = time.monotonic() + timeout
+    while not pred():
+        assert time.monotonic() < end, "condition not reached"
+        time.sleep(0.005)
+
+def background(sched, command, lane=None):
+    """Submit from a worker thread; returns (thread, outcome dict)."""
+    out = {}
+
+    def run():
+        try:
+            out["response"] = sched.submit(command, lane=lane)
+        except SchedulerRejected as e:
+            out["rejected"] = str(e)
+
+    t = threading.Thread(target=run, daemon=True)
+    t.start()
+    return t, out
+
+def depth(sched, lane: int) -> int:
+    return sched.stats()[Lane.NAMES[lane]]["depth"]
+
+# ---- Shedding and admission (user-005) ----------------------------------------
+
+def test_control_jumps_queued_ui_work(proto):
+    transport = replay(0.1)
+    sched = DeviceScheduler(transport, max_depth={}, max_age={})
+    sched.start()
+    asts = proto.build_command("ASTS")
+    busy, _ = background(sched, asts)
+    wait_until(lambda: transport.sent)
+    queued = [background(sched, asts) for _ in range(3)]
+    wait_until(lambda: depth(sched, Lane.UI) == 3)
+    stop, stop_out = background(sched, proto.build_command("STPM"))
+    for t, _ in [(busy, None), (stop, None)] + queued:
+        t.join(2.0)
+    assert transport.sent[:2] == ["ASTS", "STPM"]
+    assert "rejected" not in stop_out
+    assert all(out.get("response") for _, out in queued)
+
+def test_full_ui_lane_rejects(proto):
+    transport = replay(0.2)
+    sched = DeviceScheduler(transport, max_depth={Lane.UI: 2}, max_age={})
+    sched.start()
+    asts = proto.build_command("ASTS")
+    background(sched, asts)
+    wait_until(lambda: transport.sent)
+    queued = [background(sched, asts) for _ in range(2)]
+    wait_until(lambda: depth(sched, Lane.UI) == 2)
+    with pytest.raises(SchedulerRejected, match="lane full"):
+        sched.submit(asts)
+    for t, _ in queued:
+        t.join(2.0)
+    stats = sched.stats()["ui"]
+    assert stats["rejected"] == 1
+    assert stats["executed"] == 3
+
+def test_stale_ui_work_is_shed(proto):
+    transport = replay(0.3)
+    sched = DeviceScheduler(transport, max_depth={}, max_age={Lane.UI: 0.1})
+    sched.start()
+    asts = proto.build_command("ASTS")
+    busy, busy_out = background(sched, asts)
+    wait_until(lambda: transport.sent)
+    with pytest.raises(SchedulerRejected, match="shed: waited"):
+        sched.submit(asts)
+    busy.join(2.0)
+    assert busy_out["response"] is not None
+    assert sched.stats()["ui"]["shed"] == 1
+    assert transport.sent == ["ASTS"]
+
+def test_measurement_lane_has_no_age_limit(proto):
+    transport = replay(0.2)
+    sched = DeviceScheduler(transport, max_depth={}, max_age={Lane.UI: 0.05})
+    sched.start()
+    acon = proto.build_command("ACON")
+    background(sched, acon)
+    wait_until(lambda: transport.sent)
+    assert sched.submit(acon, lane=Lane.MEASUREMENT) is not None
+    assert sched.stats()["measurement"]["shed"] == 0
+
+# ---- Circuit breaker (user-009) ------------------------------------------------
+
+def test_breaker_opens_and_fails_fast(proto):
+    transport = replay(0.0)
+    breaker = CircuitBreaker(failure_threshold=3, base_backoff=60.0)
+    sched = DeviceScheduler(transport, max_depth={}, max_age={}, breaker=breaker)
+    sched.start()
+    lost = proto.build_command("ANAM")  # not in the trace: the replay answers None
+    for _ in range(3):
+        assert sched.submit(lost) is None
+    assert breaker.state == CircuitBreaker.OPEN
+    assert breaker.opened_count == 1
+
+    sent = len(transport.sent)
+    with pytest.raises(SchedulerRejected, match="circuit open"):
+        sched.submit(proto.build_command("ASTS"))
+    with pytest.raises(SchedulerRejected, match="circuit open"):
+        sched.submit_batch([proto.build_command("ASTS"), proto.build_command("ACON")])
+    assert sched.stats()["fast_failed"] == 2
+    assert len(transport.sent) == sent  # refused before reaching the wire
+
+def test_control_lane_bypasses_open_breaker(proto):
+    transport = replay(0.0)
+    breaker = CircuitBreaker(failure_threshold=1, base_backoff=60.0)
+    sched = DeviceScheduler(transport, max_depth={}, max_age={}, breaker=breaker)
+    sched.start()
+    sched.submit(proto.build_command("ANAM"))
+    assert breaker.state == CircuitBreaker.OPEN
+
+    sched.submit(proto.build_command("STPM"))  # no recorded answer, but it must be tried
+    assert transport.sent[-1] == "STPM"
+    assert breaker.state == CircuitBreaker.OPEN
+
+    # a recorded reply on the control lane closes the breaker again
+    assert sched.submit(proto.build_command("ASTS"), lane=Lane.CONTROL) is not None
+    assert breaker.state == CircuitBreaker.CLOSED
+    assert sched.submit(proto.build_command("ASTS")) is not None
+    assert sched.stats()["fast_failed"] == 0
+
+def test_queued_work_is_shed_when_breaker_opens(proto):
+    lost = proto.build_command("ANAM")
+    # a recorded exchange that timed out: no reply after 0.1 s
+    transport = RecordingReplay(load_trace(TRACE) + [Exchange(0.0, lost, None, 0.1)])
+    breaker = CircuitBreaker(failure_threshold=1, base_backoff=60.0)
+    sched = DeviceScheduler(transport, max_depth={}, max_age={}, breaker=breaker)
+    sched.start()
+    failing, _ = background(sched, lost)
+    wait_until(lambda: transport.sent)
+    queued, out = background(sched, proto.build_command("ASTS"))
+    wait_until(lambda: depth(sched, Lane.UI) == 1)
+    failing.join(2.0)
+    queued.join(2.0)
+    assert "circuit open" in out["rejected"]
+    assert transport.sent == ["ANAM"]
+    assert sched.stats()["ui"]["shed"] == 1